@@ -1,7 +1,13 @@
 import os
 import json
 from unittest.mock import patch
-from tests.factories.model_factories import DashboardFactory, ProjectFactory
+from tests.factories.model_factories import (
+    DashboardFactory,
+    ProjectFactory,
+    SqlModelFactory,
+    TargetFactory,
+    TraceFactory,
+)
 from tests.support.utils import temp_folder, temp_yml_file
 from visivo.commands.run_phase import run_phase
 from visivo.commands.utils import create_file_database
@@ -37,3 +43,45 @@ def test_run_phase():
     )
     assert os.path.exists(f"{output_dir}/{trace.name}/query.sql")
     assert os.path.exists(f"{output_dir}/{trace.name}/data.json")
+
+
+def test_run_phase_fuse_traces():
+    output_dir = temp_folder()
+    target = TargetFactory(database=f"{output_dir}/test.sqlite")
+    model = SqlModelFactory(name="model", target="ref(target)")
+    traces = [
+        TraceFactory(name="first", model=model),
+        TraceFactory(
+            name="second",
+            model="ref(model)",
+            props={"type": "scatter", "x": "query(y)", "y": "query(x)"},
+        ),
+    ]
+    project = ProjectFactory(targets=[target], traces=traces, dashboards=[])
+    create_file_database(url=target.url(), output_dir=output_dir)
+
+    tmp = temp_yml_file(
+        dict=json.loads(project.model_dump_json()), name=PROJECT_FILE_NAME
+    )
+    working_dir = os.path.dirname(tmp)
+
+    def read_rows():
+        rows = {}
+        for trace in traces:
+            with open(f"{output_dir}/{trace.name}/data.json", "r") as fp:
+                cohort = json.load(fp)[trace.name]
+            rows[trace.name] = sorted(zip(cohort["props.x"], cohort["props.y"]))
+        return rows
+
+    run_phase(default_target="target", working_dir=working_dir, output_dir=output_dir)
+    unfused_rows = read_rows()
+
+    run_phase(
+        default_target="target",
+        working_dir=working_dir,
+        output_dir=output_dir,
+        fuse_traces=True,
+    )
+    assert os.path.exists(f"{output_dir}/.cache/fused/first/query.sql")
+    assert read_rows() == unfused_rows
+    assert unfused_rows["second"][0] == (1, 1)
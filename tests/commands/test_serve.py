@@ -38,3 +38,95 @@ def test_serve():
     assert "id" in response_json[0]
     assert "name" in response_json[0]
     assert "signed_data_file_url" in response_json[0]
+
+
+def test_serve_columnar_traces():
+    output_dir = temp_folder()
+    project = ProjectFactory()
+
+    create_file_database(url=project.targets[0].url(), output_dir=output_dir)
+    tmp = temp_yml_file(
+        dict=json.loads(project.model_dump_json()), name=PROJECT_FILE_NAME
+    )
+    working_dir = os.path.dirname(tmp)
+
+    app = app_phase(
+        working_dir=working_dir,
+        output_dir=output_dir,
+        default_target="target",
+        name_filter=None,
+        threads=2,
+        data_format="columnar",
+    )
+
+    client = app.test_client()
+    response = client.get("/api/traces/?format=columnar")
+    response_json = json.loads(response.data)
+    assert response_json[0]["format"] == "columnar"
+    assert response_json[0]["signed_data_file_url"].endswith("/data.bin")
+
+    response = client.get("/api/traces/")
+    response_json = json.loads(response.data)
+    assert response_json[0]["format"] == "json"
+    assert response_json[0]["signed_data_file_url"].endswith("/data.json")
+
+
+def test_serve_filters_traces():
+    output_dir = temp_folder()
+    project = ProjectFactory()
+
+    create_file_database(url=project.targets[0].url(), output_dir=output_dir)
+    tmp = temp_yml_file(
+        dict=json.loads(project.model_dump_json()), name=PROJECT_FILE_NAME
+    )
+    working_dir = os.path.dirname(tmp)
+
+    app = app_phase(
+        working_dir=working_dir,
+        output_dir=output_dir,
+        default_target="target",
+        name_filter=None,
+        threads=2,
+    )
+
+    client = app.test_client()
+    project_id = json.loads(client.get("/api/projects/").data)["id"]
+    assert project_id == project.name
+
+    response = client.get(f"/api/traces/?project_id={project_id}&trace_names=trace")
+    response_json = json.loads(response.data)
+    assert [trace["name"] for trace in response_json] == ["trace"]
+    assert response_json[0]["size"] > 0
+    assert "hash" in response_json[0]
+
+    response = client.get("/api/traces/?trace_names=missing")
+    assert json.loads(response.data) == []
+
+    response = client.get("/api/traces/?project_id=other")
+    assert json.loads(response.data) == []
+
+
+def test_serve_filters_traces_by_project_before_any_run(mocker):
+    output_dir = temp_folder()
+    project = ProjectFactory()
+    os.makedirs(f"{output_dir}/trace", exist_ok=True)
+    with open(f"{output_dir}/trace/data.json", "w") as fp:
+        fp.write("{}")
+    tmp = temp_yml_file(
+        dict=json.loads(project.model_dump_json()), name=PROJECT_FILE_NAME
+    )
+    mocker.patch("visivo.commands.run_phase.Runner")
+
+    app = app_phase(
+        working_dir=os.path.dirname(tmp),
+        output_dir=output_dir,
+        default_target="target",
+        name_filter=None,
+        threads=2,
+    )
+
+    client = app.test_client()
+    response = client.get("/api/traces/?project_id=other")
+    assert json.loads(response.data) == []
+    response = client.get(f"/api/traces/?project_id={project.name}")
+    assert [trace["name"] for trace in json.loads(response.data)] == ["trace"]
@@ -1,6 +1,7 @@
 from visivo.discovery.discover import Discover
 from pathlib import Path
 from visivo.parsers.core_parser import PROJECT_FILE_NAME
+from visivo.parsers.parsed_file_cache import ParsedFileCache
 from tests.support.utils import temp_yml_file, temp_folder, temp_file
 import os
 import pytest
@@ -116,3 +117,26 @@ def test_Core_Parser_includes_git():
         git_models_file,
         profile_file,
     ]
+
+
+def test_Discover_files_reads_includes_through_cache(mocker):
+    output_dir = temp_folder()
+    temp_file(
+        contents=yaml.dump({"targets": []}),
+        output_dir=output_dir,
+        name="other.yml",
+    )
+    project_file = temp_file(
+        contents=yaml.dump({"name": "project", "includes": [{"path": "other.yml"}]}),
+        output_dir=output_dir,
+        name=PROJECT_FILE_NAME,
+    )
+    load = mocker.spy(ParsedFileCache, "load")
+    discover = Discover(
+        working_directory=output_dir,
+        home_directory="tmp",
+        cache_dir=f"{output_dir}/target/.cache",
+    )
+
+    assert discover.files == [project_file, Path(f"{output_dir}/other.yml")]
+    assert load.call_count == 2
@@ -1,5 +1,7 @@
 from visivo.models.base.parent_model import ParentModel
-from tests.factories.model_factories import TraceFactory
+from visivo.models.models.model import Model
+from visivo.models.trace import Trace
+from tests.factories.model_factories import ProjectFactory, TraceFactory
 
 
 def test_Project_filter_trace():
@@ -32,3 +34,23 @@ def test_Project_filter_trace():
     bobcat_trace = TraceFactory(name="bobcat")
     traces = [cat_trace, bobcat_trace]
     assert ParentModel.filtered(pattern="^cat", objects=traces) == [cat_trace]
+
+
+def test_ParentModel_all_descendants_of_type_is_memoized(mocker):
+    project = ProjectFactory()
+    dag = project.dag()
+    trace = project.dashboards[0].rows[0].items[0].chart.traces[0]
+    all_descendants = mocker.spy(ParentModel, "all_descendants")
+
+    traces = ParentModel.all_descendants_of_type(type=Trace, dag=dag)
+    assert traces == [trace]
+    traces.append("ref(other)")
+    assert ParentModel.all_descendants_of_type(type=Trace, dag=dag) == [trace]
+    assert ParentModel.all_descendants_of_type(
+        type=Model, dag=dag, from_node=trace
+    ) == [trace.model]
+    assert ParentModel.all_descendants_of_type(
+        type=Model, dag=dag, from_node=trace
+    ) == [trace.model]
+
+    assert all_descendants.call_count == 2
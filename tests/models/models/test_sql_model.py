@@ -0,0 +1,19 @@
+import os
+from tests.factories.model_factories import SqlModelFactory, TargetFactory
+from tests.support.utils import temp_folder
+from visivo.commands.utils import create_file_database
+
+
+def test_SqlModel_insert_to_sqlite():
+    output_dir = temp_folder()
+    target = TargetFactory(database=f"{output_dir}/test.sqlite")
+    create_file_database(url=target.url(), output_dir=output_dir)
+    model = SqlModelFactory(name="model", sql="select * from test_table")
+
+    model.insert_to_sqlite(target=target, output_dir=output_dir)
+
+    sqlite_target = model.get_sqlite_target(output_dir=output_dir)
+    assert sqlite_target.database == f"{output_dir}/model.sqlite"
+    assert os.path.exists(sqlite_target.database)
+    data_frame = sqlite_target.read_sql("select * from model")
+    assert data_frame["x"].tolist() == [1, 2, 3, 4, 5, 6]
@@ -0,0 +1,75 @@
+from unittest.mock import Mock
+import threading
+from visivo.models.targets.connection_pool import (
+    ConnectionPool,
+    ConnectionPoolRegistry,
+)
+
+
+def test_ConnectionPool_reuses_idle_connections():
+    create = Mock(side_effect=lambda: Mock(closed=False))
+    pool = ConnectionPool(
+        create=create, size=2, is_closed=lambda connection: connection.closed
+    )
+
+    with pool.connection() as first:
+        with pool.connection() as second:
+            assert first != second
+    assert create.call_count == 2
+
+    with pool.connection() as connection:
+        assert connection in (first, second)
+    assert create.call_count == 2
+    first.close.assert_not_called()
+    second.close.assert_not_called()
+
+
+def test_ConnectionPool_bounds_checked_out_connections():
+    create = Mock(side_effect=lambda: Mock(closed=False))
+    pool = ConnectionPool(
+        create=create, size=1, is_closed=lambda connection: connection.closed
+    )
+    acquired = threading.Event()
+
+    def acquire():
+        with pool.connection():
+            acquired.set()
+
+    with pool.connection() as first:
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        assert not acquired.wait(timeout=0.1)
+    thread.join()
+    assert acquired.is_set()
+    assert create.call_count == 1
+
+
+def test_ConnectionPool_drops_closed_connections():
+    create = Mock(side_effect=lambda: Mock(closed=False))
+    pool = ConnectionPool(
+        create=create, size=2, is_closed=lambda connection: connection.closed
+    )
+
+    with pool.connection() as first:
+        pass
+    first.closed = True
+    with pool.connection() as connection:
+        assert connection != first
+    assert create.call_count == 2
+
+    pool.close()
+    connection.close.assert_called_once()
+
+
+def test_ConnectionPoolRegistry_shares_pools_by_key():
+    ConnectionPoolRegistry.close()
+    create = Mock(side_effect=lambda: Mock(closed=False))
+    pool = ConnectionPoolRegistry.get_pool(key=("a",), create=create)
+    assert ConnectionPoolRegistry.get_pool(key=("a",), create=create) is pool
+    assert ConnectionPoolRegistry.get_pool(key=("b",), create=create) is not pool
+
+    with pool.connection() as connection:
+        pass
+    ConnectionPoolRegistry.close()
+    connection.close.assert_called_once()
+    assert ConnectionPoolRegistry.get_pool(key=("a",), create=create) is not pool
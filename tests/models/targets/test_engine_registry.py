@@ -0,0 +1,46 @@
+from sqlalchemy import text
+from tests.factories.model_factories import TargetFactory
+from tests.support.utils import temp_folder
+from visivo.commands.utils import create_file_database
+from visivo.models.targets.engine_registry import EngineRegistry
+from visivo.models.targets.sqlite_target import Attachment, SqliteTarget
+
+
+def test_EngineRegistry_shares_engines():
+    output_dir = temp_folder()
+    target = TargetFactory(database=f"{output_dir}/test.sqlite")
+    same_target = TargetFactory(name="other", database=f"{output_dir}/test.sqlite")
+    other_target = TargetFactory(database=f"{output_dir}/other.sqlite")
+
+    assert target.get_engine() is same_target.get_engine()
+    assert target.get_engine() is not other_target.get_engine()
+
+
+def test_EngineRegistry_attaches_once_per_connection():
+    output_dir = temp_folder()
+    attached_target = TargetFactory(database=f"{output_dir}/test.sqlite")
+    create_file_database(url=attached_target.url(), output_dir=output_dir)
+
+    def merge_target():
+        return SqliteTarget(
+            name="merge",
+            database="",
+            type="sqlite",
+            attach=[Attachment(schema_name="attached", target=attached_target)],
+        )
+
+    assert merge_target().get_engine() is merge_target().get_engine()
+    assert merge_target().get_engine() is not TargetFactory(database="").get_engine()
+    for _ in range(2):
+        with merge_target().connect() as connection:
+            count = connection.execute(text("select count(*) from attached.test_table"))
+            assert count.scalar() == 6
+
+
+def test_EngineRegistry_dispose():
+    output_dir = temp_folder()
+    engine = TargetFactory(database=f"{output_dir}/test.sqlite").get_engine()
+    EngineRegistry.dispose()
+    assert (
+        TargetFactory(database=f"{output_dir}/test.sqlite").get_engine() is not engine
+    )
@@ -1,3 +1,4 @@
+from visivo.models.targets.connection_pool import ConnectionPoolRegistry
 from visivo.models.targets.snowflake_target import SnowflakeTarget
 
 
@@ -5,3 +6,32 @@ def test_SnowflakeTarget_simple_data():
     data = {"name": "target", "database": "database", "type": "snowflake"}
     target = SnowflakeTarget(**data)
     assert target.name == "target"
+
+
+def test_SnowflakeTarget_reuses_pooled_connections(mocker):
+    ConnectionPoolRegistry.close()
+    connect = mocker.patch("snowflake.connector.connect")
+    connect.return_value.is_closed.return_value = False
+    target = SnowflakeTarget(
+        name="target", database="database", type="snowflake", connection_pool_size=2
+    )
+
+    with target.connect() as connection:
+        assert connection == connect.return_value
+    with target.connect() as connection:
+        assert connection == connect.return_value
+
+    assert connect.call_count == 1
+    assert connect.call_args.kwargs["client_session_keep_alive"] == False
+    connect.return_value.close.assert_not_called()
+
+
+def test_SnowflakeTarget_shares_pool_across_rebuilt_targets():
+    ConnectionPoolRegistry.close()
+    data = {"name": "target", "database": "database", "type": "snowflake"}
+
+    assert SnowflakeTarget(**data).get_pool() is SnowflakeTarget(**data).get_pool()
+    assert (
+        SnowflakeTarget(**data, warehouse="other").get_pool()
+        is not SnowflakeTarget(**data).get_pool()
+    )
@@ -2,6 +2,8 @@ from visivo.models.targets.sqlite_target import SqliteTarget
 from pydantic import ValidationError
 from tests.factories.model_factories import TargetFactory
 import pytest
+from tests.support.utils import temp_folder
+from visivo.commands.utils import create_file_database
 
 
 def test_SqliteTarget_simple_data():
@@ -24,3 +26,34 @@ def test_Target_password_json():
     target = TargetFactory(password="password")
 
     assert "**********" in target.model_dump_json()
+
+
+def test_SqliteTarget_read_sql_batches():
+    output_dir = temp_folder()
+    target = TargetFactory(database=f"{output_dir}/test.sqlite")
+    create_file_database(url=target.url(), output_dir=output_dir)
+
+    batches = list(target.read_sql_batches("select * from test_table", batch_size=4))
+
+    assert [len(batch) for batch in batches] == [4, 2]
+    assert list(batches[0].columns) == ["x", "y"]
+    assert target.read_sql("select * from test_table")["x"].tolist() == [
+        1,
+        2,
+        3,
+        4,
+        5,
+        6,
+    ]
+
+
+def test_SqliteTarget_read_sql_batches_empty():
+    output_dir = temp_folder()
+    target = TargetFactory(database=f"{output_dir}/test.sqlite")
+    create_file_database(url=target.url(), output_dir=output_dir)
+
+    batches = list(target.read_sql_batches("select * from test_table where x > 10"))
+
+    assert len(batches) == 1
+    assert len(batches[0]) == 0
+    assert list(batches[0].columns) == ["x", "y"]
@@ -0,0 +1,55 @@
+import pytest
+from visivo.models.expression import parse_expression
+
+
+def test_parse_expression_query():
+    assert parse_expression("query( x )").query_statement() == "x"
+    assert parse_expression("x").query_statement() == None
+
+
+def test_parse_expression_nested_parens():
+    expression = parse_expression(" query(f(g(x), y)) ")
+    assert [call.argument for call in expression.calls("query")] == ["f(g(x), y)"]
+    assert expression.query_statement() == "f(g(x), y)"
+
+
+def test_parse_expression_strips_arguments():
+    assert parse_expression("query(args)").calls("query")[0].argument == "args"
+    assert parse_expression("query( args )").calls("query")[0].argument == "args"
+
+
+def test_parse_expression_combines_queries_with_operators():
+    expression = parse_expression("query(f(x)) + query(y)")
+    assert [call.argument for call in expression.calls("query")] == ["f(x)", "y"]
+    assert expression.query_statement() == "(f(x)) + (y)"
+    assert parse_expression("query(a + b) * 2").query_statement() == "(a + b) * 2"
+    assert parse_expression("query(x) >= 1").query_statement() == "(x) >= 1"
+
+
+def test_parse_expression_rejects_query_mixed_with_text():
+    with pytest.raises(ValueError) as exc_info:
+        parse_expression("Value: query(x)").query_statement()
+    assert (
+        "'Value: query(x)' mixes query() with text other than operators and numbers"
+        in str(exc_info.value)
+    )
+
+    with pytest.raises(ValueError):
+        parse_expression("query(x) + column(y)").query_statement()
+
+
+def test_parse_expression_quoted_parens():
+    expression = parse_expression("query( case when x = ')' then 'a(' end )")
+    assert expression.query_statement() == "case when x = ')' then 'a(' end"
+
+
+def test_parse_expression_column():
+    expression = parse_expression("column(x_data)[1:3]")
+    assert expression.column_names() == ["x_data"]
+    assert expression.calls("column")[0].index == "[1:3]"
+    assert expression.query_statement() == None
+
+
+def test_parse_expression_ignores_unclosed_and_partial_names():
+    assert parse_expression("query(x").query_statement() == None
+    assert parse_expression("myquery(x)").query_statement() == None
@@ -20,6 +20,7 @@ from ..factories.model_factories import (
 from pydantic import ValidationError
 import pytest
 import networkx
+from time import perf_counter
 
 
 def test_Project_simple_data():
@@ -295,3 +296,84 @@ def test_trace_with_default_target_Project_dag():
     assert len(project.descendants()) == 3
     assert project.descendants_of_type(type=Model) == [project.models[0]]
     assert project.descendants_of_type(type=Target) == [project.targets[0]]
+
+
+def test_Project_dag_is_cached_until_structure_changes():
+    project = ProjectFactory()
+    dag = project.dag()
+    assert project.dag() is dag
+
+    trace = TraceFactory(name="other_trace")
+    project.dashboards[0].rows[0].items[0].chart.traces[0] = trace
+    assert project.dag() is not dag
+    assert project.descendants_of_type(type=Trace) == [trace]
+
+
+def _synthetic_project(size):
+    """
+    Builds a project with about size objects where every chart, trace and model refers
+    to the objects it uses by name.
+    """
+    count = size // 4
+    targets = [TargetFactory(name=f"target_{i}") for i in range(10)]
+    models = [
+        SqlModelFactory(name=f"model_{i}", target=f"ref(target_{i % 10})")
+        for i in range(count)
+    ]
+    traces = [
+        TraceFactory(name=f"trace_{i}", model=f"ref(model_{i})") for i in range(count)
+    ]
+    charts = [
+        ChartFactory(name=f"chart_{i}", traces=[f"ref(trace_{i})"])
+        for i in range(count)
+    ]
+    return Project(
+        name="project",
+        targets=targets,
+        models=models,
+        traces=traces,
+        charts=charts,
+        dashboards=[],
+    )
+
+
+def _dag_seconds(project):
+    best = None
+    for _ in range(3):
+        start = perf_counter()
+        ParentModel.dag(project)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def test_Project_dag_resolves_refs_without_searching(mocker):
+    project = _synthetic_project(100)
+    dag = project.dag()
+    all_descendants = mocker.spy(ParentModel, "all_descendants")
+    build = mocker.spy(ParentModel, "dag")
+
+    # Refs resolve through the name index rather than walking the dag.
+    built_dag = ParentModel.dag(project)
+    all_descendants.assert_not_called()
+    assert len(built_dag.graph["name_index"]["trace_24"]) == 1
+
+    build.reset_mock()
+    assert project.dag() is dag
+    build.assert_not_called()
+
+
+@pytest.mark.benchmark
+def test_Project_dag_benchmark_10k_objects():
+    small = _dag_seconds(_synthetic_project(1000))
+    project = _synthetic_project(10000)
+    large = _dag_seconds(project)
+
+    # Building the dag is linear in the size of the project.
+    assert large < small * 20
+
+    project.dag()
+    start = perf_counter()
+    project.dag()
+    cached = perf_counter() - start
+    assert cached < large
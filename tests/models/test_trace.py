@@ -1,7 +1,11 @@
+from visivo.models import trace as trace_module
 from visivo.models.trace import Trace
+from visivo.models.trace_props import Bar
 from tests.factories.model_factories import TraceFactory
 from pydantic import ValidationError
 import pytest
+import subprocess
+import sys
 from visivo.parsers.yaml_ordered_dict import YamlOrderedDict, setup_yaml_ordered_dict
 
 
@@ -91,3 +95,95 @@ def test_Trace_column_root_validation_with_reference_extra_paren():
     }
     trace = Trace(**data)
     assert trace.name == "development"
+
+
+def test_Trace_extracts_refs():
+    data = {
+        "name": "development",
+        "columns": {"x_data": "x"},
+        "props": {
+            "type": "bar",
+            "x": "column(x_data)",
+            "marker": {"color": "query( sum(y) )"},
+        },
+        "model": {"sql": "select * from table"},
+    }
+    trace = Trace(**data)
+    assert trace.query_statements() == {
+        "columns.x_data": "x",
+        "props.marker.color": "sum(y)",
+    }
+
+    trace = trace.model_copy(update={"props": Bar(type="bar", y="query(count(*))")})
+    assert trace.query_statements() == {
+        "columns.x_data": "x",
+        "props.y": "count(*)",
+    }
+
+
+def test_Trace_query_statements_are_cached(mocker):
+    trace = Trace(
+        name="development",
+        columns={"x_data": "x"},
+        props={"type": "bar", "x": "column(x_data)", "y": "query( sum(y) )"},
+        model={"sql": "select * from table"},
+    )
+    leaves = mocker.spy(trace_module, "_leaves")
+    query_statements = trace.query_statements()
+    call_count = leaves.call_count
+
+    assert trace.query_statements() == query_statements
+    assert leaves.call_count == call_count
+
+    trace.props = Bar(type="bar", y="query(count(*))")
+    assert trace.query_statements() == {
+        "columns.x_data": "x",
+        "props.y": "count(*)",
+    }
+    assert leaves.call_count > call_count
+
+
+def test_Trace_checks_column_refs_in_nested_props():
+    data = {
+        "name": "development",
+        "columns": {"x_data": "x"},
+        "props": {"type": "bar", "marker": {"color": "column(missing)"}},
+        "model": {"sql": "select * from table"},
+    }
+    with pytest.raises(ValidationError) as exc_info:
+        Trace(**data)
+    assert "referenced column name 'missing' is not in columns definition" in str(
+        exc_info.value
+    )
+
+
+@pytest.mark.parametrize(
+    "field,value",
+    [
+        ("props", {"type": "bar", "x": "query(x) as query(y)"}),
+        ("cohort_on", "query(x) as query(y)"),
+        ("filters", ["query(x) as query(y)"]),
+    ],
+)
+def test_Trace_rejects_query_mixed_with_text(field, value):
+    data = {"name": "development", "model": {"sql": "select * from table"}}
+    data[field] = value
+    with pytest.raises(ValidationError) as exc_info:
+        Trace(**data)
+    assert "'query(x) as query(y)' mixes query() with text other than operators" in str(
+        exc_info.value
+    )
+
+
+def test_Trace_props_only_builds_schema_of_its_type():
+    script = (
+        "from visivo.models.trace import Trace\n"
+        "from visivo.models.trace_props import Bar, Mesh3d\n"
+        "Trace(name='t', model={'sql': 'select 1'}, props={'type': 'bar'})\n"
+        "print(Bar.__pydantic_complete__, Mesh3d.__pydantic_complete__)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+
+    assert output.strip() == "True False"
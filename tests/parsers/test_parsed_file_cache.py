@@ -0,0 +1,62 @@
+import datetime
+import os
+from tests.support.utils import temp_file, temp_folder
+from visivo.parsers import parsed_file_cache as parsed_file_cache_module
+from visivo.parsers.parsed_file_cache import ParsedFileCache
+from visivo.parsers.yaml_ordered_dict import setup_yaml_ordered_dict
+
+
+def test_ParsedFileCache_reuses_unchanged_files(mocker):
+    setup_yaml_ordered_dict()
+    output_dir = temp_folder()
+    file = temp_file(
+        name="project.visivo.yml", contents="name: project\n", output_dir=output_dir
+    )
+    load_yaml_string = mocker.spy(parsed_file_cache_module, "load_yaml_string")
+    parsed_file_cache = ParsedFileCache(cache_dir=f"{output_dir}/.cache")
+
+    data = parsed_file_cache.load(file)
+    assert data == {"name": "project"}
+    assert data.value_loc("name") == f"{file}:1"
+    assert parsed_file_cache.load(file) == data
+    assert load_yaml_string.call_count == 1
+
+    file.write_text("name: other_project\n")
+    assert parsed_file_cache.load(file) == {"name": "other_project"}
+    assert load_yaml_string.call_count == 2
+
+
+def test_ParsedFileCache_stores_json_with_locations():
+    output_dir = temp_folder()
+    file = temp_file(
+        name="project.visivo.yml",
+        contents="name: project\ntraces:\n  - name: trace\n    day: 2024-01-02\n1: one\n",
+        output_dir=output_dir,
+    )
+    parsed_file_cache = ParsedFileCache(cache_dir=f"{output_dir}/.cache")
+
+    parsed = parsed_file_cache.load(file)
+    cached = parsed_file_cache.load(file)
+    assert cached == parsed
+    assert cached["traces"][0]["day"] == datetime.date(2024, 1, 2)
+    assert cached[1] == "one"
+    assert cached["traces"][0].key_loc("day") == f"{file}:4"
+    assert cached["traces"][0].value_loc("name") == f"{file}:3"
+    cache_files = os.listdir(parsed_file_cache.cache_dir)
+    assert len(cache_files) == 1
+    assert cache_files[0].endswith(".json")
+
+
+def test_ParsedFileCache_always_parses_templates(mocker):
+    output_dir = temp_folder()
+    file = temp_file(
+        name="project.visivo.yml",
+        contents="name: {{ 'project' }}\n",
+        output_dir=output_dir,
+    )
+    load_yaml_string = mocker.spy(parsed_file_cache_module, "load_yaml_string")
+    parsed_file_cache = ParsedFileCache(cache_dir=f"{output_dir}/.cache")
+
+    assert parsed_file_cache.load(file) == {"name": "project"}
+    assert parsed_file_cache.load(file) == {"name": "project"}
+    assert load_yaml_string.call_count == 2
@@ -0,0 +1,52 @@
+from tests.factories.model_factories import (
+    ProjectFactory,
+    SqlModelFactory,
+    TargetFactory,
+    TraceFactory,
+)
+from tests.support.utils import temp_folder
+from visivo.models.targets.postgresql_target import PostgresqlTarget
+from visivo.query.jobs.run_sql_model_job import jobs, shared_sql_models
+
+
+def postgresql_project():
+    target = PostgresqlTarget(name="postgresql", database="db", type="postgresql")
+    model = SqlModelFactory(name="shared_model", target="ref(postgresql)")
+    other_model = SqlModelFactory(name="other_model", target="ref(postgresql)")
+    traces = [
+        TraceFactory(name="trace1", model=model),
+        TraceFactory(name="trace2", model="ref(shared_model)"),
+        TraceFactory(name="trace3", model=other_model),
+    ]
+    return ProjectFactory(targets=[target], traces=traces, dashboards=[])
+
+
+def test_shared_sql_models():
+    project = postgresql_project()
+    traces_by_model = shared_sql_models(
+        dag=project.dag(), project=project, name_filter=None
+    )
+    assert [model.name for model in traces_by_model.keys()] == ["shared_model"]
+    trace_names = [trace.name for trace in list(traces_by_model.values())[0]]
+    assert sorted(trace_names) == ["trace1", "trace2"]
+
+
+def test_shared_sql_models_skips_sqlite_targets():
+    model = SqlModelFactory(name="model", target=TargetFactory())
+    traces = [
+        TraceFactory(name="trace1", model=model),
+        TraceFactory(name="trace2", model="ref(model)"),
+    ]
+    project = ProjectFactory(targets=[], traces=traces, dashboards=[])
+    assert shared_sql_models(dag=project.dag(), project=project, name_filter=None) == {}
+
+
+def test_jobs():
+    output_dir = temp_folder()
+    project = postgresql_project()
+    sql_model_jobs = jobs(
+        dag=project.dag(), output_dir=output_dir, project=project, name_filter=None
+    )
+    assert len(sql_model_jobs) == 1
+    assert sql_model_jobs[0].name == "shared_model"
+    assert sql_model_jobs[0].target.name == "postgresql"
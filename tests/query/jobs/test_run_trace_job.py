@@ -1,6 +1,16 @@
-from tests.factories.model_factories import DashboardFactory, ProjectFactory
+import json
+import os
+from tests.factories.model_factories import (
+    DashboardFactory,
+    ProjectFactory,
+    SqlModelFactory,
+    TargetFactory,
+    TraceFactory,
+)
 from tests.support.utils import temp_folder
-from visivo.query.jobs.run_trace_job import jobs
+from visivo.commands.utils import create_file_database
+from visivo.models.targets.postgresql_target import PostgresqlTarget
+from visivo.query.jobs.run_trace_job import action, jobs
 
 
 def test_jobs():
@@ -50,3 +60,47 @@ def test_jobs_changed():
     )
     assert len(trace_jobs) == 1
     assert trace_jobs[0].output_changed == False
+
+
+def test_jobs_dedupe_models():
+    output_dir = temp_folder()
+    target = PostgresqlTarget(name="postgresql", database="db", type="postgresql")
+    model = SqlModelFactory(name="shared_model", target="ref(postgresql)")
+    traces = [
+        TraceFactory(name="trace1", model=model),
+        TraceFactory(name="trace2", model="ref(shared_model)"),
+    ]
+    project = ProjectFactory(targets=[target], traces=traces, dashboards=[])
+    trace_jobs = jobs(
+        dag=project.dag(),
+        project=project,
+        output_dir=output_dir,
+        name_filter=None,
+        dedupe_models=True,
+    )
+    assert len(trace_jobs) == 2
+    for trace_job in trace_jobs:
+        assert trace_job.target.database == f"{output_dir}/shared_model.sqlite"
+        assert trace_job.kwargs["query_model_copy"] == True
+
+
+def test_action_query_model_copy():
+    output_dir = temp_folder()
+    target = TargetFactory(database=f"{output_dir}/test.sqlite")
+    create_file_database(url=target.url(), output_dir=output_dir)
+    model = SqlModelFactory(name="model", sql="select * from test_table", target=target)
+    trace = TraceFactory(name="trace", model=model)
+    project = ProjectFactory(targets=[], traces=[trace], dashboards=[])
+    model.insert_to_sqlite(target=target, output_dir=output_dir)
+    os.remove(target.database)
+
+    os.makedirs(f"{output_dir}/trace", exist_ok=True)
+    with open(f"{output_dir}/trace/query.sql", "w") as fp:
+        fp.write("select * from test_table")
+
+    job_result = action(
+        trace=trace, dag=project.dag(), output_dir=output_dir, query_model_copy=True
+    )
+    assert job_result.success
+    with open(f"{output_dir}/trace/data.json", "r") as fp:
+        assert json.load(fp)["trace"]["props.x"] == [1, 2, 3, 4, 5, 6]
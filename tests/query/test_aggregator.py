@@ -0,0 +1,282 @@
+import json
+import multiprocessing
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+import numpy
+import pytest
+from datetime import datetime
+from pandas import DataFrame, to_datetime
+from tests.support.utils import temp_folder
+from visivo.query.aggregator import Aggregator, CohortSlices, IncrementalAggregator
+
+
+def read_columnar(path):
+    with open(path, "rb") as fp:
+        buffer = fp.read()
+    header_length = struct.unpack("<I", buffer[:4])[0]
+    header = json.loads(buffer[4 : 4 + header_length])
+    data_offset = 4 + header_length
+    assert data_offset % 8 == 0
+    data = {}
+    for cohort, columns in header.items():
+        data[cohort] = {}
+        for column, column_header in columns.items():
+            start = data_offset + column_header["offset"]
+            assert start % 8 == 0
+            if column_header["dtype"] == "float64":
+                data[cohort][column] = numpy.frombuffer(
+                    buffer, dtype="<f8", count=column_header["length"], offset=start
+                ).tolist()
+            else:
+                values = json.loads(buffer[start : start + column_header["bytes"]])
+                assert len(values) == column_header["length"]
+                data[cohort][column] = values
+    return data
+
+
+def test_Aggregator_aggregate_data_frame():
+    output_dir = temp_folder()
+    os.makedirs(output_dir, exist_ok=True)
+    data_frame = DataFrame(
+        {
+            "cohort_on": ["a", "b", "a"],
+            "props.x": [1, 2, 3],
+            "props.text": ["one", "two", "three"],
+        }
+    )
+
+    Aggregator.aggregate_data_frame(data_frame=data_frame, trace_dir=output_dir)
+
+    with open(f"{output_dir}/data.json") as fp:
+        data = json.load(fp)
+    assert data == {
+        "a": {"props.x": [1, 3], "props.text": ["one", "three"]},
+        "b": {"props.x": [2], "props.text": ["two"]},
+    }
+    assert not os.path.exists(f"{output_dir}/data.bin")
+
+
+def test_CohortSlices():
+    data_frame = DataFrame(
+        {
+            "cohort_on": ["b", "a", None, "b", "a"],
+            "props.x": [1, 2, 3, 4, 5],
+        }
+    )
+
+    cohort_slices = CohortSlices(data_frame)
+
+    assert len(cohort_slices) == 2
+    items = [
+        (cohort, columns["props.x"].tolist())
+        for cohort, columns in cohort_slices.items()
+    ]
+    assert items == [("a", [2, 5]), ("b", [1, 4])]
+
+
+def test_Aggregator_aggregate_data_frame_columnar():
+    output_dir = temp_folder()
+    os.makedirs(output_dir, exist_ok=True)
+    data_frame = DataFrame(
+        {
+            "cohort_on": ["a", "b", "a"],
+            "props.x": [1, 2, 3],
+            "props.y": [1.5, None, 2.5],
+            "props.text": ["one", "two", "three"],
+        }
+    )
+
+    Aggregator.aggregate_data_frame(
+        data_frame=data_frame, trace_dir=output_dir, data_format="columnar"
+    )
+
+    assert os.path.exists(f"{output_dir}/data.json")
+    data = read_columnar(f"{output_dir}/data.bin")
+    assert data["a"] == {
+        "props.x": [1.0, 3.0],
+        "props.y": [1.5, 2.5],
+        "props.text": ["one", "three"],
+    }
+    assert data["b"] == {"props.x": [2.0], "props.y": [None], "props.text": ["two"]}
+
+
+def test_Aggregator_columnar_keeps_nulls_and_large_integers_as_json():
+    output_dir = temp_folder()
+    os.makedirs(output_dir, exist_ok=True)
+    large_integer = 2**53 + 1
+    data_frame = DataFrame(
+        {
+            "cohort_on": ["a", "a"],
+            "props.x": [1, large_integer],
+            "props.y": [1.5, None],
+            "props.z": [1, 2],
+        }
+    )
+
+    Aggregator.aggregate_data_frame(
+        data_frame=data_frame, trace_dir=output_dir, data_format="columnar"
+    )
+
+    with open(f"{output_dir}/data.bin", "rb") as fp:
+        buffer = fp.read()
+    header_length = struct.unpack("<I", buffer[:4])[0]
+    header = json.loads(buffer[4 : 4 + header_length])
+    assert {column: header["a"][column]["dtype"] for column in header["a"]} == {
+        "props.x": "json",
+        "props.y": "json",
+        "props.z": "float64",
+    }
+    assert read_columnar(f"{output_dir}/data.bin")["a"] == {
+        "props.x": [1, large_integer],
+        "props.y": [1.5, None],
+        "props.z": [1.0, 2.0],
+    }
+
+
+def test_IncrementalAggregator_matches_single_data_frame():
+    single_dir = temp_folder()
+    incremental_dir = temp_folder()
+    os.makedirs(single_dir, exist_ok=True)
+    os.makedirs(incremental_dir, exist_ok=True)
+    data_frame = DataFrame(
+        {
+            "cohort_on": ["b", "a", "c", "a", "b", "a"],
+            "props.x": [1.5, 2.5, 3.5, 4.5, 5.5, 6.5],
+            "props.text": ["one", "two", "three", "four", "five", "six"],
+        }
+    )
+
+    Aggregator.aggregate_data_frame(
+        data_frame=data_frame, trace_dir=single_dir, data_format="columnar"
+    )
+    incremental_aggregator = IncrementalAggregator(
+        trace_dir=incremental_dir, data_format="columnar", max_buffer_bytes=16
+    )
+    for start in range(0, len(data_frame), 2):
+        incremental_aggregator.add(data_frame.iloc[start : start + 2])
+    assert len(incremental_aggregator.spool.spilled) > 0
+    incremental_aggregator.finish()
+
+    with open(f"{single_dir}/data.json") as single_fp:
+        with open(f"{incremental_dir}/data.json") as incremental_fp:
+            assert single_fp.read() == incremental_fp.read()
+    assert read_columnar(f"{single_dir}/data.bin") == read_columnar(
+        f"{incremental_dir}/data.bin"
+    )
+    assert read_columnar(f"{incremental_dir}/data.bin")["a"]["props.x"] == [
+        2.5,
+        4.5,
+        6.5,
+    ]
+
+
+def test_IncrementalAggregator_downgrades_columns_that_stop_being_numeric():
+    output_dir = temp_folder()
+    os.makedirs(output_dir, exist_ok=True)
+    incremental_aggregator = IncrementalAggregator(
+        trace_dir=output_dir, data_format="columnar"
+    )
+    incremental_aggregator.add(
+        DataFrame({"cohort_on": ["a", "a"], "props.x": [1, 2], "props.y": [1, 2]})
+    )
+    incremental_aggregator.add(
+        DataFrame({"cohort_on": ["a"], "props.x": ["three"], "props.y": [3]})
+    )
+    incremental_aggregator.finish()
+
+    with open(f"{output_dir}/data.bin", "rb") as fp:
+        buffer = fp.read()
+    header_length = struct.unpack("<I", buffer[:4])[0]
+    header = json.loads(buffer[4 : 4 + header_length])
+    assert header["a"]["props.x"]["dtype"] == "json"
+    assert header["a"]["props.y"]["dtype"] == "float64"
+    assert read_columnar(f"{output_dir}/data.bin") == {
+        "a": {"props.x": [1, 2, "three"], "props.y": [1.0, 2.0, 3.0]}
+    }
+
+
+def test_Aggregator_aggregate_data_frames_with_process_pool():
+    thread_dir = temp_folder()
+    process_dir = temp_folder()
+    os.makedirs(thread_dir, exist_ok=True)
+    os.makedirs(process_dir, exist_ok=True)
+    data_frame = DataFrame(
+        {
+            "cohort_on": ["b", "a", "c", "a", "b", "a", "c"],
+            "props.x": [1, 2, 3, 4, 5, 6, 7],
+            "props.y": [1.5, 2.5, None, 4.5, 5.5, 6.5, 7.5],
+            "props.text": ["one", "two", "three", "four", "five", "six", "seven"],
+        }
+    )
+    batches = [data_frame.iloc[start : start + 2] for start in range(0, 7, 2)]
+
+    Aggregator.aggregate_data_frames(
+        data_frames=batches, trace_dir=thread_dir, data_format="columnar"
+    )
+    with ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context("spawn")
+    ) as process_pool:
+        Aggregator.aggregate_data_frames(
+            data_frames=batches,
+            trace_dir=process_dir,
+            data_format="columnar",
+            process_pool=process_pool,
+        )
+
+    with open(f"{thread_dir}/data.json") as thread_fp:
+        with open(f"{process_dir}/data.json") as process_fp:
+            assert thread_fp.read() == process_fp.read()
+    with open(f"{thread_dir}/data.bin", "rb") as thread_fp:
+        with open(f"{process_dir}/data.bin", "rb") as process_fp:
+            assert thread_fp.read() == process_fp.read()
+
+
+def _groupby_and_sliced_seconds(rows, columns, cohorts, cohort_type=str):
+    random = numpy.random.default_rng(0)
+    cohort_on = random.integers(0, cohorts, rows)
+    if cohort_type is str:
+        cohort_on = cohort_on.astype(str)
+    elif cohort_type is float:
+        cohort_on = cohort_on / 3
+    elif cohort_type is datetime:
+        cohort_on = to_datetime(cohort_on * 86_400_123, unit="ms", origin="2020-01-01")
+    data = {"cohort_on": cohort_on}
+    for column in range(columns):
+        data[f"props.column_{column}"] = random.random(rows)
+    data_frame = DataFrame(data)
+    groupby_dir = temp_folder()
+    sliced_dir = temp_folder()
+    os.makedirs(groupby_dir, exist_ok=True)
+    os.makedirs(sliced_dir, exist_ok=True)
+
+    start = perf_counter()
+    aggregated = data_frame.groupby("cohort_on").aggregate(list).transpose()
+    with open(f"{groupby_dir}/data.json", "w") as fp:
+        fp.write(aggregated.to_json(default_handler=str))
+    groupby_seconds = perf_counter() - start
+
+    start = perf_counter()
+    Aggregator.aggregate_data_frame(data_frame=data_frame, trace_dir=sliced_dir)
+    sliced_seconds = perf_counter() - start
+
+    with open(f"{groupby_dir}/data.json") as groupby_fp:
+        with open(f"{sliced_dir}/data.json") as sliced_fp:
+            assert groupby_fp.read() == sliced_fp.read()
+    return groupby_seconds, sliced_seconds
+
+
+@pytest.mark.parametrize("cohort_type", [str, int, float, datetime])
+def test_Aggregator_matches_groupby(cohort_type):
+    _groupby_and_sliced_seconds(
+        rows=1000, columns=5, cohorts=10, cohort_type=cohort_type
+    )
+
+
+@pytest.mark.benchmark
+def test_Aggregator_benchmark_against_groupby():
+    groupby_seconds, sliced_seconds = _groupby_and_sliced_seconds(
+        rows=1_000_000, columns=20, cohorts=500
+    )
+    assert sliced_seconds < groupby_seconds
@@ -0,0 +1,43 @@
+from tests.factories.model_factories import JobFactory, TraceFactory
+from tests.support.utils import temp_folder
+from visivo.query.job_durations import (
+    DEFAULT_JOB_DURATION,
+    JobDurations,
+    critical_path_priorities,
+)
+
+
+def test_JobDurations_persists_durations():
+    output_dir = temp_folder()
+    job_durations = JobDurations(output_dir=output_dir)
+    assert job_durations.estimate("job") == DEFAULT_JOB_DURATION
+
+    job_durations.record("job", 4.0)
+    job_durations.record("other_job", 2.0)
+    job_durations.write()
+
+    job_durations = JobDurations(output_dir=output_dir)
+    assert job_durations.estimate("job") == 4.0
+    assert job_durations.estimate("new_job") == 3.0
+
+
+def test_critical_path_priorities():
+    output_dir = temp_folder()
+    jobs = {name: JobFactory(item=TraceFactory(name=name)) for name in "abcd"}
+    # a -> b -> c is the longest chain, d runs on its own but is slow.
+    dependents = {"a": [jobs["b"]], "b": [jobs["c"]], "c": [], "d": []}
+
+    priorities = critical_path_priorities(
+        jobs=list(jobs.values()),
+        dependents=dependents,
+        job_durations=JobDurations(output_dir=output_dir),
+    )
+    assert priorities == {"a": 3.0, "b": 2.0, "c": 1.0, "d": 1.0}
+
+    job_durations = JobDurations(output_dir=output_dir)
+    for name, duration in {"a": 1.0, "b": 1.0, "c": 1.0, "d": 5.0}.items():
+        job_durations.record(name, duration)
+    priorities = critical_path_priorities(
+        jobs=list(jobs.values()), dependents=dependents, job_durations=job_durations
+    )
+    assert priorities == {"a": 3.0, "b": 2.0, "c": 1.0, "d": 5.0}
@@ -0,0 +1,58 @@
+import json
+from tests.factories.model_factories import JobFactory, TraceFactory
+from tests.support.utils import temp_folder
+from visivo.query.job_metrics import RUN_RESULTS_FILE_NAME, JobMetrics, RunResults
+
+
+def test_JobMetrics_timed():
+    metrics = JobMetrics()
+    assert list(metrics.timed("fetch", [1, 2, 3])) == [1, 2, 3]
+    with metrics.time("execute"):
+        pass
+
+    assert metrics.seconds["fetch"] > 0
+    assert metrics.seconds["execute"] > 0
+    assert set(metrics.to_dict().keys()) == {
+        "connect",
+        "execute",
+        "fetch",
+        "aggregate",
+        "serialize",
+        "rows",
+        "bytes",
+    }
+
+
+def test_RunResults_write():
+    output_dir = temp_folder()
+    run_results = RunResults(output_dir=output_dir)
+    metrics = JobMetrics()
+    metrics.rows = 6
+    job = JobFactory(item=TraceFactory(name="trace"))
+    run_results.record(
+        job,
+        status="success",
+        enqueued_at=1.0,
+        started_at=1.5,
+        finished_at=3.0,
+        metrics=metrics,
+    )
+    skipped_job = JobFactory(item=TraceFactory(name="skipped_trace"))
+    run_results.record(skipped_job, status="skipped")
+    run_results.write()
+
+    with open(f"{output_dir}/{RUN_RESULTS_FILE_NAME}") as fp:
+        jobs = json.load(fp)["jobs"]
+    assert jobs[0]["name"] == "trace"
+    assert jobs[0]["type"] == "Trace"
+    assert jobs[0]["queue_wait"] == 0.5
+    assert jobs[0]["duration"] == 1.5
+    assert jobs[0]["rows"] == 6
+    assert jobs[1] == {
+        "name": "skipped_trace",
+        "type": "Trace",
+        "target": job.target.name,
+        "status": "skipped",
+        "queue_wait": None,
+        "duration": None,
+    }
@@ -0,0 +1,82 @@
+import os
+from tests.factories.model_factories import TargetFactory
+from tests.support.utils import temp_folder
+from visivo.query.result_cache import ResultCache
+
+
+def write_data(trace_dir, data):
+    os.makedirs(trace_dir, exist_ok=True)
+    with open(f"{trace_dir}/data.json", "w") as fp:
+        fp.write(data)
+
+
+def test_ResultCache_key():
+    target = TargetFactory(database="first.db")
+    other_target = TargetFactory(database="second.db")
+    key = ResultCache.key(query_string="select 1", target=target)
+    assert key == ResultCache.key(query_string="select 1", target=target)
+    assert key != ResultCache.key(query_string="select 2", target=target)
+    assert key != ResultCache.key(query_string="select 1", target=other_target)
+
+
+def test_ResultCache_key_changes_with_local_files():
+    output_dir = temp_folder()
+    database = f"{output_dir}/local.db"
+    write_data(output_dir, "")
+    os.rename(f"{output_dir}/data.json", database)
+    target = TargetFactory(database=database)
+    key = ResultCache.key(query_string="select 1", target=target)
+    assert key == ResultCache.key(query_string="select 1", target=target)
+
+    with open(database, "w") as fp:
+        fp.write("changed")
+    assert key != ResultCache.key(query_string="select 1", target=target)
+
+
+def test_ResultCache_load_misses_files_removed_while_copying():
+    output_dir = temp_folder()
+    write_data(f"{output_dir}/trace1", "{}")
+    result_cache = ResultCache(output_dir=output_dir, ttl=60)
+    result_cache.store("key", ["data.json"], f"{output_dir}/trace1")
+    os.remove(f"{result_cache.cache_dir}/key/data.json")
+
+    assert not result_cache.load("key", ["data.json"], f"{output_dir}/trace2")
+
+
+def test_ResultCache_store_and_load():
+    output_dir = temp_folder()
+    write_data(f"{output_dir}/trace1", '{"values":{"x":[1]}}')
+    result_cache = ResultCache(output_dir=output_dir, ttl=60)
+
+    assert not result_cache.load("key", ["data.json"], f"{output_dir}/trace2")
+    result_cache.store("key", ["data.json"], f"{output_dir}/trace1")
+
+    os.makedirs(f"{output_dir}/trace2")
+    reopened_cache = ResultCache(output_dir=output_dir, ttl=60)
+    assert reopened_cache.load("key", ["data.json"], f"{output_dir}/trace2")
+    with open(f"{output_dir}/trace2/data.json", "r") as fp:
+        assert fp.read() == '{"values":{"x":[1]}}'
+    assert not reopened_cache.load("key", ["data.json", "data.bin"], output_dir)
+
+
+def test_ResultCache_expired_entry():
+    output_dir = temp_folder()
+    write_data(f"{output_dir}/trace1", "{}")
+    result_cache = ResultCache(output_dir=output_dir, ttl=60)
+    result_cache.store("key", ["data.json"], f"{output_dir}/trace1")
+    result_cache.index["key"]["created_at"] -= 61
+
+    assert not result_cache.load("key", ["data.json"], f"{output_dir}/trace1")
+
+
+def test_ResultCache_evicts_least_recently_used():
+    output_dir = temp_folder()
+    write_data(f"{output_dir}/trace1", "0123456789")
+    result_cache = ResultCache(output_dir=output_dir, ttl=60, max_bytes=25)
+    result_cache.store("first", ["data.json"], f"{output_dir}/trace1")
+    result_cache.store("second", ["data.json"], f"{output_dir}/trace1")
+    result_cache.index["second"]["last_used_at"] -= 10
+    result_cache.store("third", ["data.json"], f"{output_dir}/trace1")
+
+    assert set(result_cache.index.keys()) == {"first", "third"}
+    assert not os.path.exists(f"{result_cache.cache_dir}/second")
@@ -1,3 +1,4 @@
+import json
 from tests.factories.model_factories import (
     CsvScriptModelFactory,
     DashboardFactory,
@@ -36,6 +37,16 @@ def test_Runner_trace_with_default():
     assert os.path.exists(f"{output_dir}/{trace.name}/query.sql")
     assert os.path.exists(f"{output_dir}/{trace.name}/data.json")
 
+    with open(f"{output_dir}/run_results.json") as fp:
+        run_results = json.load(fp)
+    assert len(run_results["jobs"]) == 1
+    job_results = run_results["jobs"][0]
+    assert job_results["name"] == "trace1"
+    assert job_results["status"] == "success"
+    assert job_results["rows"] == 6
+    assert job_results["bytes"] == os.path.getsize(f"{output_dir}/trace1/data.json")
+    assert job_results["execute"] > 0
+
 
 def test_Runner_trace_given_target():
     output_dir = temp_folder()
@@ -99,6 +110,12 @@ def test_runner_with_local_merge_model():
     runner.run()
     assert os.path.exists(f"{output_dir}/{trace.name}/query.sql")
     assert os.path.exists(f"{output_dir}/{trace.name}/data.json")
+    assert [job.name for job in runner.jobs] == ["local_merge_model", "trace1"]
+    assert os.path.exists(f"{output_dir}/.cache/job_durations.json")
+    assert set(runner.job_durations.durations.keys()) == {
+        "local_merge_model",
+        "trace1",
+    }
 
 
 def test_runner_name_filter():
@@ -133,3 +150,69 @@ def test_runner_name_filter():
     runner.run()
     assert os.path.exists(f"{output_dir}/{trace.name}/query.sql")
     assert os.path.exists(f"{output_dir}/{trace.name}/data.json")
+
+
+def test_runner_job_graph():
+    output_dir = temp_folder()
+    model = CsvScriptModelFactory(name="csv_script_model")
+    trace = TraceFactory(name="trace1", model=model)
+    project = ProjectFactory(targets=[], traces=[trace], dashboards=[])
+
+    runner = Runner(project=project, output_dir=output_dir)
+    runner.jobs = runner._all_jobs()
+    runner._build_job_graph()
+
+    assert runner.remaining_dependencies == {"trace1": 1, "csv_script_model": 0}
+    assert [job.name for job in runner.dependents["csv_script_model"]] == ["trace1"]
+    assert runner.dependents["trace1"] == []
+
+
+def test_Runner_trace_with_result_cache():
+    output_dir = temp_folder()
+    target = TargetFactory(database=f"{output_dir}/test.sqlite")
+    model = SqlModelFactory(name="model1", target=target)
+    trace = TraceFactory(name="trace1", model=model)
+    project = ProjectFactory(targets=[], traces=[trace], dashboards=[])
+
+    create_file_database(url=target.url(), output_dir=output_dir)
+
+    os.makedirs(f"{output_dir}/{trace.name}", exist_ok=True)
+    with open(f"{output_dir}/{trace.name}/query.sql", "w") as fp:
+        fp.write("select *, 'values' as 'cohort_on' from test_table")
+
+    Runner(project=project, output_dir=output_dir, cache_ttl=60).run()
+    with open(f"{output_dir}/{trace.name}/data.json", "r") as fp:
+        data = fp.read()
+    os.remove(target.database)
+    os.remove(f"{output_dir}/{trace.name}/data.json")
+
+    runner = Runner(project=project, output_dir=output_dir, cache_ttl=60)
+    runner.run()
+    assert runner.errors == []
+    with open(f"{output_dir}/{trace.name}/data.json", "r") as fp:
+        assert fp.read() == data
+
+
+def test_Runner_trace_with_hybrid_executor():
+    output_dir = temp_folder()
+    target = TargetFactory(database=f"{output_dir}/test.sqlite")
+    model = SqlModelFactory(name="model1", target=target)
+    trace = TraceFactory(name="trace1", model=model)
+    project = ProjectFactory(targets=[], traces=[trace], dashboards=[])
+
+    create_file_database(url=target.url(), output_dir=output_dir)
+
+    os.makedirs(f"{output_dir}/{trace.name}", exist_ok=True)
+    with open(f"{output_dir}/{trace.name}/query.sql", "w") as fp:
+        fp.write("select *, 'values' as 'cohort_on' from test_table")
+
+    Runner(project=project, output_dir=output_dir).run()
+    with open(f"{output_dir}/{trace.name}/data.json", "r") as fp:
+        thread_data = fp.read()
+
+    runner = Runner(project=project, output_dir=output_dir, executor="hybrid")
+    runner.run()
+    assert runner.errors == []
+    assert runner.process_pool is None
+    with open(f"{output_dir}/{trace.name}/data.json", "r") as fp:
+        assert fp.read() == thread_data
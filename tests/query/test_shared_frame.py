@@ -0,0 +1,29 @@
+from pandas import DataFrame, date_range
+from visivo.query.shared_frame import SharedFrame, read_shared_frame
+
+
+def test_SharedFrame_round_trip():
+    data_frame = DataFrame(
+        {
+            "cohort_on": ["a", "b", "a"],
+            "props.x": [1, 2, 3],
+            "props.y": [1.5, None, 3.5],
+            "props.flag": [True, False, True],
+            "props.date": date_range("2024-01-01", periods=3),
+        }
+    )
+    shared_frame = SharedFrame(data_frame)
+    assert shared_frame.shared_memory is not None
+    assert list(shared_frame.objects.keys()) == ["cohort_on"]
+
+    assert read_shared_frame(shared_frame.handle).equals(data_frame)
+    shared_frame.close()
+    assert shared_frame.shared_memory is None
+
+
+def test_SharedFrame_empty():
+    data_frame = DataFrame({"cohort_on": [], "props.x": []})
+    shared_frame = SharedFrame(data_frame)
+    assert shared_frame.shared_memory is None
+    assert read_shared_frame(shared_frame.handle).equals(data_frame)
+    shared_frame.close()
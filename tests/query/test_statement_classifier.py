@@ -1,4 +1,10 @@
-from visivo.query.statement_classifier import StatementClassifier, StatementEnum
+from time import perf_counter
+import pytest
+from visivo.query.statement_classifier import (
+    StatementClassifier,
+    StatementEnum,
+    statement_classifier,
+)
 from visivo.query.dialect import Dialect
 
 
@@ -47,3 +53,69 @@ def test_statement_classifier_snowflake():
     # non-postgres aggregate functions should evaluate to vanilla
     statement = "group_concat(column_a + 1)"
     assert statement_classifier.classify(statement) == StatementEnum.vanilla
+
+
+def test_statement_classifier_nested_and_quoted():
+    statement_classifier = StatementClassifier(dialect=Dialect(type="postgresql"))
+
+    statement = "count(distinct case when (a > 1) then b end)"
+    assert statement_classifier.classify(statement) == StatementEnum.aggregate
+
+    statement = "row_number() OVER (partition by (a + b) order by c)"
+    assert statement_classifier.classify(statement) == StatementEnum.window
+
+    statement = "checksum(a) + rollover(b)"
+    assert statement_classifier.classify(statement) == StatementEnum.vanilla
+
+    statement = "'sum(a)' || \"count(b)\""
+    assert statement_classifier.classify(statement) == StatementEnum.vanilla
+
+    statement = "sum(a"
+    assert statement_classifier.classify(statement) == StatementEnum.vanilla
+
+
+def test_statement_classifier_is_shared_per_dialect():
+    assert statement_classifier("sqlite") is statement_classifier("sqlite")
+    assert statement_classifier("sqlite") is not statement_classifier("snowflake")
+
+
+def test_statement_classifier_memoizes_classifications():
+    statement_classifier = StatementClassifier(dialect=Dialect(type="postgresql"))
+    statements = ["sum(a)", "b + 1", "row_number() over (order by c)"]
+
+    for _ in range(3):
+        for statement in statements:
+            statement_classifier.classify(statement)
+
+    cache_info = statement_classifier.classify.cache_info()
+    assert cache_info.misses == 3
+    assert cache_info.hits == 6
+
+
+def _classify_seconds(statement_count):
+    templates = [
+        "sum(amount_{i})",
+        "x_{i} + 1",
+        "count(distinct case when (a_{i} > 1) then b end)",
+        "row_number() over (partition by c_{i} order by d)",
+    ]
+    statements = [
+        templates[i % len(templates)].format(i=i) for i in range(statement_count)
+    ]
+    statement_classifier = StatementClassifier(dialect=Dialect(type="postgresql"))
+    start = perf_counter()
+    for statement in statements:
+        statement_classifier.classify(statement)
+    first_pass = perf_counter() - start
+    start = perf_counter()
+    for statement in statements:
+        statement_classifier.classify(statement)
+    return first_pass, perf_counter() - start
+
+
+@pytest.mark.benchmark
+def test_statement_classifier_benchmark():
+    first_pass, memoized_pass = _classify_seconds(100_000)
+
+    assert first_pass < 5
+    assert memoized_pass < first_pass / 4
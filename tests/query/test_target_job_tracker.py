@@ -1,6 +1,13 @@
-from tests.factories.model_factories import JobFactory, TargetFactory
-from visivo.query.jobs.job import Job
-from visivo.query.target_job_tracker import TargetJobTracker
+import heapq
+import pytest
+from contextlib import ExitStack
+from time import perf_counter
+from tests.factories.model_factories import JobFactory, TargetFactory, TraceFactory
+from visivo.models.targets.connection_pool import ConnectionPoolRegistry
+from visivo.models.targets.postgresql_target import PostgresqlTarget
+from visivo.models.targets.snowflake_target import SnowflakeTarget
+from visivo.query.jobs.job import Job, JobResult
+from visivo.query.target_job_tracker import AdaptiveConcurrency, TargetJobTracker
 
 
 class MockFuture:
@@ -20,10 +27,12 @@ def test_TargetJobTracker_is_accepting_job():
     assert target_job_limits.is_accepting_job(job)
 
     job.set_future(MockFuture(False))
+    target_job_limits.start_job(job)
 
     assert not target_job_limits.is_accepting_job(job)
 
     job.set_future(MockFuture(True))
+    target_job_limits.finish_job(job)
 
     assert target_job_limits.is_accepting_job(job)
 
@@ -36,6 +45,7 @@ def test_TargetJobTracker_is_job_name_done():
     assert not target_job_limits.is_job_name_done(job_name=job.name)
 
     job.set_future(MockFuture(True))
+    target_job_limits.finish_job(job)
 
     assert target_job_limits.is_job_name_done(job_name=job.name)
 
@@ -48,10 +58,12 @@ def test_TargetJobTracker_enqueued():
     assert target_job_limits.is_job_name_enqueued(job_name=job.name)
 
     job.set_future(MockFuture(False))
+    target_job_limits.start_job(job)
 
     assert target_job_limits.is_job_name_enqueued(job_name=job.name)
 
     job.set_future(MockFuture(True))
+    target_job_limits.finish_job(job)
 
     assert target_job_limits.is_job_name_enqueued(job_name=job.name)
 
@@ -83,5 +95,173 @@ def test_TargetJobTracker_is_done():
     assert not target_job_limits.is_done()
 
     job.set_future(MockFuture(True))
+    target_job_limits.finish_job(job)
 
     assert target_job_limits.is_done()
+
+
+def test_TargetJobTracker_startable_jobs():
+    target_job_limits = TargetJobTracker()
+    job = JobFactory()
+    other_job = JobFactory(item=TraceFactory(name="other trace"))
+    target_job_limits.track_job(job)
+    target_job_limits.track_job(other_job)
+
+    assert target_job_limits.startable_jobs(job.target) == [job]
+
+    job.set_future(MockFuture(False))
+    target_job_limits.start_job(job)
+
+    assert target_job_limits.startable_jobs(job.target) == []
+
+    job.set_future(MockFuture(True))
+    target_job_limits.finish_job(job)
+
+    assert target_job_limits.startable_jobs(job.target) == [other_job]
+
+
+def _tracker_seconds_per_job(job_count):
+    target = TargetFactory()
+    trace = TraceFactory()
+    jobs = []
+    for index in range(job_count):
+        job = Job(item=trace, target=target, action=None)
+        job.item = trace.model_copy(update={"name": f"trace {index}"})
+        jobs.append(job)
+
+    best = None
+    for _ in range(3):
+        target_job_limits = TargetJobTracker()
+        start = perf_counter()
+        for job in jobs:
+            target_job_limits.track_job(job)
+        for job in jobs:
+            target_job_limits.is_job_name_enqueued(job.name)
+            target_job_limits.startable_jobs(target)
+            target_job_limits.start_job(job)
+            target_job_limits.is_accepting_job(job)
+            target_job_limits.finish_job(job)
+            target_job_limits.is_job_name_done(job.name)
+        target_job_limits.is_done()
+        elapsed = (perf_counter() - start) / job_count
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def test_TargetJobTracker_heap_work_per_job_is_flat(mocker):
+    heappop = mocker.spy(heapq, "heappop")
+    for job_count in [100, 1000]:
+        heappop.reset_mock()
+        _tracker_seconds_per_job(job_count)
+        # At most two pops per job in each of the three passes over the jobs.
+        assert heappop.call_count <= 2 * 3 * job_count
+
+
+@pytest.mark.benchmark
+def test_TargetJobTracker_overhead_is_flat():
+    small = _tracker_seconds_per_job(100)
+    large = _tracker_seconds_per_job(10000)
+
+    assert large < small * 10
+
+
+def test_AdaptiveConcurrency_increases_and_backs_off():
+    adaptive_concurrency = AdaptiveConcurrency(initial=1, minimum=1, maximum=4)
+    for _ in range(20):
+        adaptive_concurrency.observe(latency=1.0, success=True)
+    assert adaptive_concurrency.limit == 4
+
+    adaptive_concurrency.observe(latency=1.0, success=False)
+    assert adaptive_concurrency.limit == 2
+
+    adaptive_concurrency.observe(latency=5.0, success=True)
+    assert adaptive_concurrency.limit == 1
+    assert adaptive_concurrency.peak == 4
+
+
+class MockResultFuture(MockFuture):
+    def __init__(self, success):
+        super().__init__(True)
+        self.success = success
+
+    def exception(self):
+        return None
+
+    def result(self):
+        return JobResult(success=self.success, message="")
+
+
+def test_TargetJobTracker_adapts_concurrency():
+    target_job_tracker = TargetJobTracker(max_concurrency=3)
+    target = TargetFactory()
+    jobs = [JobFactory(item=TraceFactory(name=f"trace{i}")) for i in range(6)]
+    for job in jobs:
+        job.target = target
+        target_job_tracker.track_job(job)
+
+    def run_startable_jobs(success):
+        startable_jobs = target_job_tracker.startable_jobs(target)
+        for job in startable_jobs:
+            job.set_future(MockFuture(False))
+            target_job_tracker.start_job(job)
+        for job in startable_jobs:
+            job.set_future(MockResultFuture(success))
+            target_job_tracker.finish_job(job)
+        return len(startable_jobs)
+
+    assert run_startable_jobs(success=True) == 1
+    assert run_startable_jobs(success=True) == 2
+    assert run_startable_jobs(success=False) == 2
+    assert target_job_tracker.concurrency_report() == [
+        "target: 1 concurrent queries (peak 2)"
+    ]
+
+
+def test_TargetJobTracker_startable_jobs_by_priority():
+    target_job_tracker = TargetJobTracker()
+    target = TargetFactory()
+    jobs = [JobFactory(item=TraceFactory(name=f"trace{i}")) for i in range(4)]
+    for job, priority in zip(jobs, [1.0, 3.0, 2.0, 3.0]):
+        job.target = target
+        job.priority = priority
+        target_job_tracker.track_job(job)
+
+    started_job_names = []
+    while startable_jobs := target_job_tracker.startable_jobs(target):
+        job = startable_jobs[0]
+        started_job_names.append(job.name)
+        job.set_future(MockFuture(False))
+        target_job_tracker.start_job(job)
+        job.set_future(MockFuture(True))
+        target_job_tracker.finish_job(job)
+
+    assert started_job_names == ["trace1", "trace3", "trace2", "trace0"]
+
+
+def test_TargetJobTracker_sizes_pools_for_max_concurrency(mocker):
+    ConnectionPoolRegistry.close()
+    connect = mocker.patch("snowflake.connector.connect")
+    snowflake_target = SnowflakeTarget(
+        name="snowflake", database="database", type="snowflake"
+    )
+    postgresql_target = PostgresqlTarget(
+        name="postgresql",
+        database="database",
+        type="postgresql",
+        host="localhost",
+        connection_pool_size=1,
+    )
+    target_job_tracker = TargetJobTracker(max_concurrency=3)
+    for target in [snowflake_target, postgresql_target]:
+        job = JobFactory(item=TraceFactory(name=f"trace_{target.name}"))
+        job.target = target
+        target_job_tracker.track_job(job)
+
+    assert postgresql_target.get_engine().pool.size() == 3
+    assert snowflake_target.get_pool().size == 3
+    with ExitStack() as stack:
+        connections = [
+            stack.enter_context(snowflake_target.connect()) for _ in range(3)
+        ]
+    assert len(connections) == 3
+    assert connect.call_count == 3
@@ -0,0 +1,89 @@
+import os
+from tests.factories.model_factories import (
+    ProjectFactory,
+    SqlModelFactory,
+    TargetFactory,
+    TraceFactory,
+)
+from tests.support.utils import temp_folder
+from visivo.query import trace_compiler as trace_compiler_module
+from visivo.query.trace_compiler import TraceCompiler
+
+
+def _project():
+    model = SqlModelFactory(target=TargetFactory())
+    traces = [TraceFactory(name="trace1", model=model)] + [
+        TraceFactory(name=f"trace{i}", model="ref(model)") for i in range(2, 5)
+    ]
+    return ProjectFactory(targets=[], traces=traces, dashboards=[])
+
+
+def test_TraceCompiler_resolves_target_once_per_model():
+    output_dir = temp_folder()
+    project = _project()
+    trace_compiler = TraceCompiler(dag=project.dag(), output_dir=output_dir)
+
+    tokenized_traces = trace_compiler.compile(project.traces)
+
+    assert set(tokenized_traces.keys()) == {"trace1", "trace2", "trace3", "trace4"}
+    assert [model.name for model in trace_compiler.targets.keys()] == ["model"]
+    for trace in project.traces:
+        assert os.path.exists(f"{output_dir}/{trace.name}/query.sql")
+        assert trace.changed
+
+
+def test_TraceCompiler_compiles_in_parallel():
+    serial_output_dir = temp_folder()
+    parallel_output_dir = temp_folder()
+    project = _project()
+
+    serial_tokenized_traces = TraceCompiler(
+        dag=project.dag(), output_dir=serial_output_dir
+    ).compile(project.traces)
+    parallel_tokenized_traces = TraceCompiler(
+        dag=project.dag(), output_dir=parallel_output_dir, parallel_threshold=1
+    ).compile(project.traces)
+
+    assert parallel_tokenized_traces == serial_tokenized_traces
+    for trace in project.traces:
+        with open(f"{serial_output_dir}/{trace.name}/query.sql") as serial_file:
+            with open(f"{parallel_output_dir}/{trace.name}/query.sql") as fp:
+                assert fp.read() == serial_file.read()
+
+
+def test_TraceCompiler_only_compiles_changed_traces(mocker):
+    output_dir = temp_folder()
+    project = _project()
+    TraceCompiler(dag=project.dag(), output_dir=output_dir).compile(project.traces)
+
+    project = _project()
+    project.traces[1].cohort_on = "x"
+    compile_trace = mocker.spy(trace_compiler_module, "compile_trace")
+    tokenized_traces = TraceCompiler(dag=project.dag(), output_dir=output_dir).compile(
+        project.traces
+    )
+
+    assert compile_trace.call_count == 1
+    assert [trace.changed for trace in project.traces] == [False, True, False, False]
+    assert tokenized_traces["trace2"].cohort_on == "x"
+    assert tokenized_traces["trace1"].cohort_on == "'trace1'"
+
+
+def test_TraceCompiler_key_without_installed_package(mocker):
+    project = _project()
+    trace = project.traces[0]
+    compiler = TraceCompiler(dag=project.dag(), output_dir=temp_folder())
+    model = compiler.model(trace)
+    target = compiler.target(model)
+    trace_compiler_module.visivo_version.cache_clear()
+    mocker.patch.object(
+        trace_compiler_module,
+        "version",
+        side_effect=trace_compiler_module.PackageNotFoundError("visivo"),
+    )
+
+    try:
+        key = TraceCompiler.key(trace, model, target)
+        assert key == TraceCompiler.key(trace, model, target)
+    finally:
+        trace_compiler_module.visivo_version.cache_clear()
@@ -0,0 +1,108 @@
+import os
+from pandas import DataFrame
+from tests.support.utils import temp_folder
+from visivo.models.tokenized_trace import TokenizedTrace
+from visivo.query.trace_fuser import FusedQuery, FusedTrace, TraceFuser
+
+
+def tokenized_trace(**kwargs):
+    data = {
+        "sql": "select * from test_table",
+        "cohort_on": "'trace'",
+        "target": "target",
+        "select_items": {"props.x": "x", "props.y": "y"},
+        "groupby_statements": ["x", "y"],
+    }
+    data.update(kwargs)
+    return TokenizedTrace(**data)
+
+
+def test_TraceFuser_fuse():
+    tokenized_traces = {
+        "first": tokenized_trace(cohort_on="'first'"),
+        "second": tokenized_trace(
+            cohort_on="'second'",
+            select_items={"props.x": "x", "props.y": "sum(y)"},
+            groupby_statements=["x"],
+        ),
+        "third": tokenized_trace(
+            cohort_on="'third'", select_items={"props.x": "x", "props.z": "y"}
+        ),
+        "fourth": tokenized_trace(cohort_on="'fourth'", groupby_statements=["y", "x"]),
+        "other_sql": tokenized_trace(sql="select * from other_table"),
+    }
+    fused = TraceFuser(tokenized_traces).fuse()
+
+    assert len(fused) == 1
+    fused_query, fused_trace = fused[0]
+    assert fused_query.name == "first"
+    assert list(fused_query.traces.keys()) == ["first", "fourth", "third"]
+    assert fused_trace.select_items == {"fused.0": "x", "fused.1": "y"}
+    assert fused_trace.cohort_on == "'first'"
+    assert fused_query.traces["third"].columns == {
+        "props.x": "fused.0",
+        "props.z": "fused.1",
+    }
+    assert fused_query.traces["fourth"].cohort == "fourth"
+
+
+def test_TraceFuser_fuse_shared_cohort_on():
+    tokenized_traces = {
+        "first": tokenized_trace(cohort_on="y"),
+        "second": tokenized_trace(cohort_on="y", select_items={"props.x": "x * 2"}),
+        "third": tokenized_trace(cohort_on="'third'"),
+    }
+    fused = TraceFuser(tokenized_traces).fuse()
+
+    assert len(fused) == 1
+    fused_query, fused_trace = fused[0]
+    assert list(fused_query.traces.keys()) == ["first", "second"]
+    assert fused_query.traces["second"].cohort is None
+    assert fused_trace.select_items == {
+        "fused.0": "x",
+        "fused.1": "y",
+        "fused.2": "x * 2",
+    }
+
+
+def test_FusedTrace_split():
+    data_frame = DataFrame(
+        {"fused.0": [1, 2], "fused.1": [3, 4], "cohort_on": ["first", "first"]}
+    )
+    fused_trace = FusedTrace(
+        columns={"props.y": "fused.1", "props.x": "fused.0"}, cohort="it's"
+    )
+    assert fused_trace.split(data_frame).to_dict(orient="list") == {
+        "props.y": [3, 4],
+        "props.x": [1, 2],
+        "cohort_on": ["it's", "it's"],
+    }
+
+
+def test_FusedQuery_write_and_read_all():
+    output_dir = temp_folder()
+    assert FusedQuery.read_all(output_dir) == []
+    fused_query = FusedQuery(
+        name="first", traces={"first": FusedTrace(columns={"props.x": "fused.0"})}
+    )
+    fused_query.write(output_dir=output_dir, query_string="select 1")
+
+    assert FusedQuery.read_all(output_dir) == [fused_query]
+    with open(fused_query.query_file(output_dir), "r") as fp:
+        assert fp.read() == "select 1"
+    FusedQuery.clear(output_dir)
+    assert FusedQuery.read_all(output_dir) == []
+
+
+def test_FusedQuery_clear_keeps_trace_named_fused():
+    output_dir = temp_folder()
+    os.makedirs(f"{output_dir}/fused")
+    with open(f"{output_dir}/fused/data.json", "w") as fp:
+        fp.write("{}")
+    FusedQuery(name="first", traces={}).write(
+        output_dir=output_dir, query_string="select 1"
+    )
+
+    FusedQuery.clear(output_dir)
+    assert FusedQuery.read_all(output_dir) == []
+    assert os.path.exists(f"{output_dir}/fused/data.json")
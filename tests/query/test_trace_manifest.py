@@ -0,0 +1,82 @@
+import hashlib
+import os
+import shutil
+from tests.support.utils import temp_file, temp_folder
+from visivo.query.trace_manifest import TraceManifest
+
+
+def test_TraceManifest_scan_and_entries():
+    output_dir = temp_folder()
+    temp_file("data.json", '{"a": 1}', output_dir=f"{output_dir}/first")
+    temp_file("data.bin", "columnar", output_dir=f"{output_dir}/first")
+    temp_file("data.json", '{"b": 2}', output_dir=f"{output_dir}/second")
+    temp_file("query.sql", "select 1", output_dir=f"{output_dir}/no_data")
+    trace_manifest = TraceManifest(output_dir=output_dir)
+    trace_manifest.scan()
+
+    entries = trace_manifest.entries()
+    assert [entry["name"] for entry in entries] == ["first", "second"]
+    assert entries[0] == {
+        "name": "first",
+        "id": "first",
+        "format": "json",
+        "signed_data_file_url": "/data/first/data.json",
+        "size": 8,
+        "hash": hashlib.blake2b(b'{"a": 1}', digest_size=16).hexdigest(),
+    }
+
+    entries = trace_manifest.entries(data_format="columnar")
+    assert [entry["format"] for entry in entries] == ["columnar", "json"]
+
+    entries = trace_manifest.entries(trace_names=["second", "missing"])
+    assert [entry["name"] for entry in entries] == ["second"]
+
+    entries = trace_manifest.entries(offset=1, limit=1)
+    assert [entry["name"] for entry in entries] == ["second"]
+
+
+def test_TraceManifest_entries_are_served_from_memory(mocker):
+    output_dir = temp_folder()
+    temp_file("data.json", "{}", output_dir=f"{output_dir}/trace")
+    trace_manifest = TraceManifest(output_dir=output_dir)
+    trace_manifest.scan()
+
+    stat = mocker.spy(os, "stat")
+    exists = mocker.spy(os.path, "exists")
+    assert len(trace_manifest.entries()) == 1
+    stat.assert_not_called()
+    exists.assert_not_called()
+
+
+def test_TraceManifest_update_and_project_id():
+    output_dir = temp_folder()
+    trace_manifest = TraceManifest(output_dir=output_dir)
+    trace_manifest.set_project_id("project")
+    trace_manifest.update("trace")
+    assert trace_manifest.entries() == []
+
+    file = temp_file("data.json", "{}", output_dir=f"{output_dir}/trace")
+    trace_manifest.update("trace", project_id="project")
+    assert len(trace_manifest.entries(project_id="project")) == 1
+    assert trace_manifest.entries(project_id="other_project") == []
+
+    first_hash = trace_manifest.entries()[0]["hash"]
+    file.write_text("[]")
+    trace_manifest.update("trace")
+    assert trace_manifest.entries()[0]["hash"] != first_hash
+
+
+def test_TraceManifest_prunes_deleted_traces():
+    output_dir = temp_folder()
+    temp_file("data.json", "{}", output_dir=f"{output_dir}/first")
+    temp_file("data.json", "{}", output_dir=f"{output_dir}/second")
+    trace_manifest = TraceManifest(output_dir=output_dir)
+    trace_manifest.scan()
+
+    shutil.rmtree(f"{output_dir}/first")
+    trace_manifest.update("first")
+    assert [entry["name"] for entry in trace_manifest.entries()] == ["second"]
+
+    shutil.rmtree(f"{output_dir}/second")
+    trace_manifest.scan()
+    assert trace_manifest.entries() == []
@@ -18,6 +18,26 @@ def test_TraceTonkenizer():
     assert trace_dict["target"] == "target"
 
 
+def test_TraceTonkenizer_does_not_dump_trace(mocker):
+    trace = TraceFactory()
+    model_dump = mocker.spy(Trace, "model_dump")
+    TraceTokenizer(trace=trace, model=trace.model, target=TargetFactory()).tokenize()
+    model_dump.assert_not_called()
+
+
+def test_TraceTonkenizer_nested_query():
+    data = {
+        "name": "trace",
+        "props": {"type": "bar", "x": "query(coalesce(f(x), ')'))"},
+        "model": {"sql": "select * from table"},
+    }
+    trace = Trace(**data)
+    tokenized_trace = TraceTokenizer(
+        trace=trace, model=trace.model, target=TargetFactory()
+    ).tokenize()
+    assert tokenized_trace.select_items == {"props.x": "coalesce(f(x), ')')"}
+
+
 def test_TraceTonkenizer_surface():
     trace = TraceFactory(surface_props=True)
     target = TargetFactory()
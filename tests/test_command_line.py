@@ -1,6 +1,9 @@
 from visivo.command_line import load_env
 from tests.support.utils import temp_file
 import os
+import pytest
+import subprocess
+import sys
 
 
 def test_CommandLine_env_load_exists():
@@ -12,3 +15,39 @@ def test_CommandLine_env_load_exists():
 def test_CommandLine_env_load_does_not_exists():
     load_env(".env.no-exist")
     assert os.getenv("OTHER_VALUE") == None
+
+
+def _import_command_line():
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import visivo.command_line\n"
+        "print(time.perf_counter() - start)\n"
+        "print(' '.join(sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout.split("\n")
+    return float(output[0]), output[1].split(" ")
+
+
+def test_CommandLine_import_defers_heavy_modules():
+    _, modules = _import_command_line()
+
+    for module in [
+        "visivo.models.trace_props",
+        "pandas",
+        "sqlalchemy",
+        "pydantic",
+        "matplotlib",
+        "git",
+        "flask",
+        "livereload",
+    ]:
+        assert module not in modules
+
+
+@pytest.mark.benchmark
+def test_CommandLine_import_benchmark():
+    import_time, _ = _import_command_line()
+    assert import_time < 1
@@ -51,16 +51,6 @@ def test_list_all_ymls_in_dir():
     assert all([file in yaml_list for file in expected_yaml_list])
 
 
-def test_extract_value_from_function():
-    function_string = "test(args)"
-    argument = extract_value_from_function(function_string, "test")
-    assert argument == "args"
-
-    function_string = "test( args )"
-    argument = extract_value_from_function(function_string, "test")
-    assert argument == "args"
-
-
 def test_load_yaml_file_with_backslash(monkeypatch):
     password = "^%$#@!~&\\4'a\"}{|+_}"
     monkeypatch.setenv("PASSWORD", password)
@@ -0,0 +1 @@
+file
\ No newline at end of file
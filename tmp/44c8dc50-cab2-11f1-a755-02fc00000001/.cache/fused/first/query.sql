@@ -0,0 +1,20 @@
+WITH 
+base_query as (
+    select * from test_table
+),
+columnize_cohort_on as (
+    SELECT 
+        *,
+        'first' as "cohort_on"
+    FROM base_query
+)
+SELECT
+            x as "fused.0",
+            y as "fused.1",
+    "cohort_on"
+FROM columnize_cohort_on
+    GROUP BY
+        x  , 
+        y ,
+    "cohort_on" 
+-- target: target
\ No newline at end of file
@@ -0,0 +1 @@
+select * from test_table
\ No newline at end of file
@@ -0,0 +1 @@
+query string
\ No newline at end of file
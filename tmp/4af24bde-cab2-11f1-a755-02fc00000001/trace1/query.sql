@@ -0,0 +1 @@
+select *, 'values' as 'cohort_on' from test_table
\ No newline at end of file
@@ -0,0 +1 @@
+select *, 'value' as 'cohort_on' from model
\ No newline at end of file
@@ -0,0 +1 @@
+select t1.x as x, t2.y as y, 'values' as 'cohort_on' from model1.test_table t1 JOIN model2.test_table t2 on t1.x=t2.x
\ No newline at end of file
@@ -0,0 +1 @@
+select *, 'values' as 'cohort_on' from no_exist
\ No newline at end of file
@@ -1,6 +1,6 @@
 export const fetchTraces = async (projectId, traceNames) => {
-    const traceNameParams = traceNames.map(t => `trace_names=${t}`).join("&")
-    const response = await fetch(`/api/traces/?project_id=${projectId}&${traceNameParams}`);
+    const traceNameParams = traceNames.map(t => `trace_names=${encodeURIComponent(t)}`).join("&")
+    const response = await fetch(`/api/traces/?project_id=${encodeURIComponent(projectId)}&format=columnar&${traceNameParams}`);
     if (response.status === 200) {
         return await response.json();
     } else {
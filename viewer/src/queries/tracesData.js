@@ -1,3 +1,24 @@
+export const parseColumnarData = (buffer) => {
+    const headerLength = new DataView(buffer).getUint32(0, true)
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength)))
+    const dataOffset = 4 + headerLength
+    const decoder = new TextDecoder()
+    const traceJson = {}
+    Object.keys(header).forEach((cohortOn) => {
+        traceJson[cohortOn] = {}
+        Object.keys(header[cohortOn]).forEach((column) => {
+            const columnHeader = header[cohortOn][column]
+            const columnOffset = dataOffset + columnHeader.offset
+            if (columnHeader.dtype === "float64") {
+                traceJson[cohortOn][column] = new Float64Array(buffer, columnOffset, columnHeader.length)
+            } else {
+                traceJson[cohortOn][column] = JSON.parse(decoder.decode(new Uint8Array(buffer, columnOffset, columnHeader.bytes)))
+            }
+        })
+    })
+    return traceJson
+}
+
 export const fetchTracesData = async (traces) => {
     if (traces.length === 0) {
         return {}
@@ -7,8 +28,11 @@ export const fetchTracesData = async (traces) => {
         traces.map(async (trace) => {
             //This should use react query to reduce calls
             const traceResponse = await fetch(trace.signed_data_file_url);
-            const traceJson = await traceResponse.json();
-            returnJson[trace.name] = traceJson;
+            if (trace.format === "columnar") {
+                returnJson[trace.name] = parseColumnarData(await traceResponse.arrayBuffer());
+            } else {
+                returnJson[trace.name] = await traceResponse.json();
+            }
         })
     )
 
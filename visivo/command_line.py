@@ -1,10 +1,7 @@
 import click
 import os
-import importlib
 from dotenv import load_dotenv
-from pydantic import ValidationError
 from visivo.logging.logger import Logger, TypeEnum
-from visivo.parsers.line_validation_error import LineValidationError
 
 from .commands.deploy import deploy
 from .commands.serve import serve
@@ -18,7 +15,7 @@ from .commands.archive import archive
 
 @click.group()
 @click.option("-e", "--env-file", default=".env")
-@click.version_option(version=importlib.metadata.version('visivo'))
+@click.version_option(package_name="visivo")
 def visivo(env_file):
     Logger.instance().set_type(TypeEnum.spinner)
     load_env(env_file)
@@ -43,10 +40,15 @@ def load_env(env_file):
 def safe_visivo():
     try:
         visivo(standalone_mode=False)
-    except (ValidationError, LineValidationError) as e:
-        Logger.instance().error(str(e))
-        exit(1)
     except Exception as e:
+        # Imported here so that commands which never validate a project do not load
+        # pydantic at startup.
+        from pydantic import ValidationError
+        from visivo.parsers.line_validation_error import LineValidationError
+
+        if isinstance(e, (ValidationError, LineValidationError)):
+            Logger.instance().error(str(e))
+            exit(1)
         if "STACKTRACE" in os.environ and os.environ["STACKTRACE"] == "true":
             raise e
         Logger.instance().error("An unexpected error has occurred")
@@ -1,6 +1,5 @@
 import click
-from visivo.query.aggregator import Aggregator
-from .options import output_dir
+from .options import output_dir, data_format
 
 
 @click.command()
@@ -8,12 +7,15 @@ from .options import output_dir
 @click.option(
     "-j", "--json-file", help="The file with the raw json results from the query"
 )
-def aggregate(output_dir, json_file):
+@data_format
+def aggregate(output_dir, json_file, data_format):
     from visivo.logging.logger import Logger
 
     Logger.instance().debug("Aggregating")
 
-    from visivo.query.runner import Runner
+    from visivo.query.aggregator import Aggregator
 
-    Aggregator.aggregate(trace_dir=output_dir, json_file=json_file)
+    Aggregator.aggregate(
+        trace_dir=output_dir, json_file=json_file, data_format=data_format
+    )
     Logger.instance().success("Done")
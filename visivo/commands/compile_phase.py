@@ -3,25 +3,28 @@ import os
 import yaml
 from visivo.discovery.discover import Discover
 from visivo.models.defaults import Defaults
-from visivo.models.models.csv_script_model import CsvScriptModel
-from visivo.models.targets.target import Target
-from visivo.models.models.model import Model
-from visivo.models.base.parent_model import ParentModel
 from visivo.parsers.parser_factory import ParserFactory
 from visivo.parsers.serializer import Serializer
 from visivo.query.query_string_factory import QueryStringFactory
-from visivo.query.trace_tokenizer import TraceTokenizer
-from visivo.query.query_writer import QueryWriter
+from visivo.query.trace_compiler import TraceCompiler
+from visivo.query.trace_fuser import FusedQuery, TraceFuser
 from visivo.logging.logger import Logger
 
 
 def compile_phase(
-    default_target: str, working_dir: str, output_dir: str, name_filter: str = None
+    default_target: str,
+    working_dir: str,
+    output_dir: str,
+    name_filter: str = None,
+    fuse_traces: bool = False,
 ):
     Logger.instance().debug("Compiling project")
-    discover = Discover(working_directory=working_dir)
+    cache_dir = f"{output_dir}/.cache"
+    discover = Discover(working_directory=working_dir, cache_dir=cache_dir)
     parser = ParserFactory().build(
-        project_file=discover.project_file, files=discover.files
+        project_file=discover.project_file,
+        files=discover.files,
+        cache_dir=cache_dir,
     )
     project = None
     try:
@@ -44,24 +47,15 @@ def compile_phase(
         serializer = Serializer(project=project)
         fp.write(serializer.dereference().model_dump_json(exclude_none=True))
 
-    dag = project.dag()
-    for trace in project.filter_traces(name_filter=name_filter):
-        model = ParentModel.all_descendants_of_type(
-            type=Model, dag=dag, from_node=trace
-        )[0]
-        if isinstance(model, CsvScriptModel):
-            target = model.get_sqlite_target(output_dir=output_dir)
-        else:
-            target = ParentModel.all_descendants_of_type(
-                type=Target, dag=dag, from_node=model
-            )[0]
-        tokenized_trace = TraceTokenizer(
-            trace=trace, model=model, target=target
-        ).tokenize()
-        query_string = QueryStringFactory(tokenized_trace=tokenized_trace).build()
-        QueryWriter(
-            trace=trace, query_string=query_string, output_dir=output_dir
-        ).write()
+    tokenized_traces = TraceCompiler(dag=project.dag(), output_dir=output_dir).compile(
+        project.filter_traces(name_filter=name_filter)
+    )
+
+    FusedQuery.clear(output_dir)
+    if fuse_traces:
+        for fused_query, fused_trace in TraceFuser(tokenized_traces).fuse():
+            query_string = QueryStringFactory(tokenized_trace=fused_trace).build()
+            fused_query.write(output_dir=output_dir, query_string=query_string)
 
     Logger.instance().debug("Project compiled")
     return project
@@ -1,8 +1,8 @@
 import click
 import os
 import re
-
-from visivo.models.base.named_model import NAME_REGEX
+from visivo.query.data_formats import DATA_FORMATS, JSON_DATA_FORMAT
+from visivo.query.executors import EXECUTORS, THREAD_EXECUTOR
 
 
 def working_dir(function):
@@ -60,6 +60,8 @@ def user_dir(function):
 
 
 def validate_stage(ctx, param, value):
+    from visivo.models.base.named_model import NAME_REGEX
+
     if value.strip() == "":
         raise click.BadParameter("Only whitespace is not permitted for stage name.")
 
@@ -102,6 +104,72 @@ def port(function):
     return function
 
 
+def data_format(function):
+    click.option(
+        "-df",
+        "--data-format",
+        help="The format of the trace data files. 'columnar' writes a binary data.bin alongside each data.json",
+        type=click.Choice(DATA_FORMATS),
+        default=JSON_DATA_FORMAT,
+    )(function)
+    return function
+
+
+def cache_ttl(function):
+    click.option(
+        "-ct",
+        "--cache-ttl",
+        help="Seconds that cached trace query results stay fresh. Traces whose query and target match a fresh cached result reuse it instead of querying. 0 disables the cache",
+        type=int,
+        default=0,
+    )(function)
+    return function
+
+
+def dedupe_models(function):
+    click.option(
+        "-dm",
+        "--dedupe-models",
+        help="Query each sql model shared by several traces once, copy its rows into a local SQLite database and run those traces' queries against the copy. The traces' query statements need to be valid SQLite",
+        is_flag=True,
+        default=False,
+    )(function)
+    return function
+
+
+def fuse_traces(function):
+    click.option(
+        "-ft",
+        "--fuse-traces",
+        help="Run traces that only differ in their query statements as one query and split the result back into each trace's data",
+        is_flag=True,
+        default=False,
+    )(function)
+    return function
+
+
+def executor(function):
+    click.option(
+        "-ex",
+        "--executor",
+        help="How jobs are executed. 'thread' runs jobs on --threads threads. 'hybrid' runs queries on threads and encodes their results in a pool of one process per core",
+        type=click.Choice(EXECUTORS),
+        default=THREAD_EXECUTOR,
+    )(function)
+    return function
+
+
+def max_concurrency(function):
+    click.option(
+        "-mc",
+        "--max-concurrency",
+        help="Adapts how many queries run against each target at once between 1 and this number, starting from the target's connection_pool_size, and sizes connection pools to hold this many connections. The limit grows while queries succeed quickly and halves when they fail or slow down. 0 keeps each target at its connection_pool_size",
+        type=int,
+        default=0,
+    )(function)
+    return function
+
+
 def threads(function):
     click.option(
         "-th",
@@ -5,6 +5,12 @@ from visivo.commands.options import (
     target,
     name_filter,
     threads,
+    data_format,
+    cache_ttl,
+    dedupe_models,
+    fuse_traces,
+    executor,
+    max_concurrency,
 )
 
 
@@ -14,7 +20,25 @@ from visivo.commands.options import (
 @output_dir
 @name_filter
 @threads
-def run(output_dir, working_dir, target, name_filter, threads):
+@data_format
+@cache_ttl
+@dedupe_models
+@fuse_traces
+@executor
+@max_concurrency
+def run(
+    output_dir,
+    working_dir,
+    target,
+    name_filter,
+    threads,
+    data_format,
+    cache_ttl,
+    dedupe_models,
+    fuse_traces,
+    executor,
+    max_concurrency,
+):
     """
     Compiles the project and then runs the trace queries to fetch data to populate in the traces. Writes all data to the target directory.
     """
@@ -31,5 +55,11 @@ def run(output_dir, working_dir, target, name_filter, threads):
         working_dir=working_dir,
         name_filter=name_filter,
         threads=threads,
+        data_format=data_format,
+        cache_ttl=cache_ttl,
+        dedupe_models=dedupe_models,
+        fuse_traces=fuse_traces,
+        executor=executor,
+        max_concurrency=max_concurrency,
     )
     Logger.instance().success("Done")
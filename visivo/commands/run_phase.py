@@ -1,5 +1,8 @@
 from visivo.logging.logger import Logger
+from visivo.query.aggregator import JSON_DATA_FORMAT
+from visivo.query.executors import THREAD_EXECUTOR
 from visivo.query.runner import Runner
+from visivo.query.trace_manifest import TraceManifest
 from visivo.commands.compile_phase import compile_phase
 
 
@@ -11,13 +14,23 @@ def run_phase(
     run_only_changed: bool = False,
     threads: int = 8,
     soft_failure=False,
+    data_format: str = JSON_DATA_FORMAT,
+    cache_ttl: int = 0,
+    dedupe_models: bool = False,
+    fuse_traces: bool = False,
+    executor: str = THREAD_EXECUTOR,
+    max_concurrency: int = 0,
+    trace_manifest: TraceManifest = None,
 ):
     project = compile_phase(
         default_target=default_target,
         working_dir=working_dir,
         output_dir=output_dir,
         name_filter=name_filter,
+        fuse_traces=fuse_traces,
     )
+    if trace_manifest is not None:
+        trace_manifest.set_project_id(project.name)
 
     target_details = (
         "\n" if default_target == None else f"and default target {default_target}\n"
@@ -31,6 +44,13 @@ def run_phase(
         soft_failure=soft_failure,
         run_only_changed=run_only_changed,
         name_filter=name_filter,
+        data_format=data_format,
+        cache_ttl=cache_ttl,
+        dedupe_models=dedupe_models,
+        fuse_traces=fuse_traces,
+        executor=executor,
+        max_concurrency=max_concurrency,
+        trace_manifest=trace_manifest,
     )
     runner.run()
     return runner
@@ -1,6 +1,19 @@
 import click
 
-from .options import name_filter, output_dir, working_dir, target, port, threads
+from .options import (
+    name_filter,
+    output_dir,
+    working_dir,
+    target,
+    port,
+    threads,
+    data_format,
+    cache_ttl,
+    dedupe_models,
+    fuse_traces,
+    executor,
+    max_concurrency,
+)
 
 
 @click.command()
@@ -10,7 +23,26 @@ from .options import name_filter, output_dir, working_dir, target, port, threads
 @name_filter
 @port
 @threads
-def serve(output_dir, working_dir, target, port, name_filter, threads):
+@data_format
+@cache_ttl
+@dedupe_models
+@fuse_traces
+@executor
+@max_concurrency
+def serve(
+    output_dir,
+    working_dir,
+    target,
+    port,
+    name_filter,
+    threads,
+    data_format,
+    cache_ttl,
+    dedupe_models,
+    fuse_traces,
+    executor,
+    max_concurrency,
+):
     """
     Enables fast local development by spinning up a localhost server to run and view your project locally. Visivo will automatically refresh your project and re-run traces that have changed when you make updates to project files.
     """
@@ -23,6 +55,12 @@ def serve(output_dir, working_dir, target, port, name_filter, threads):
         default_target=target,
         name_filter=name_filter,
         threads=threads,
+        data_format=data_format,
+        cache_ttl=cache_ttl,
+        dedupe_models=dedupe_models,
+        fuse_traces=fuse_traces,
+        executor=executor,
+        max_concurrency=max_concurrency,
     )
     Logger.instance().debug(f"Serving project at http://localhost:{port}")
     server.serve(host="0.0.0.0", port=port)
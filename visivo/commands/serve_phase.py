@@ -1,13 +1,13 @@
 import click
-import os
 import re
 from visivo.logging.logger import Logger
 import json
 import pkg_resources
-from flask import Flask, current_app, send_from_directory
-from livereload import Server
+from flask import Flask, current_app, request, send_from_directory
 from .run_phase import run_phase
-from glob import glob
+from visivo.query.executors import THREAD_EXECUTOR
+from visivo.query.aggregator import JSON_DATA_FORMAT
+from visivo.query.trace_manifest import TraceManifest
 
 VIEWER_PATH = pkg_resources.resource_filename("visivo", "viewer/")
 
@@ -29,7 +29,24 @@ def get_project_json(output_dir, name_filter=None):
     return project_json
 
 
-def app_phase(output_dir, working_dir, default_target, name_filter, threads):
+def app_phase(
+    output_dir,
+    working_dir,
+    default_target,
+    name_filter,
+    threads,
+    data_format=JSON_DATA_FORMAT,
+    cache_ttl=0,
+    dedupe_models=False,
+    fuse_traces=False,
+    executor=THREAD_EXECUTOR,
+    max_concurrency=0,
+    trace_manifest: TraceManifest = None,
+):
+    if trace_manifest is None:
+        trace_manifest = TraceManifest(output_dir=output_dir)
+    trace_manifest.scan()
+
     app = Flask(
         __name__,
         static_folder=output_dir,
@@ -43,28 +60,29 @@ def app_phase(output_dir, working_dir, default_target, name_filter, threads):
         default_target=default_target,
         name_filter=name_filter,
         threads=threads,
+        data_format=data_format,
+        cache_ttl=cache_ttl,
+        dedupe_models=dedupe_models,
+        fuse_traces=fuse_traces,
+        executor=executor,
+        max_concurrency=max_concurrency,
+        trace_manifest=trace_manifest,
     )
 
     @app.route("/api/projects/")
     def projects():
         project_json = get_project_json(output_dir, name_filter)
-        return {"project_json": project_json}
+        return {"id": project_json.get("name"), "project_json": project_json}
 
     @app.route("/api/traces/")
     def traces():
-        trace_dirs = glob(f"{output_dir}/*/", recursive=True)
-        traces = []
-        for trace_dir in trace_dirs:
-            trace_name = os.path.basename(os.path.normpath(trace_dir))
-            if os.path.exists(f"{output_dir}/{trace_name}/data.json"):
-                traces.append(
-                    {
-                        "name": trace_name,
-                        "id": trace_name,
-                        "signed_data_file_url": f"/data/{trace_name}/data.json",
-                    }
-                )
-        return traces
+        return trace_manifest.entries(
+            project_id=request.args.get("project_id"),
+            trace_names=request.args.getlist("trace_names"),
+            data_format=request.args.get("format", JSON_DATA_FORMAT),
+            offset=request.args.get("offset", 0, type=int),
+            limit=request.args.get("limit", None, type=int),
+        )
 
     @app.route("/", defaults={"path": "index.html"})
     @app.route("/<path:path>")
@@ -77,13 +95,33 @@ def app_phase(output_dir, working_dir, default_target, name_filter, threads):
     return app
 
 
-def serve_phase(output_dir, working_dir, default_target, name_filter, threads):
+def serve_phase(
+    output_dir,
+    working_dir,
+    default_target,
+    name_filter,
+    threads,
+    data_format=JSON_DATA_FORMAT,
+    cache_ttl=0,
+    dedupe_models=False,
+    fuse_traces=False,
+    executor=THREAD_EXECUTOR,
+    max_concurrency=0,
+):
+    trace_manifest = TraceManifest(output_dir=output_dir)
     app = app_phase(
         output_dir=output_dir,
         working_dir=working_dir,
         default_target=default_target,
         name_filter=name_filter,
         threads=threads,
+        data_format=data_format,
+        cache_ttl=cache_ttl,
+        dedupe_models=dedupe_models,
+        fuse_traces=fuse_traces,
+        executor=executor,
+        max_concurrency=max_concurrency,
+        trace_manifest=trace_manifest,
     )
 
     def cli_changed():  # TODO: Include changes to cmd models
@@ -96,11 +134,20 @@ def serve_phase(output_dir, working_dir, default_target, name_filter, threads):
                 run_only_changed=True,
                 threads=threads,
                 soft_failure=True,
+                data_format=data_format,
+                cache_ttl=cache_ttl,
+                dedupe_models=dedupe_models,
+                fuse_traces=fuse_traces,
+                executor=executor,
+                max_concurrency=max_concurrency,
+                trace_manifest=trace_manifest,
             )
             Logger.instance().info("Files changed. Reloading . . .")
         except Exception as e:
             Logger.instance().error(e)
 
+    from livereload import Server
+
     server = Server(app.wsgi_app)
     server.watch(f"**/*.yml", cli_changed)
     return server
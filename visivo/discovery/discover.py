@@ -5,14 +5,20 @@ import click
 from pathlib import Path
 from visivo.parsers.core_parser import PROJECT_FILE_NAME, PROFILE_FILE_NAME
 from visivo.models.include import Include
+from visivo.parsers.parsed_file_cache import ParsedFileCache
 from visivo.utils import load_yaml_file
-from git import Repo
 
 
 class Discover:
-    def __init__(self, working_directory: str, home_directory=os.path.expanduser("~")):
+    def __init__(
+        self,
+        working_directory: str,
+        home_directory=os.path.expanduser("~"),
+        cache_dir: str = None,
+    ):
         self.working_directory = working_directory
         self.home_directory = home_directory
+        self.parsed_file_cache = ParsedFileCache(cache_dir) if cache_dir else None
 
     @property
     def project_file(self):
@@ -33,7 +39,10 @@ class Discover:
         return files
 
     def __add_includes(self, files, file):
-        data = load_yaml_file(file)
+        if self.parsed_file_cache:
+            data = self.parsed_file_cache.load(file)
+        else:
+            data = load_yaml_file(file)
         base_path = os.path.dirname(file)
 
         if "includes" in data:
@@ -59,6 +68,8 @@ class Discover:
         return f"{dir}/{PROJECT_FILE_NAME}"
 
     def __get_project_file_from_git(self, git_url):
+        from git import Repo
+
         deps_folder = f"{self.working_directory}/.visivo_cache"
         if not os.path.exists(deps_folder):
             os.makedirs(deps_folder)
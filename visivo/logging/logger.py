@@ -3,7 +3,6 @@ import sys
 import time
 import click
 from enum import Enum
-from halo import Halo
 from visivo.logging.singleton import Singleton
 
 
@@ -27,6 +26,8 @@ class Logger:
             self.echo = click.echo
             self.spinner = None
         else:
+            from halo import Halo
+
             self.spinner = Halo(text="Loading", spinner="dots")
             self.spinner.start()
             self.echo = None
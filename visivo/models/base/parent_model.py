@@ -6,7 +6,6 @@ from visivo.models.base.base_model import BaseModel
 from visivo.models.base.named_model import NamedModel
 import networkx as nx
 import networkx.algorithms.traversal.depth_first_search as dfs
-import matplotlib.pyplot as pyplot
 from pydantic_core import PydanticCustomError
 from visivo.models.targets.target import DefaultTarget
 
@@ -17,8 +16,14 @@ class ParentModel(ABC):
         return []
 
     def dag(self, node_permit_list=None):
+        """
+        Builds the dag in one pass over the child items. Nodes are indexed by name in
+        dag.graph["name_index"] as they are added, so refs resolve with a lookup rather
+        than a search of the dag built so far.
+        """
         dag = nx.DiGraph()
-        dag.add_node(self)
+        dag.graph["name_index"] = {}
+        ParentModel._add_node(dag, self)
         self.traverse_fields(
             items=self.child_items(),
             parent_item=self,
@@ -50,6 +55,7 @@ class ParentModel(ABC):
                         item=item,
                         parent_item=parent_item,
                     )
+                ParentModel._add_node(dag, dereferenced_item)
                 dag.add_edge(parent_item, dereferenced_item)
                 if isinstance(dereferenced_item, ParentModel):
                     self.traverse_fields(
@@ -60,6 +66,13 @@ class ParentModel(ABC):
                         root=root,
                     )
 
+    @staticmethod
+    def _add_node(dag, item):
+        dag.add_node(item)
+        if hasattr(item, "name"):
+            # A dict keeps one entry per node, in the order nodes were added.
+            dag.graph["name_index"].setdefault(item.name, {})[item] = None
+
     @staticmethod
     def all_descendants(dag, from_node=None):
         return dfs.dfs_tree(dag, from_node)
@@ -69,12 +82,23 @@ class ParentModel(ABC):
 
     @staticmethod
     def all_descendants_of_type(type, dag, from_node=None):
-        def find_type(item):
-            return isinstance(item, type)
-
-        return list(
-            filter(find_type, ParentModel.all_descendants(dag=dag, from_node=from_node))
-        )
+        """
+        Results are memoized on the dag by type and starting node, since a dag does not
+        change once it is built. Callers get their own copy of the list.
+        """
+        memo = dag.graph.setdefault("descendants_of_type", {})
+        key = (type, from_node)
+        if key not in memo:
+
+            def find_type(item):
+                return isinstance(item, type)
+
+            memo[key] = list(
+                filter(
+                    find_type, ParentModel.all_descendants(dag=dag, from_node=from_node)
+                )
+            )
+        return list(memo[key])
 
     def descendants_of_type(self, type):
         return ParentModel.all_descendants_of_type(
@@ -83,6 +107,10 @@ class ParentModel(ABC):
 
     @staticmethod
     def all_descendants_with_name(name: str, dag, from_node=None):
+        name_index = dag.graph.get("name_index")
+        if name_index is not None and from_node is None:
+            return list(name_index.get(name, {}))
+
         def find_name(item):
             return hasattr(item, "name") and item.name == name
 
@@ -122,6 +150,8 @@ class ParentModel(ABC):
 
     @staticmethod
     def show_dag(dag):
+        import matplotlib.pyplot as pyplot
+
         options = {}
         pos = nx.planar_layout(dag)
         nx.draw_networkx(dag, pos, **options)
@@ -132,9 +162,7 @@ class ParentModel(ABC):
         pyplot.show()
 
     def _get_dereferenced_item(self, name, dag, root, item, parent_item):
-        dereferenced_items = ParentModel.all_descendants_with_name(
-            name=name, dag=dag, from_node=root
-        )
+        dereferenced_items = list(dag.graph["name_index"].get(name, {}))
         if len(dereferenced_items) == 1:
             return dereferenced_items[0]
         else:
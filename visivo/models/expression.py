@@ -0,0 +1,133 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Union
+
+FUNCTION_REGEX = re.compile(r"(?<![\w$])(query|column)\s*\(")
+INDEX_REGEX = re.compile(r"\[-?\d*:?-?\d*\]")
+OPERATORS_REGEX = re.compile(r"^[\s\d.+\-*/%(),|<>=!]*$")
+QUOTES = ("'", '"', "`")
+
+
+class FunctionCall:
+    """A query() or column() call in an expression, with the text it was parsed from."""
+
+    def __init__(self, name: str, argument: str, index: str, source: str):
+        self.name = name
+        self.argument = argument
+        self.index = index
+        self.source = source
+
+    def __repr__(self):
+        return f"FunctionCall({self.source!r})"
+
+
+class Expression:
+    """
+    A prop or statement value split into plain text and the query() and column() calls
+    within it. Arguments are read as sql, so parentheses inside quotes and nested
+    parentheses do not end a call.
+    """
+
+    def __init__(self, parts: List[Union[str, FunctionCall]]):
+        self.parts = parts
+
+    def calls(self, name: str) -> List[FunctionCall]:
+        return [
+            part
+            for part in self.parts
+            if isinstance(part, FunctionCall) and part.name == name
+        ]
+
+    def query_statement(self) -> Optional[str]:
+        """
+        Returns the select statement of the expression, or None when it does not call
+        query(). A single query() call gives its argument. query() calls combined with
+        operators and numbers, like `query(sum(x)) + query(y)`, give the statement with
+        each call replaced by its parenthesized argument. Any other text around a
+        query() call would not be sql, so it raises a ValueError.
+        """
+        if not self.calls("query"):
+            return None
+        parts = [
+            part for part in self.parts if isinstance(part, FunctionCall) or part.strip()
+        ]
+        if len(parts) == 1:
+            return parts[0].argument
+        if any(
+            isinstance(part, FunctionCall) and part.name != "query"
+            or isinstance(part, str) and not OPERATORS_REGEX.match(part)
+            for part in parts
+        ):
+            raise ValueError(
+                f"'{self.text()}' mixes query() with text other than operators and "
+                "numbers. Put the whole statement inside a single query() call."
+            )
+        return "".join(
+            f"({part.argument})" if isinstance(part, FunctionCall) else part
+            for part in self.parts
+        ).strip()
+
+    def text(self) -> str:
+        return "".join(
+            part.source if isinstance(part, FunctionCall) else part
+            for part in self.parts
+        )
+
+    def column_names(self) -> List[str]:
+        return [call.argument for call in self.calls("column")]
+
+
+@lru_cache(maxsize=100_000)
+def parse_expression(text: str) -> Expression:
+    parts = []
+    position = 0
+    search_from = 0
+    while True:
+        match = FUNCTION_REGEX.search(text, search_from)
+        if not match:
+            break
+        end = _closing_paren(text, match.end())
+        if end is None:
+            search_from = match.end()
+            continue
+        name = match.group(1)
+        index = ""
+        if name == "column":
+            index_match = INDEX_REGEX.match(text, end + 1)
+            if index_match:
+                index = index_match.group()
+        call_end = end + 1 + len(index)
+        if match.start() > position:
+            parts.append(text[position : match.start()])
+        parts.append(
+            FunctionCall(
+                name=name,
+                argument=text[match.end() : end].strip(),
+                index=index,
+                source=text[match.start() : call_end],
+            )
+        )
+        position = search_from = call_end
+    if position < len(text):
+        parts.append(text[position:])
+    return Expression(parts)
+
+
+def _closing_paren(text: str, start: int) -> Optional[int]:
+    """Returns the position of the parenthesis that closes the one before start."""
+    depth = 1
+    quote = None
+    for position in range(start, len(text)):
+        character = text[position]
+        if quote:
+            if character == quote:
+                quote = None
+        elif character in QUOTES:
+            quote = character
+        elif character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+            if depth == 0:
+                return position
+    return None
@@ -81,11 +81,7 @@ class LocalMergeModel(Model, ParentModel):
         elif isinstance(model, LocalMergeModel):
             return model.get_sqlite_target(output_dir=output_dir)
         else:
-            return SqliteTarget(
-                name=f"model_{model.name}_generated_target",
-                database=f"{output_dir}/{model.name}.sqlite",
-                type="sqlite",
-            )
+            return model.get_sqlite_target(output_dir=output_dir)
 
     def child_items(self):
         return self.models
@@ -5,7 +5,9 @@ from pydantic import Field
 from visivo.models.base.parent_model import ParentModel
 from visivo.models.models.model import Model
 from visivo.models.targets.fields import TargetRefField
+from visivo.models.targets.sqlite_target import SqliteTarget
 from visivo.models.targets.target import DefaultTarget, Target
+from visivo.query.job_metrics import time_phase
 
 
 class SqlModel(Model, ParentModel):
@@ -35,6 +37,27 @@ class SqlModel(Model, ParentModel):
         description="A target object defined inline or a ref() to a chart. Override the defaults.target_name",
     )
 
+    def get_sqlite_target(self, output_dir) -> SqliteTarget:
+        return SqliteTarget(
+            name=f"model_{self.name}_generated_target",
+            database=f"{output_dir}/{self.name}.sqlite",
+            type="sqlite",
+        )
+
+    def insert_to_sqlite(self, target: Target, output_dir, metrics=None):
+        """
+        Copies the model's rows from the target into a table named after the model in a
+        local SQLite database, one batch at a time.
+        """
+        engine = self.get_sqlite_target(output_dir).get_engine()
+        if_exists = "replace"
+        for data_frame in target.read_sql_batches(self.sql, metrics=metrics):
+            with time_phase(metrics, "serialize"):
+                data_frame.to_sql(self.name, engine, if_exists=if_exists, index=False)
+            if metrics is not None:
+                metrics.rows += len(data_frame)
+            if_exists = "append"
+
     def child_items(self):
         if self.target:
             return [self.target]
@@ -1,5 +1,5 @@
 import re
-from typing import List, Optional
+from typing import Any, List, Optional
 from visivo.models.alert import AlertField, Alert
 
 from visivo.models.include import Include
@@ -34,6 +34,53 @@ class Project(NamedModel, ParentModel):
     charts: List[Chart] = []
     dashboards: List[Dashboard] = []
 
+    _dag: Any = None
+    _dag_structure: Any = None
+
+    def dag(self, node_permit_list=None):
+        """
+        Returns the dag built on a previous call while the project's structure is the
+        same. Any change to the child items or names of an object in the project, or to
+        the default target, builds a new one.
+        """
+        if node_permit_list is not None:
+            return super().dag(node_permit_list=node_permit_list)
+        structure = self._structure()
+        if self._dag is None or structure != self._dag_structure:
+            self._dag = super().dag()
+            self._dag_structure = structure
+        return self._dag
+
+    def __deepcopy__(self, memo=None):
+        # The copy's objects are new, so it builds its own dag rather than copying ours.
+        dag, structure = self._dag, self._dag_structure
+        self._dag, self._dag_structure = None, None
+        try:
+            return super().__deepcopy__(memo)
+        finally:
+            self._dag, self._dag_structure = dag, structure
+
+    def _structure(self) -> List:
+        """
+        Lists each object's children by identity and name, with refs by value. Building
+        it is a walk over the child items without the dag's ref lookups and hashing.
+        """
+        structure = [self.defaults.target_name if self.defaults else None]
+        items = [self]
+        while items:
+            item = items.pop()
+            for child in item.child_items():
+                if isinstance(child, BaseModel):
+                    structure.append((id(child), getattr(child, "name", None)))
+                elif isinstance(child, str):
+                    structure.append(child)
+                else:
+                    structure.append(type(child))
+                if isinstance(child, ParentModel):
+                    items.append(child)
+            structure.append(None)
+        return structure
+
     def child_items(self):
         return (
             self.alerts
@@ -130,7 +177,7 @@ class Project(NamedModel, ParentModel):
 
     @model_validator(mode="after")
     def validate_names(self):
-        Project.traverse_names([], self)
+        Project.traverse_names(set(), self)
         return self
 
     @classmethod
@@ -144,7 +191,7 @@ class Project(NamedModel, ParentModel):
                             f"{child_item.__class__.__name__} name '{name}' is not unique in the project"
                         )
                     if name:
-                        names.append(name)
+                        names.add(name)
                 Project.traverse_names(names, child_item)
 
     def __all_traces(self):
@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+from typing import Dict, Tuple
+import atexit
+import queue
+import threading
+
+
+class ConnectionPool:
+    """
+    Hands out at most size connections made by create at once, keeping released ones
+    open so later queries reuse a session instead of connecting again. A caller waits
+    for a connection once size are checked out. A connection is only returned to the
+    pool if is_closed reports it is still open.
+    """
+
+    def __init__(self, create, size: int = 1, is_closed=None):
+        self.create = create
+        self.size = size
+        self.is_closed = is_closed or (lambda connection: False)
+        self.idle = queue.LifoQueue()
+        self.available = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        self.available.acquire()
+        try:
+            connection = self._acquire()
+        except BaseException:
+            self.available.release()
+            raise
+        try:
+            yield connection
+        finally:
+            self._release(connection)
+            self.available.release()
+
+    def close(self):
+        while True:
+            try:
+                connection = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            connection.close()
+
+    def _acquire(self):
+        while True:
+            try:
+                connection = self.idle.get_nowait()
+            except queue.Empty:
+                return self.create()
+            if not self.is_closed(connection):
+                return connection
+
+    def _release(self, connection):
+        if self.is_closed(connection):
+            return
+        self.idle.put(connection)
+
+
+class ConnectionPoolRegistry:
+    """
+    Shares connection pools across every target in the process with the same connection
+    parameters. Targets are rebuilt for each job and on every serve reload, so a pool
+    kept on the target would leave its open sessions behind each time.
+    """
+
+    _pools: Dict[Tuple, ConnectionPool] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_pool(cls, key: Tuple, create, size: int = 1, is_closed=None):
+        with cls._lock:
+            if key not in cls._pools:
+                cls._pools[key] = ConnectionPool(
+                    create=create, size=size, is_closed=is_closed
+                )
+            return cls._pools[key]
+
+    @classmethod
+    def close(cls):
+        with cls._lock:
+            for pool in cls._pools.values():
+                pool.close()
+            cls._pools.clear()
+
+
+atexit.register(ConnectionPoolRegistry.close)
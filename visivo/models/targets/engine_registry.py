@@ -0,0 +1,71 @@
+from typing import Dict, Tuple
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+import atexit
+import threading
+
+
+class EngineRegistry:
+    """
+    Shares SQLAlchemy engines across every target in the process with the same url, pool
+    size and attached databases. Targets are rebuilt for each job and on every serve
+    reload, so caching engines on the target alone would create a new engine and pool
+    each time. Attached databases are attached once per new database connection.
+    """
+
+    _engines: Dict[Tuple, Engine] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def key(cls, target) -> Tuple:
+        attachments = tuple(
+            sorted(
+                (attachment.schema_name, attachment.target.database)
+                for attachment in getattr(target, "attach", None) or []
+            )
+        )
+        return (
+            target.url().render_as_string(hide_password=False),
+            target.pool_size(),
+            attachments,
+        )
+
+    @classmethod
+    def get_engine(cls, target) -> Engine:
+        key = cls.key(target)
+        with cls._lock:
+            if key not in cls._engines:
+                cls._engines[key] = cls._create_engine(*key)
+            return cls._engines[key]
+
+    @classmethod
+    def dispose(cls):
+        with cls._lock:
+            for engine in cls._engines.values():
+                engine.dispose()
+            cls._engines.clear()
+
+    @classmethod
+    def _create_engine(cls, url, pool_size, attachments) -> Engine:
+        kwargs = {}
+        if pool_size is not None:
+            kwargs["pool_size"] = pool_size
+        if url.startswith("sqlite"):
+            # In memory databases keep a connection per thread, which dispose closes
+            # from the main thread.
+            kwargs["connect_args"] = {"check_same_thread": False}
+        engine = create_engine(url, **kwargs)
+
+        if attachments:
+
+            @event.listens_for(engine, "connect")
+            def attach(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                for schema_name, database in attachments:
+                    cursor.execute(f"attach database '{database}' as {schema_name};")
+                cursor.close()
+
+        return engine
+
+
+atexit.register(EngineRegistry.dispose)
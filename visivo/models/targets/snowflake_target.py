@@ -1,5 +1,11 @@
-from typing import Literal, Optional
-from visivo.models.targets.target import Target
+from contextlib import ExitStack
+from typing import Iterator, Literal, Optional, Tuple
+from visivo.models.targets.connection_pool import (
+    ConnectionPool,
+    ConnectionPoolRegistry,
+)
+from visivo.models.targets.target import DEFAULT_BATCH_SIZE, Target
+from visivo.query.job_metrics import time_phase
 from pandas import DataFrame
 import click
 from pydantic import Field
@@ -23,6 +29,7 @@ class SnowflakeTarget(Target):
                     db_schema: DEFAULT
                     username: {% raw %}{{ env_var('SNOWFLAKE_USER') }}{% endraw %}
                     password: {% raw %}{{ env_var('SNOWFLAKE_PASSWORD') }}{% endraw %}
+                    connection_pool_size: 4
             ```
 
     Note: Recommended environment variable use is covered in the [targets overview.](/topics/targets/)
@@ -41,17 +48,75 @@ class SnowflakeTarget(Target):
         description="The access role that you want to use when running queries.",
     )
 
+    connection_pool_size: Optional[int] = Field(
+        1,
+        description="The most connections to open and run queries on at the same time.",
+    )
+    client_session_keep_alive: Optional[bool] = Field(
+        False,
+        description="Keeps pooled sessions alive while they wait for queries instead of letting them time out.",
+    )
+
     type: Literal["snowflake"]
 
-    def read_sql(self, query: str) -> DataFrame:
-        with self.connect() as connection:
-            cursor = connection.cursor()
-            cursor.execute(query)
+    def read_sql_batches(
+        self, query: str, batch_size: int = DEFAULT_BATCH_SIZE, metrics=None
+    ) -> Iterator[DataFrame]:
+        """
+        Uses the connector's arrow result batches when pandas support is installed. Those
+        batches follow the result chunks Snowflake sends, so batch_size only applies to
+        the fetchmany fallback.
+        """
+        from snowflake.connector.options import installed_pandas
+
+        with ExitStack() as stack:
+            with time_phase(metrics, "connect"):
+                connection = stack.enter_context(self.connect())
+            with time_phase(metrics, "execute"):
+                cursor = connection.cursor()
+                cursor.execute(query)
             columns = [col[0] for col in cursor.description]
-            data = cursor.fetchall()
+            empty = True
+            if installed_pandas:
+                data_frames = cursor.fetch_pandas_batches()
+            else:
+                data_frames = (
+                    DataFrame(data, columns=columns)
+                    for data in iter(lambda: cursor.fetchmany(batch_size), [])
+                )
+            if metrics is not None:
+                data_frames = metrics.timed("fetch", data_frames)
+            for data_frame in data_frames:
+                empty = False
+                yield data_frame
             cursor.close()
 
-        return DataFrame(data, columns=columns)
+        if empty:
+            yield DataFrame([], columns=columns)
+
+    def connect(self):
+        return self.get_pool().connection()
+
+    def get_pool(self) -> ConnectionPool:
+        return ConnectionPoolRegistry.get_pool(
+            key=self.pool_key(),
+            create=self.get_connection,
+            size=self.pool_size() or 1,
+            is_closed=lambda connection: connection.is_closed(),
+        )
+
+    def pool_key(self) -> Tuple:
+        return (
+            self.account,
+            self.username,
+            self.get_password(),
+            self.warehouse,
+            self.database,
+            self.db_schema,
+            self.role,
+            self.client_session_keep_alive,
+            self.pool_size(),
+        )
 
     def get_connection(self):
         import snowflake.connector
@@ -65,6 +130,7 @@ class SnowflakeTarget(Target):
                 database=self.database,
                 schema=self.db_schema,
                 role=self.role,
+                client_session_keep_alive=self.client_session_keep_alive,
             )
         except Exception as err:
             raise click.ClickException(
@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from contextlib import ExitStack
+from typing import Any, Iterator
 from pandas import DataFrame
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import click
-from visivo.models.targets.target import Target
+from visivo.models.targets.engine_registry import EngineRegistry
+from visivo.models.targets.target import DEFAULT_BATCH_SIZE, Target
+from visivo.query.job_metrics import time_phase
 
 
 class SqlalchemyTarget(Target, ABC):
@@ -14,39 +17,45 @@ class SqlalchemyTarget(Target, ABC):
     def get_dialect(self):
         raise NotImplementedError(f"No dialect method implemented for {self.type}")
 
-    def read_sql(self, query: str) -> DataFrame:
-        with self.connect() as connection:
-            query = text(query)
-            results = connection.execute(query)
-            columns = results.keys()
-            data = results.fetchall()
+    def read_sql_batches(
+        self, query: str, batch_size: int = DEFAULT_BATCH_SIZE, metrics=None
+    ) -> Iterator[DataFrame]:
+        with ExitStack() as stack:
+            with time_phase(metrics, "connect"):
+                connection = stack.enter_context(self.connect())
+            with time_phase(metrics, "execute"):
+                results = connection.execution_options(
+                    stream_results=True, max_row_buffer=batch_size
+                ).execute(text(query))
+            columns = list(results.keys())
+            empty = True
+            while True:
+                with time_phase(metrics, "fetch"):
+                    data = results.fetchmany(batch_size)
+                    if data:
+                        data_frame = DataFrame(data, columns=columns)
+                if not data:
+                    break
+                empty = False
+                yield data_frame
             results.close()
 
-        return DataFrame(data, columns=columns)
+        if empty:
+            yield DataFrame([], columns=columns)
 
     def get_connection(self):
         try:
-            connection = self.get_engine().connect()
-            if hasattr(self, "attach") and self.attach:
-                for attachment in self.attach:
-                    connection.execute(
-                        text(
-                            f"attach database '{attachment.target.database}' as {attachment.schema_name};"
-                        )
-                    )
-            return connection
+            return self.get_engine().connect()
         except Exception as err:
             raise click.ClickException(
                 f"Error connecting to target '{self.name}'. Ensure the database is running and the connection properties are correct."
             )
 
+    def set_max_concurrency(self, max_concurrency: int):
+        super().set_max_concurrency(max_concurrency)
+        self._engine = None
+
     def get_engine(self):
         if not self._engine:
-            if hasattr(self, "connection_pool_size"):
-                self._engine = create_engine(
-                    self.url(), pool_size=self.connection_pool_size
-                )
-            else:
-                self._engine = create_engine(self.url())
-
+            self._engine = EngineRegistry.get_engine(self)
         return self._engine
@@ -58,3 +58,10 @@ class SqliteTarget(SqlalchemyTarget):
 
     def get_dialect(self):
         return "sqlite+pysqlite"
+
+    def local_files(self) -> List[str]:
+        files = [self.database]
+        for attachment in self.attach or []:
+            if attachment.target:
+                files += attachment.target.local_files()
+        return files
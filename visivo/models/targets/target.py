@@ -1,11 +1,14 @@
-from typing import Optional
+from typing import Iterator, List, Optional
 from ..base.named_model import NamedModel
 from sqlalchemy.engine import URL
-from pandas import DataFrame
+from pandas import DataFrame, concat
 from abc import ABC, abstractmethod
 from pydantic import Field, SecretStr
 
 
+DEFAULT_BATCH_SIZE = 10000
+
+
 class DefaultTarget:
     pass
 
@@ -27,14 +30,51 @@ class Target(ABC, NamedModel):
     db_schema: Optional[str] = Field(
         None, description="The schema that the Visivo project will use in queries."
     )
+    _max_concurrency: int = 0
 
     @abstractmethod
     def get_connection(self):
         raise NotImplementedError(f"No connection method implemented for {self.type}")
 
     @abstractmethod
+    def read_sql_batches(
+        self, query: str, batch_size: int = DEFAULT_BATCH_SIZE, metrics=None
+    ) -> Iterator[DataFrame]:
+        """
+        Yields the results of the query as data frames of at most batch_size rows. At
+        least one, possibly empty, data frame with the result columns is always yielded.
+        Given metrics, the time spent connecting, executing and fetching is recorded.
+        """
+        raise NotImplementedError(
+            f"No read sql batches method implemented for {self.type}"
+        )
+
     def read_sql(self, query: str) -> DataFrame:
-        raise NotImplementedError(f"No read sql method implemented for {self.type}")
+        return concat(self.read_sql_batches(query), ignore_index=True)
+
+    def set_max_concurrency(self, max_concurrency: int):
+        """
+        Sets the most queries the runner may send the target at once when it adapts
+        concurrency, so the target's connection pool can hold that many connections.
+        """
+        self._max_concurrency = max_concurrency
+
+    def pool_size(self) -> Optional[int]:
+        """
+        Returns the connections the target's pool holds, its connection_pool_size raised
+        to the max concurrency when it is larger, or None for targets without a pool size.
+        """
+        pool_size = getattr(self, "connection_pool_size", None)
+        if pool_size is None:
+            return None
+        return max(pool_size, self._max_concurrency)
+
+    def local_files(self) -> List[str]:
+        """
+        Lists the local files holding the target's data, for targets that read their data
+        from files rather than a database server.
+        """
+        return []
 
     def get_password(self):
         return self.password.get_secret_value() if self.password is not None else None
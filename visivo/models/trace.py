@@ -1,6 +1,15 @@
-import re
-from typing import Any
-from pydantic import model_validator, Field
+from functools import lru_cache
+from typing import Any, Dict, get_args
+from pydantic import (
+    BaseModel,
+    Field,
+    PrivateAttr,
+    SerializeAsAny,
+    TypeAdapter,
+    ValidationError,
+    model_validator,
+)
+from pydantic_core import core_schema
 from visivo.models.models.fields import ModelRefField
 from .base.named_model import NamedModel
 from .base.parent_model import ParentModel
@@ -8,6 +17,7 @@ from .base.parent_model import ParentModel
 from .test import Test
 from typing import Union
 from .trace_props import (
+    TraceProps,
     Mesh3d,
     Barpolar,
     Scattersmith,
@@ -60,6 +70,7 @@ from typing import Optional, List, Union
 from collections import Counter
 from .base.base_model import REF_REGEX, generate_ref_field
 from typing_extensions import Annotated
+from .expression import parse_expression
 
 Props = Union[
     Mesh3d,
@@ -110,6 +121,54 @@ Props = Union[
     Splom,
 ]
 
+PROPS_TYPES = {
+    get_args(props_class.model_fields["type"].annotation)[0]: props_class
+    for props_class in get_args(Props)
+}
+
+
+@lru_cache(maxsize=None)
+def props_adapter() -> TypeAdapter:
+    return TypeAdapter(Annotated[Props, Field(discriminator="type")])
+
+
+class LazyProps:
+    """
+    Validates trace props with the class of their type alone, so that only the schemas
+    of the trace types a project uses are built. Props without a known type fall back to
+    the full union of trace types for its error messages, and the union is still what
+    ends up in the JSON schema.
+    """
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        return core_schema.no_info_before_validator_function(
+            cls.validate, handler(source)
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema, handler):
+        return handler(props_adapter().core_schema)
+
+    @staticmethod
+    def validate(value: Any):
+        if isinstance(value, TraceProps):
+            return value
+        if not isinstance(value, dict) or value.get("type") not in PROPS_TYPES:
+            return props_adapter().validate_python(value)
+
+        type = value["type"]
+        try:
+            return PROPS_TYPES[type].model_validate(value)
+        except ValidationError as e:
+            raise ValidationError.from_exception_data(
+                e.title,
+                [
+                    {**error, "loc": (type, *error["loc"])}
+                    for error in e.errors(include_url=False)
+                ],
+            )
+
 
 class InvalidTestConfiguration(Exception):
     pass
@@ -191,7 +250,34 @@ class Trace(NamedModel, ParentModel):
         None,
         description="Place where you can define named sql select statements. Once they are defined here they can be referenced in the trace props or in tables built on the trace.",
     )
-    props: Props = Field(Scatter(type="scatter"), discriminator="type")
+    props: SerializeAsAny[Annotated[TraceProps, LazyProps]] = Field(
+        Scatter(type="scatter"), title="Props"
+    )
+
+    _query_statements: Optional[tuple] = PrivateAttr(None)
+
+    def query_statements(self) -> Dict[str, str]:
+        """
+        Returns the select statement of each column and query() prop of the trace, keyed
+        by its dotted path like `props.marker.color`. The statements are kept with the
+        columns and props they were read from, so they are read again once either is
+        assigned, including through model_copy.
+        """
+        if self._query_statements is not None:
+            props, columns, query_statements = self._query_statements
+            if props is self.props and columns is self.columns:
+                return dict(query_statements)
+
+        query_statements = {}
+        if self.columns:
+            for path, value in _leaves(self.columns, ["columns"]):
+                query_statements[path] = str(value)
+        for path, expression in _expressions(self.props):
+            query_statement = expression.query_statement()
+            if query_statement:
+                query_statements[path] = query_statement
+        self._query_statements = (self.props, self.columns, query_statements)
+        return dict(query_statements)
 
     def child_items(self):
         return [self.model]
@@ -212,24 +298,50 @@ class Trace(NamedModel, ParentModel):
             tests.append(Test(name=name, type=type, kwargs=kwargs))
         return tests
 
-    @model_validator(mode="before")
-    @classmethod
-    def validate_column_refs(cls, data: Any):
-        if isinstance(data, str):
-            return data
-        columns, props = (data.get("columns"), data.get("props"))
-        if columns is None:
-            return data
-
-        columnKeys = list(columns.keys())
-        pattern = r"column\(([^\)]+)\)"
-        for value in props.values():
-            match = re.search(pattern, str(value))
-            if match:
-                value = match.group(1)
-                if value not in columnKeys:
+    @model_validator(mode="after")
+    def validate_refs(self):
+        """
+        Checks the query() and column() calls in the props, including nested props,
+        against the trace columns, and that the query() statements of the props,
+        cohort_on, filters and order_by can be read.
+        """
+        statements = [self.cohort_on, *(self.filters or []), *(self.order_by or [])]
+        for statement in statements:
+            if statement:
+                parse_expression(statement).query_statement()
+        column_names = None
+        if self.columns is not None:
+            column_names = self.columns.model_dump().keys()
+        for _, expression in _expressions(self.props):
+            expression.query_statement()
+            if column_names is None:
+                continue
+            for column_name in expression.column_names():
+                if column_name not in column_names:
                     raise ValueError(
-                        f"referenced column name '{value}' is not in columns definition"
+                        f"referenced column name '{column_name}' is not in "
+                        "columns definition"
                     )
+        return self
+
+
+def _expressions(props):
+    """Yields the dotted path and parsed expression of each string prop."""
+    for path, value in _leaves(props, ["props"]):
+        if isinstance(value, str):
+            yield path, parse_expression(value)
+
 
-        return data
+def _leaves(obj, path: List):
+    """Yields the dotted path and value of each value in obj that is not None."""
+    if isinstance(obj, BaseModel):
+        obj = {**obj.__dict__, **(obj.__pydantic_extra__ or {})}
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if value is not None:
+                yield from _leaves(value, path + [key])
+    elif isinstance(obj, list):
+        for i, value in enumerate(obj):
+            yield from _leaves(value, path + [i])
+    else:
+        yield ".".join([str(i) for i in path]), obj
@@ -58,7 +58,8 @@ class LayoutBase(BaseModel):
 	def dict(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
 		kwargs.setdefault('exclude_none', True)
 		return super().model_dump(*args, **kwargs)
-	model_config = ConfigDict(extra='allow')
+	# Schemas of the ~500 prop classes are built the first time each is used.
+	model_config = ConfigDict(extra='allow', defer_build=True)
 
 class TracePropsAttribute(LayoutBase):
 
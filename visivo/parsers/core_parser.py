@@ -4,6 +4,7 @@ from typing import List
 from pathlib import Path
 from pydantic import ValidationError
 from visivo.parsers.line_validation_error import LineValidationError
+from visivo.parsers.parsed_file_cache import ParsedFileCache
 from visivo.parsers.yaml_ordered_dict import setup_yaml_ordered_dict
 from visivo.utils import load_yaml_file
 from ..models.project import Project
@@ -13,16 +14,22 @@ PROFILE_FILE_NAME = "profile.yml"
 
 
 class CoreParser:
-    def __init__(self, project_file: Path, files: List[Path]):
+    def __init__(self, project_file: Path, files: List[Path], cache_dir: str = None):
         self.files = files
         self.project_file = project_file
+        self.parsed_file_cache = ParsedFileCache(cache_dir) if cache_dir else None
         setup_yaml_ordered_dict()
 
     def parse(self) -> Project:
         return self.__build_project()
 
     def project_file_data(self):
-        return load_yaml_file(self.project_file)
+        return self.__load_file(self.project_file)
+
+    def __load_file(self, file):
+        if self.parsed_file_cache:
+            return self.parsed_file_cache.load(file)
+        return load_yaml_file(file)
 
     def __build_project(self):
         data = self.__merged_project_data()
@@ -41,7 +48,7 @@ class CoreParser:
         for file in self.files:
             if file == self.project_file:
                 continue
-            data_files.append(load_yaml_file(file))
+            data_files.append(self.__load_file(file))
 
         return self.__merge_data_into_project(
             project_data=project_data, data_files=data_files
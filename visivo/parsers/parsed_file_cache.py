@@ -0,0 +1,105 @@
+import datetime
+import hashlib
+import json
+import os
+from visivo.parsers.yaml_ordered_dict import YamlOrderedDict, setup_yaml_ordered_dict
+from visivo.utils import load_yaml_string
+
+JINJA_MARKERS = ("{{", "{%", "{#")
+
+
+class UnsupportedValue(Exception):
+    pass
+
+
+class ParsedFileCache:
+    """
+    Keeps the loaded data of each project file in cache_dir as json, with a hash of the
+    file's content, so files that have not changed since the last compile are read back
+    rather than parsed again. Files containing Jinja syntax can render differently
+    without changing, for example through env_var, so they are always parsed. Files
+    holding values json cannot represent are parsed every time too.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = f"{cache_dir}/parsed_files"
+        setup_yaml_ordered_dict()
+
+    def load(self, file):
+        with open(file, "r") as stream:
+            template_string = stream.read()
+        if any(marker in template_string for marker in JINJA_MARKERS):
+            return load_yaml_string(template_string, file)
+
+        content_hash = hashlib.sha256(template_string.encode("utf-8")).hexdigest()
+        path_hash = hashlib.sha256(str(file).encode("utf-8")).hexdigest()
+        cache_file = f"{self.cache_dir}/{path_hash}.json"
+        if os.path.exists(cache_file):
+            with open(cache_file, "r") as fp:
+                cached = json.load(fp)
+            if cached.get("hash") == content_hash:
+                return _decode(cached["data"])
+
+        data = load_yaml_string(template_string, file)
+        try:
+            encoded = _encode(data)
+        except UnsupportedValue:
+            return data
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temporary_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temporary_file, "w") as fp:
+            json.dump({"hash": content_hash, "data": encoded}, fp)
+        os.replace(temporary_file, cache_file)
+        return data
+
+
+def _encode(value):
+    """
+    Encodes loaded yaml as json. Maps become lists of their items so keys keep their
+    type and their locations in the file, and dates are tagged with their type.
+    """
+    if isinstance(value, YamlOrderedDict):
+        return {
+            "map": [
+                [
+                    _encode(key),
+                    _encode(item),
+                    value.key_loc(key),
+                    value.value_loc(key),
+                ]
+                for key, item in value.items()
+            ]
+        }
+    if isinstance(value, dict):
+        return {"dict": [[_encode(key), _encode(item)] for key, item in value.items()]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, datetime.datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"date": value.isoformat()}
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    raise UnsupportedValue(type(value))
+
+
+def _decode(value):
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "map" in value:
+        decoded = YamlOrderedDict()
+        decoded._key_locs = {}
+        decoded._value_locs = {}
+        for key, item, key_loc, value_loc in value["map"]:
+            key = _decode(key)
+            decoded[key] = _decode(item)
+            decoded._key_locs[key] = key_loc
+            decoded._value_locs[key] = value_loc
+        return decoded
+    if "dict" in value:
+        return {_decode(key): _decode(item) for key, item in value["dict"]}
+    if "datetime" in value:
+        return datetime.datetime.fromisoformat(value["datetime"])
+    return datetime.date.fromisoformat(value["date"])
@@ -7,5 +7,5 @@ from .core_parser import CoreParser
 # parser = ParserFactory(project_file=project_file, files=files).build()
 # project = parser.build()
 class ParserFactory:
-    def build(self, project_file, files):
-        return CoreParser(project_file=project_file, files=files)
+    def build(self, project_file, files, cache_dir=None):
+        return CoreParser(project_file=project_file, files=files, cache_dir=cache_dir)
@@ -1,14 +1,412 @@
-from pandas import read_json
+import json
+import os
+import struct
+import tempfile
+from collections import defaultdict, deque
+import numpy
+from pandas import factorize, read_json, to_numeric
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+from pandas.io.json import dumps
+from visivo.query.data_formats import (
+    COLUMNAR_DATA_FORMAT,
+    COLUMNAR_FILE_NAME,
+    JSON_DATA_FORMAT,
+    JSON_FILE_NAME,
+)
+from visivo.query.job_metrics import time_phase
+
+# The largest integer a float64 holds exactly.
+MAX_EXACT_FLOAT64_INTEGER = 2**53
+DEFAULT_MAX_BUFFER_BYTES = 64 * 1024 * 1024
+# Batches a trace can have queued or encoding in the process pool at once.
+MAX_PENDING_BATCHES = max(os.cpu_count() or 1, 2)
+
+
+def data_file_names(data_format):
+    if data_format == COLUMNAR_DATA_FORMAT:
+        return [JSON_FILE_NAME, COLUMNAR_FILE_NAME]
+    return [JSON_FILE_NAME]
+
+
+def _json_dumps(obj):
+    return dumps(
+        obj,
+        default_handler=str,
+        date_unit="ms",
+        double_precision=10,
+        ensure_ascii=True,
+        iso_dates=False,
+    )
+
+
+def _cohort_label(cohort):
+    """
+    Encodes a cohort as the key pandas gives it in to_json. Numbers, booleans and strings
+    keep their str(), while dates and other values are encoded as they would be as
+    values, so datetimes are epoch milliseconds.
+    """
+    if isinstance(cohort, (str, bool, numpy.bool_, int, float, numpy.number)):
+        return str(cohort)
+    encoded = _json_dumps(cohort)
+    return json.loads(encoded) if encoded.startswith('"') else encoded
+
+
+def _is_numeric(values):
+    return is_numeric_dtype(values.dtype) and not is_bool_dtype(values.dtype)
+
+
+def _is_exact_float64(values):
+    """
+    Whether values can be stored as float64 without losing anything, so they have no
+    nulls and are floats or integers a float64 holds exactly.
+    """
+    if not _is_numeric(values):
+        return False
+    if values.dtype.kind == "f":
+        return not numpy.isnan(values).any()
+    if values.dtype.kind in "iu":
+        return len(values) == 0 or (
+            values.min() >= -MAX_EXACT_FLOAT64_INTEGER
+            and values.max() <= MAX_EXACT_FLOAT64_INTEGER
+        )
+    return False
+
+
+class CohortSlices:
+    """
+    Sorts the rows of a data frame by cohort_on once and exposes each cohort's columns as
+    contiguous slices of NumPy arrays. Rows keep their original order within a cohort and
+    rows with a null cohort_on are dropped, matching groupby("cohort_on").
+    """
+
+    def __init__(self, data_frame):
+        codes, self.cohorts = factorize(data_frame["cohort_on"], sort=True)
+        order = numpy.argsort(codes, kind="stable")
+        order = order[codes[order] >= 0]
+        counts = numpy.bincount(codes[codes >= 0], minlength=len(self.cohorts))
+        self.bounds = numpy.concatenate(([0], numpy.cumsum(counts)))
+        self.columns = {
+            column: data_frame[column].to_numpy()[order]
+            for column in data_frame.columns
+            if column != "cohort_on"
+        }
+
+    def __len__(self):
+        return len(self.cohorts)
+
+    def items(self):
+        for index, cohort in enumerate(self.cohorts):
+            start, end = self.bounds[index], self.bounds[index + 1]
+            yield cohort, {
+                column: values[start:end] for column, values in self.columns.items()
+            }
+
+
+def encode_batch(data_frame, columns, numeric_columns, data_format):
+    """
+    Splits a batch of rows by cohort and encodes each cohort's columns. Returns a list of
+    (cohort, column, json chunk, float64 chunk, length) with a float64 chunk for the
+    numeric columns in the columnar format and None otherwise.
+    """
+    encoded_batch = []
+    for cohort, cohort_columns in CohortSlices(data_frame).items():
+        for column in columns:
+            values = cohort_columns[column]
+            # Each chunk is the encoded values with a leading comma, so chunks can be
+            # written one after another and the first comma dropped.
+            json_chunk = ("," + _json_dumps(values)[1:-1]).encode("utf-8")
+            float64_chunk = None
+            if data_format == COLUMNAR_DATA_FORMAT and column in numeric_columns:
+                if not _is_numeric(values):
+                    values = to_numeric(values, errors="coerce")
+                float64_chunk = values.astype("<f8").tobytes()
+            encoded_batch.append(
+                (cohort, column, json_chunk, float64_chunk, len(values))
+            )
+    return encoded_batch
+
+
+def encode_shared_batch(handle, columns, numeric_columns, data_format):
+    from visivo.query.shared_frame import read_shared_frame
+
+    return encode_batch(
+        read_shared_frame(handle), columns, numeric_columns, data_format
+    )
+
+
+class Spool:
+    """
+    Collects byte chunks per key. Chunks are held in memory until they add up to more
+    than max_buffer_bytes, then every buffered chunk is moved to a temporary file.
+    """
+
+    def __init__(self, max_buffer_bytes: int = DEFAULT_MAX_BUFFER_BYTES):
+        self.max_buffer_bytes = max_buffer_bytes
+        self.file = tempfile.TemporaryFile()
+        self.buffered = defaultdict(list)
+        self.buffered_bytes = 0
+        self.spilled = defaultdict(list)
+        self.sizes = defaultdict(int)
+
+    def append(self, key, chunk: bytes):
+        self.buffered[key].append(chunk)
+        self.buffered_bytes += len(chunk)
+        self.sizes[key] += len(chunk)
+        if self.buffered_bytes > self.max_buffer_bytes:
+            self.spill()
+
+    def spill(self):
+        self.file.seek(0, 2)
+        for key, chunks in self.buffered.items():
+            offset = self.file.tell()
+            for chunk in chunks:
+                self.file.write(chunk)
+            self.spilled[key].append((offset, self.file.tell() - offset))
+        self.buffered.clear()
+        self.buffered_bytes = 0
+
+    def chunks(self, key):
+        for offset, length in self.spilled.get(key, []):
+            self.file.seek(offset)
+            yield self.file.read(length)
+        yield from self.buffered.get(key, [])
+
+    def close(self):
+        self.file.close()
+
+
+class IncrementalAggregator:
+    """
+    Aggregates a trace's rows batch by batch. Each batch is split by cohort and its
+    columns are encoded straight away, so encoding overlaps with fetching the next batch
+    and memory is bounded by the batch size plus max_buffer_bytes. finish() writes the
+    encoded cohorts out to data.json, and data.bin for the columnar format.
+
+    Given a process_pool, batches are encoded in worker processes which read their
+    columns from shared memory, while the calling thread goes on fetching.
+    """
+
+    def __init__(
+        self,
+        trace_dir,
+        data_format=JSON_DATA_FORMAT,
+        max_buffer_bytes: int = DEFAULT_MAX_BUFFER_BYTES,
+        process_pool=None,
+    ):
+        self.trace_dir = trace_dir
+        self.data_format = data_format
+        self.spool = Spool(max_buffer_bytes=max_buffer_bytes)
+        self.process_pool = process_pool
+        self.pending = deque()
+        self.cohorts = {}
+        self.columns = None
+        self.numeric_columns = set()
+        self.lengths = defaultdict(int)
+
+    def add(self, data_frame):
+        if self.columns is None:
+            self.columns = [
+                column for column in data_frame.columns if column != "cohort_on"
+            ]
+            self.numeric_columns = {
+                column
+                for column in self.columns
+                if _is_exact_float64(data_frame[column].to_numpy())
+            }
+        else:
+            # A column is only written as float64 while every batch has numeric values
+            # for it that float64 holds exactly, otherwise it is downgraded to json for
+            # the whole trace.
+            for column in list(self.numeric_columns):
+                if not _is_exact_float64(data_frame[column].to_numpy()):
+                    self.numeric_columns.discard(column)
+
+        if self.process_pool is None:
+            self._add_encoded(
+                encode_batch(
+                    data_frame, self.columns, self.numeric_columns, self.data_format
+                )
+            )
+            return
+
+        from visivo.query.shared_frame import SharedFrame
+
+        shared_frame = SharedFrame(data_frame)
+        future = self.process_pool.submit(
+            encode_shared_batch,
+            shared_frame.handle,
+            self.columns,
+            self.numeric_columns,
+            self.data_format,
+        )
+        self.pending.append((shared_frame, future))
+        while len(self.pending) > MAX_PENDING_BATCHES:
+            self._add_pending()
+
+    def finish(self):
+        try:
+            while self.pending:
+                self._add_pending()
+            self._write_json()
+            if self.data_format == COLUMNAR_DATA_FORMAT:
+                self._write_columnar()
+        finally:
+            self.close()
+
+    def close(self):
+        while self.pending:
+            shared_frame, future = self.pending.popleft()
+            try:
+                if not future.cancel():
+                    future.exception()
+            finally:
+                shared_frame.close()
+        self.spool.close()
+
+    def _add_pending(self):
+        shared_frame, future = self.pending.popleft()
+        try:
+            self._add_encoded(future.result())
+        finally:
+            shared_frame.close()
+
+    def _add_encoded(self, encoded_batch):
+        for cohort, column, json_chunk, float64_chunk, length in encoded_batch:
+            self.cohorts.setdefault(cohort, _cohort_label(cohort))
+            self.spool.append((cohort, column, "json"), json_chunk)
+            if float64_chunk is not None and column in self.numeric_columns:
+                self.spool.append((cohort, column, "float64"), float64_chunk)
+            self.lengths[(cohort, column)] += length
+
+    def _sorted_cohorts(self):
+        try:
+            return sorted(self.cohorts.keys())
+        except TypeError:
+            return list(self.cohorts.keys())
+
+    def _json_values(self, fp, cohort, column):
+        fp.write(b"[")
+        for index, chunk in enumerate(self.spool.chunks((cohort, column, "json"))):
+            fp.write(chunk[1:] if index == 0 else chunk)
+        fp.write(b"]")
+
+    def _write_json(self):
+        """
+        The output is the same as groupby("cohort_on").aggregate(list).transpose().to_json()
+        on the concatenated batches.
+        """
+        with open(f"{self.trace_dir}/{JSON_FILE_NAME}", "wb") as fp:
+            fp.write(b"{")
+            for cohort_index, cohort in enumerate(self._sorted_cohorts()):
+                if cohort_index > 0:
+                    fp.write(b",")
+                fp.write(_json_dumps(self.cohorts[cohort]).encode("utf-8"))
+                fp.write(b":{")
+                for column_index, column in enumerate(self.columns):
+                    if column_index > 0:
+                        fp.write(b",")
+                    fp.write(_json_dumps(str(column)).encode("utf-8"))
+                    fp.write(b":")
+                    self._json_values(fp, cohort, column)
+                fp.write(b"}")
+            fp.write(b"}")
+
+    def _write_columnar(self):
+        """
+        Writes the same cohort -> column -> values structure as data.json to data.bin.
+
+        The file starts with the byte length of a JSON header as a little endian uint32,
+        followed by the header and then the column buffers. The header describes each
+        column by the offset of its buffer from the start of the buffers and its length.
+        Numeric columns without nulls, whose values float64 holds exactly, are stored as
+        little endian float64 buffers. Other columns are
+        stored as a JSON array of their values, whose size in bytes is in the header.
+        Buffers start at multiples of 8 bytes so float64 buffers can be viewed as a
+        Float64Array without copying.
+        """
+        header = {}
+        buffers = []
+        offset = 0
+        for cohort in self._sorted_cohorts():
+            cohort_header = {}
+            for column in self.columns:
+                length = self.lengths[(cohort, column)]
+                if column in self.numeric_columns:
+                    key = (cohort, column, "float64")
+                    cohort_header[column] = {
+                        "dtype": "float64",
+                        "offset": offset,
+                        "length": length,
+                    }
+                    size = self.spool.sizes[key]
+                else:
+                    # The json chunks are written without their leading comma and
+                    # wrapped in brackets, which adds a byte.
+                    size = self.spool.sizes[(cohort, column, "json")] + 1
+                    cohort_header[column] = {
+                        "dtype": "json",
+                        "offset": offset,
+                        "length": length,
+                        "bytes": size,
+                    }
+                padding = -size % 8
+                buffers.append((cohort, column, padding))
+                offset += size + padding
+            header[self.cohorts[cohort]] = cohort_header
+
+        header_bytes = json.dumps(header).encode("utf-8")
+        prefix_length = 4 + len(header_bytes)
+        padding = b" " * (-prefix_length % 8)
+        with open(f"{self.trace_dir}/{COLUMNAR_FILE_NAME}", "wb") as fp:
+            fp.write(struct.pack("<I", len(header_bytes) + len(padding)))
+            fp.write(header_bytes)
+            fp.write(padding)
+            for cohort, column, padding in buffers:
+                if column in self.numeric_columns:
+                    for chunk in self.spool.chunks((cohort, column, "float64")):
+                        fp.write(chunk)
+                else:
+                    self._json_values(fp, cohort, column)
+                fp.write(b" " * padding)
 
 
 class Aggregator:
     @classmethod
-    def aggregate(cls, json_file: str, trace_dir: str):
+    def aggregate(cls, json_file: str, trace_dir: str, data_format=JSON_DATA_FORMAT):
         data_frame = read_json(json_file)
-        cls.aggregate_data_frame(data_frame=data_frame, trace_dir=trace_dir)
+        cls.aggregate_data_frame(
+            data_frame=data_frame, trace_dir=trace_dir, data_format=data_format
+        )
+
+    @classmethod
+    def aggregate_data_frames(
+        cls,
+        data_frames,
+        trace_dir,
+        data_format=JSON_DATA_FORMAT,
+        process_pool=None,
+        metrics=None,
+    ):
+        """
+        Given metrics, like a JobMetrics, records the rows aggregated and the time spent
+        encoding batches and writing the data files.
+        """
+        incremental_aggregator = IncrementalAggregator(
+            trace_dir=trace_dir, data_format=data_format, process_pool=process_pool
+        )
+        try:
+            for data_frame in data_frames:
+                with time_phase(metrics, "aggregate"):
+                    incremental_aggregator.add(data_frame)
+                if metrics is not None:
+                    metrics.rows += len(data_frame)
+            with time_phase(metrics, "serialize"):
+                incremental_aggregator.finish()
+        finally:
+            incremental_aggregator.close()
 
     @classmethod
-    def aggregate_data_frame(cls, data_frame, trace_dir):
-        aggregated = data_frame.groupby("cohort_on").aggregate(list).transpose()
-        with open(f"{trace_dir}/data.json", "w") as fp:
-            fp.write(aggregated.to_json(default_handler=str))
+    def aggregate_data_frame(cls, data_frame, trace_dir, data_format=JSON_DATA_FORMAT):
+        cls.aggregate_data_frames(
+            data_frames=[data_frame], trace_dir=trace_dir, data_format=data_format
+        )
@@ -0,0 +1,5 @@
+JSON_DATA_FORMAT = "json"
+COLUMNAR_DATA_FORMAT = "columnar"
+DATA_FORMATS = [JSON_DATA_FORMAT, COLUMNAR_DATA_FORMAT]
+JSON_FILE_NAME = "data.json"
+COLUMNAR_FILE_NAME = "data.bin"
@@ -1,5 +1,4 @@
 from pydantic import BaseModel
-from copy import deepcopy
 
 KEYWORDS = {
     "aggregates": {
@@ -76,13 +75,10 @@ class Dialect(BaseModel, use_enum_values=True):
             _ = store[self.type]
         except KeyError:
             raise f"No {keyword_type} store for {self.type}."
-        return deepcopy(store)
+        return store
 
     def _dialect_set(self, keyword_store: dict):
-        all = keyword_store["all"]
-        dialect = keyword_store[self.type]
-        all.update(dialect)
-        return list(all)
+        return list(set(keyword_store["all"]) | set(keyword_store[self.type]))
 
     @property
     def aggregates(self):
@@ -0,0 +1,3 @@
+THREAD_EXECUTOR = "thread"
+HYBRID_EXECUTOR = "hybrid"
+EXECUTORS = [THREAD_EXECUTOR, HYBRID_EXECUTOR]
@@ -0,0 +1,74 @@
+import json
+import os
+import threading
+from typing import Dict, List
+from visivo.query.jobs.job import Job
+
+DEFAULT_JOB_DURATION = 1.0
+
+
+class JobDurations:
+    """
+    Persists how long each job took in the output directory so later runs can estimate
+    the duration of a job before it runs.
+    """
+
+    def __init__(self, output_dir: str):
+        self.durations_file = f"{output_dir}/.cache/job_durations.json"
+        self.lock = threading.Lock()
+        self.durations: Dict[str, float] = {}
+        if os.path.exists(self.durations_file):
+            with open(self.durations_file, "r") as fp:
+                self.durations = json.load(fp)
+
+    def estimate(self, job_name: str) -> float:
+        """
+        Returns the last recorded duration of the job, or the average of the recorded
+        durations for a job that has not run before.
+        """
+        if job_name in self.durations:
+            return self.durations[job_name]
+        if self.durations:
+            return sum(self.durations.values()) / len(self.durations)
+        return DEFAULT_JOB_DURATION
+
+    def record(self, job_name: str, duration: float):
+        with self.lock:
+            self.durations[job_name] = duration
+
+    def write(self):
+        with self.lock:
+            os.makedirs(os.path.dirname(self.durations_file), exist_ok=True)
+            with open(self.durations_file, "w") as fp:
+                json.dump(self.durations, fp)
+
+
+def critical_path_priorities(
+    jobs: List[Job], dependents: Dict[str, List[Job]], job_durations: JobDurations
+) -> Dict[str, float]:
+    """
+    Ranks each job by the estimated duration of the longest chain of jobs that starts
+    with it, so that jobs at the head of long or slow chains start first. Without
+    recorded durations every job counts as the same length and the rank is the number
+    of jobs in the longest chain below it.
+    """
+    remaining_dependencies = {job.name: 0 for job in jobs}
+    for job in jobs:
+        for dependent in dependents[job.name]:
+            remaining_dependencies[dependent.name] += 1
+
+    ordered = [job for job in jobs if remaining_dependencies[job.name] == 0]
+    for job in ordered:
+        for dependent in dependents[job.name]:
+            remaining_dependencies[dependent.name] -= 1
+            if remaining_dependencies[dependent.name] == 0:
+                ordered.append(dependent)
+
+    priorities = {}
+    for job in reversed(ordered):
+        downstream = max(
+            (priorities[dependent.name] for dependent in dependents[job.name]),
+            default=0.0,
+        )
+        priorities[job.name] = job_durations.estimate(job.name) + downstream
+    return priorities
@@ -0,0 +1,131 @@
+import json
+import os
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from time import perf_counter, time
+from typing import Dict, Iterator, List
+
+RUN_RESULTS_FILE_NAME = "run_results.json"
+PHASES = ["connect", "execute", "fetch", "aggregate", "serialize"]
+
+
+class JobMetrics:
+    """
+    Collects how long a job spent in each phase of its work along with the rows it read
+    and the bytes of data it wrote. Phases that run more than once, like fetching each
+    batch, add up.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.rows = 0
+        self.bytes = 0
+
+    @contextmanager
+    def time(self, phase: str):
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[phase] += perf_counter() - start_time
+
+    def timed(self, phase: str, items: Iterator) -> Iterator:
+        """
+        Yields from items, timing how long each item takes to produce but not the time
+        spent by the caller between items.
+        """
+        items = iter(items)
+        while True:
+            with self.time(phase):
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+            yield item
+
+    def add_file_bytes(self, paths: List[str]):
+        for path in paths:
+            if os.path.exists(path):
+                self.bytes += os.path.getsize(path)
+
+    def to_dict(self) -> Dict:
+        return {
+            **{phase: round(self.seconds[phase], 6) for phase in PHASES},
+            "rows": self.rows,
+            "bytes": self.bytes,
+        }
+
+
+def time_phase(metrics, phase: str):
+    """
+    Times a phase of a job on metrics, like a JobMetrics, when it is given.
+    """
+    return metrics.time(phase) if metrics is not None else nullcontext()
+
+
+class RunResults:
+    """
+    Records the outcome and metrics of each job in a run and writes them to
+    run_results.json in the output directory. When OpenTelemetry is installed, each job
+    is also exported as a span through the globally configured tracer provider.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.started_at = time()
+        self.jobs: Dict[str, Dict] = {}
+        self.tracer = _tracer()
+
+    def record(
+        self,
+        job,
+        status: str,
+        enqueued_at: float = None,
+        started_at: float = None,
+        finished_at: float = None,
+        metrics: JobMetrics = None,
+    ):
+        result = {
+            "name": job.name,
+            "type": job.item.__class__.__name__,
+            "target": job.target.name,
+            "status": status,
+            "queue_wait": None,
+            "duration": None,
+        }
+        if enqueued_at is not None and started_at is not None:
+            result["queue_wait"] = round(started_at - enqueued_at, 6)
+        if started_at is not None and finished_at is not None:
+            result["duration"] = round(finished_at - started_at, 6)
+        if metrics is not None:
+            result.update(metrics.to_dict())
+        self.jobs[job.name] = result
+        if self.tracer and started_at is not None and finished_at is not None:
+            self._export_span(result, started_at, finished_at)
+
+    def write(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        run_results = {
+            "started_at": self.started_at,
+            "elapsed": round(time() - self.started_at, 6),
+            "jobs": list(self.jobs.values()),
+        }
+        with open(f"{self.output_dir}/{RUN_RESULTS_FILE_NAME}", "w") as fp:
+            json.dump(run_results, fp, indent=2)
+
+    def _export_span(self, result: Dict, started_at: float, finished_at: float):
+        span = self.tracer.start_span(
+            f"visivo.job {result['name']}", start_time=int(started_at * 1e9)
+        )
+        for key, value in result.items():
+            if value is not None:
+                span.set_attribute(f"visivo.{key}", value)
+        span.end(end_time=int(finished_at * 1e9))
+
+
+def _tracer():
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    return trace.get_tracer("visivo")
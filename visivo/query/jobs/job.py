@@ -9,9 +9,10 @@ from termcolor import colored
 
 
 class JobResult:
-    def __init__(self, success: bool, message: str):
+    def __init__(self, success: bool, message: str, metrics=None):
         self.success = success
         self.message = message
+        self.metrics = metrics
 
 
 class CachedFuture:
@@ -34,6 +35,7 @@ class Job:
         self.output_changed = output_changed
         self.kwargs = kwargs
         self.future: Future = None
+        self.priority = 0.0
 
     @property
     def name(self):
@@ -7,13 +7,16 @@ from visivo.query.jobs.job import (
     format_message_failure,
     format_message_success,
 )
+from visivo.query.job_metrics import JobMetrics
 from time import time
 
 
 def action(local_merge_model: LocalMergeModel, output_dir):
+    metrics = JobMetrics()
     try:
         start_time = time()
-        local_merge_model.insert_dependent_models_to_sqlite(output_dir=output_dir)
+        with metrics.time("execute"):
+            local_merge_model.insert_dependent_models_to_sqlite(output_dir=output_dir)
         success_message = format_message_success(
             details=f"Updated data for model \033[4m{local_merge_model.name}\033[0m",
             start_time=start_time,
@@ -21,7 +24,10 @@ def action(local_merge_model: LocalMergeModel, output_dir):
                 output_dir=output_dir
             ).database,
         )
-        return JobResult(success=True, message=success_message)
+        metrics.add_file_bytes(
+            [local_merge_model.get_sqlite_target(output_dir=output_dir).database]
+        )
+        return JobResult(success=True, message=success_message, metrics=metrics)
     except Exception as e:
         failure_message = format_message_failure(
             details=f"Failed query for model \033[4m{local_merge_model.name}\033[0m",
@@ -31,7 +37,7 @@ def action(local_merge_model: LocalMergeModel, output_dir):
             ).database,
             error_msg=str(repr(e)),
         )
-        return JobResult(success=False, message=failure_message)
+        return JobResult(success=False, message=failure_message, metrics=metrics)
 
 
 def jobs(dag, output_dir: str, project: Project, name_filter: str):
@@ -0,0 +1,103 @@
+from collections import defaultdict
+from typing import Dict, List
+from visivo.models.base.parent_model import ParentModel
+from visivo.models.models.model import Model
+from visivo.models.models.sql_model import SqlModel
+from visivo.models.project import Project
+from visivo.models.targets.sqlite_target import SqliteTarget
+from visivo.models.targets.target import Target
+from visivo.models.trace import Trace
+from visivo.query.jobs.job import (
+    Job,
+    JobResult,
+    format_message_failure,
+    format_message_success,
+)
+from visivo.query.trace_fuser import FusedQuery
+from visivo.query.job_metrics import JobMetrics
+from time import time
+
+
+def _get_target(sql_model: SqlModel, dag) -> Target:
+    return ParentModel.all_descendants_of_type(
+        type=Target, dag=dag, from_node=sql_model
+    )[0]
+
+
+def shared_sql_models(
+    dag, project: Project, name_filter: str, exclude_trace_names=()
+) -> Dict[SqlModel, List[Trace]]:
+    """
+    Returns the SqlModels on a non SQLite target that more than one of the filtered
+    traces are built on, with those traces.
+    """
+    traces_by_model = defaultdict(list)
+    for trace in project.filter_traces(name_filter=name_filter):
+        if trace.name in exclude_trace_names:
+            continue
+        model = ParentModel.all_descendants_of_type(
+            type=Model, dag=dag, from_node=trace
+        )[0]
+        if not isinstance(model, SqlModel):
+            continue
+        if isinstance(_get_target(model, dag), SqliteTarget):
+            continue
+        traces_by_model[model].append(trace)
+    return {
+        model: traces for model, traces in traces_by_model.items() if len(traces) > 1
+    }
+
+
+def action(sql_model: SqlModel, dag, output_dir):
+    metrics = JobMetrics()
+    try:
+        start_time = time()
+        sql_model.insert_to_sqlite(
+            target=_get_target(sql_model, dag), output_dir=output_dir, metrics=metrics
+        )
+        success_message = format_message_success(
+            details=f"Updated data for model \033[4m{sql_model.name}\033[0m",
+            start_time=start_time,
+            full_path=sql_model.get_sqlite_target(output_dir=output_dir).database,
+        )
+        metrics.add_file_bytes(
+            [sql_model.get_sqlite_target(output_dir=output_dir).database]
+        )
+        return JobResult(success=True, message=success_message, metrics=metrics)
+    except Exception as e:
+        failure_message = format_message_failure(
+            details=f"Failed query for model \033[4m{sql_model.name}\033[0m",
+            start_time=start_time,
+            full_path=sql_model.get_sqlite_target(output_dir=output_dir).database,
+            error_msg=str(repr(e)),
+        )
+        return JobResult(success=False, message=failure_message, metrics=metrics)
+
+
+def jobs(
+    dag, output_dir: str, project: Project, name_filter: str, fuse_traces=False
+):
+    fused_trace_names = set()
+    if fuse_traces:
+        for fused_query in FusedQuery.read_all(output_dir):
+            fused_trace_names.update(fused_query.traces)
+
+    jobs = []
+    for sql_model, traces in shared_sql_models(
+        dag=dag,
+        project=project,
+        name_filter=name_filter,
+        exclude_trace_names=fused_trace_names,
+    ).items():
+        jobs.append(
+            Job(
+                item=sql_model,
+                output_changed=any(trace.changed for trace in traces),
+                target=_get_target(sql_model, dag),
+                action=action,
+                sql_model=sql_model,
+                dag=dag,
+                output_dir=output_dir,
+            )
+        )
+    return jobs
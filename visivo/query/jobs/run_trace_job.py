@@ -4,41 +4,160 @@ from visivo.models.models.model import Model
 from visivo.models.models.csv_script_model import CsvScriptModel
 from visivo.models.project import Project
 from visivo.models.targets.target import Target
-from visivo.query.aggregator import Aggregator
+from visivo.query.aggregator import (
+    JSON_DATA_FORMAT,
+    Aggregator,
+    IncrementalAggregator,
+    data_file_names,
+)
 from visivo.query.jobs.job import (
     Job,
     JobResult,
     format_message_failure,
     format_message_success,
 )
+from visivo.query.job_metrics import JobMetrics, time_phase
+from visivo.query.jobs.run_sql_model_job import shared_sql_models
+from visivo.query.query_string_factory import QueryStringFactory
+from visivo.query.result_cache import ResultCache
+from visivo.query.trace_fuser import FusedQuery
+from visivo.query.trace_tokenizer import TraceTokenizer
+from functools import partial
 from time import time
 
 
-def action(trace, dag, output_dir):
+def _aggregate(
+    target, query_string, trace_directory, data_format, process_pool, metrics
+):
+    Aggregator.aggregate_data_frames(
+        data_frames=target.read_sql_batches(query_string, metrics=metrics),
+        trace_dir=trace_directory,
+        data_format=data_format,
+        process_pool=process_pool,
+        metrics=metrics,
+    )
+
+
+def _aggregate_fused(
+    target, query_string, fused_query, output_dir, data_format, process_pool, metrics
+):
+    incremental_aggregators = {
+        name: IncrementalAggregator(
+            trace_dir=f"{output_dir}/{name}",
+            data_format=data_format,
+            process_pool=process_pool,
+        )
+        for name in fused_query.traces
+    }
+    try:
+        for data_frame in target.read_sql_batches(query_string, metrics=metrics):
+            with time_phase(metrics, "aggregate"):
+                for name, fused_trace in fused_query.traces.items():
+                    incremental_aggregators[name].add(fused_trace.split(data_frame))
+            if metrics is not None:
+                metrics.rows += len(data_frame)
+        with time_phase(metrics, "serialize"):
+            for incremental_aggregator in incremental_aggregators.values():
+                incremental_aggregator.finish()
+    finally:
+        for incremental_aggregator in incremental_aggregators.values():
+            incremental_aggregator.close()
+
+
+def _aggregate_with_cache(
+    result_cache, query_string, target, file_names, directory, aggregate
+) -> bool:
+    """
+    Runs aggregate, or copies the files it writes from a fresh cache entry. Returns
+    whether the files came from the cache.
+    """
+    if result_cache is None:
+        aggregate()
+        return False
+    key = ResultCache.key(query_string=query_string, target=target)
+    with result_cache.key_lock(key):
+        if result_cache.load(key, file_names, directory):
+            return True
+        aggregate()
+        result_cache.store(key, file_names, directory)
+        return False
+
+
+def _get_model_and_target(trace, dag, output_dir, query_model_copy=False):
     model = ParentModel.all_descendants_of_type(type=Model, dag=dag, from_node=trace)[0]
-    if isinstance(model, CsvScriptModel) or isinstance(model, LocalMergeModel):
+    if (
+        query_model_copy
+        or isinstance(model, CsvScriptModel)
+        or isinstance(model, LocalMergeModel)
+    ):
         target = model.get_sqlite_target(output_dir=output_dir)
     else:
         target = ParentModel.all_descendants_of_type(
             type=Target, dag=dag, from_node=model
         )[0]
+    return model, target
+
+
+def _sqlite_query_string(trace, model, target):
+    """
+    Builds the trace's query against the copy of its model in a local SQLite database
+    rather than the model's sql.
+    """
+    tokenized_trace = TraceTokenizer(trace=trace, model=model, target=target).tokenize()
+    tokenized_trace.sql = f'SELECT * FROM "{model.name}"'
+    return QueryStringFactory(tokenized_trace=tokenized_trace).build()
+
+
+def action(
+    trace,
+    dag,
+    output_dir,
+    data_format=JSON_DATA_FORMAT,
+    result_cache: ResultCache = None,
+    query_model_copy: bool = False,
+    process_pool=None,
+):
+    model, target = _get_model_and_target(trace, dag, output_dir, query_model_copy)
 
     trace_directory = f"{output_dir}/{trace.name}"
     trace_query_file = f"{trace_directory}/query.sql"
+    metrics = JobMetrics()
     with open(trace_query_file, "r") as file:
         query_string = file.read()
         try:
             start_time = time()
-            data_frame = target.read_sql(query_string)
+            if query_model_copy:
+                query_string = _sqlite_query_string(trace, model, target)
+            file_names = data_file_names(data_format)
+            loaded = _aggregate_with_cache(
+                result_cache=result_cache,
+                query_string=query_string,
+                target=target,
+                file_names=file_names,
+                directory=trace_directory,
+                aggregate=partial(
+                    _aggregate,
+                    target,
+                    query_string,
+                    trace_directory,
+                    data_format,
+                    process_pool,
+                    metrics,
+                ),
+            )
+            metrics.add_file_bytes(
+                [f"{trace_directory}/{file_name}" for file_name in file_names]
+            )
+            if loaded:
+                details = f"Loaded cached data for trace \033[4m{trace.name}\033[0m"
+            else:
+                details = f"Updated data for trace \033[4m{trace.name}\033[0m"
             success_message = format_message_success(
-                details=f"Updated data for trace \033[4m{trace.name}\033[0m",
+                details=details,
                 start_time=start_time,
                 full_path=trace_query_file,
             )
-            Aggregator.aggregate_data_frame(
-                data_frame=data_frame, trace_dir=trace_directory
-            )
-            return JobResult(success=True, message=success_message)
+            return JobResult(success=True, message=success_message, metrics=metrics)
         except Exception as e:
             failure_message = format_message_failure(
                 details=f"Failed query for trace \033[4m{trace.name}\033[0m",
@@ -46,7 +165,73 @@ def action(trace, dag, output_dir):
                 full_path=trace_query_file,
                 error_msg=str(repr(e)),
             )
-            return JobResult(success=False, message=failure_message)
+            return JobResult(success=False, message=failure_message, metrics=metrics)
+
+
+def fused_action(
+    fused_query: FusedQuery,
+    trace,
+    dag,
+    output_dir,
+    data_format=JSON_DATA_FORMAT,
+    result_cache: ResultCache = None,
+    process_pool=None,
+):
+    """
+    Runs the fused query of the traces fused_query was built from and writes each
+    trace's data from the one result.
+    """
+    _, target = _get_model_and_target(trace, dag, output_dir)
+    trace_names = ", ".join(fused_query.traces.keys())
+    fused_query_file = fused_query.query_file(output_dir)
+    metrics = JobMetrics()
+    with open(fused_query_file, "r") as file:
+        query_string = file.read()
+        try:
+            start_time = time()
+            file_names = [
+                f"{name}/{file_name}"
+                for name in fused_query.traces
+                for file_name in data_file_names(data_format)
+            ]
+            loaded = _aggregate_with_cache(
+                result_cache=result_cache,
+                query_string=query_string,
+                target=target,
+                file_names=file_names,
+                directory=output_dir,
+                aggregate=partial(
+                    _aggregate_fused,
+                    target,
+                    query_string,
+                    fused_query,
+                    output_dir,
+                    data_format,
+                    process_pool,
+                    metrics,
+                ),
+            )
+            metrics.add_file_bytes(
+                [f"{output_dir}/{file_name}" for file_name in file_names]
+            )
+            if loaded:
+                details = f"Loaded cached data for traces \033[4m{trace_names}\033[0m"
+            else:
+                details = f"Updated data for traces \033[4m{trace_names}\033[0m"
+            success_message = format_message_success(
+                details=details,
+                start_time=start_time,
+                full_path=fused_query_file,
+            )
+            return JobResult(success=True, message=success_message, metrics=metrics)
+        except Exception as e:
+            failure_message = format_message_failure(
+                details=f"Failed query for traces \033[4m{trace_names}\033[0m",
+                start_time=start_time,
+                full_path=fused_query_file,
+                error_msg=str(repr(e)),
+            )
+            return JobResult(success=False, message=failure_message, metrics=metrics)
 
 
 def _get_target(trace, dag, output_dir):
@@ -61,12 +246,63 @@ def _get_target(trace, dag, output_dir):
         return model.target
 
 
-def jobs(dag, output_dir: str, project: Project, name_filter: str):
+def jobs(
+    dag,
+    output_dir: str,
+    project: Project,
+    name_filter: str,
+    data_format: str = JSON_DATA_FORMAT,
+    result_cache: ResultCache = None,
+    dedupe_models: bool = False,
+    fuse_traces: bool = False,
+    process_pool=None,
+):
     jobs = []
 
     traces = project.filter_traces(name_filter=name_filter)
+    fused_trace_names = set()
+    if fuse_traces:
+        traces_by_name = {trace.name: trace for trace in traces}
+        for fused_query in FusedQuery.read_all(output_dir):
+            if not set(fused_query.traces).issubset(traces_by_name):
+                continue
+            fused_trace_names.update(fused_query.traces)
+            trace = traces_by_name[fused_query.name]
+            jobs.append(
+                Job(
+                    item=trace,
+                    output_changed=any(
+                        traces_by_name[name].changed for name in fused_query.traces
+                    ),
+                    target=_get_target(trace, dag, output_dir),
+                    action=fused_action,
+                    fused_query=fused_query,
+                    trace=trace,
+                    dag=dag,
+                    output_dir=output_dir,
+                    data_format=data_format,
+                    result_cache=result_cache,
+                    process_pool=process_pool,
+                )
+            )
+
+    shared_traces = {}
+    if dedupe_models:
+        for sql_model, model_traces in shared_sql_models(
+            dag=dag,
+            project=project,
+            name_filter=name_filter,
+            exclude_trace_names=fused_trace_names,
+        ).items():
+            shared_traces.update({trace: sql_model for trace in model_traces})
+
     for trace in traces:
-        target = _get_target(trace, dag, output_dir)
+        if trace.name in fused_trace_names:
+            continue
+        if trace in shared_traces:
+            target = shared_traces[trace].get_sqlite_target(output_dir)
+        else:
+            target = _get_target(trace, dag, output_dir)
         jobs.append(
             Job(
                 item=trace,
@@ -76,6 +312,10 @@ def jobs(dag, output_dir: str, project: Project, name_filter: str):
                 trace=trace,
                 dag=dag,
                 output_dir=output_dir,
+                data_format=data_format,
+                result_cache=result_cache,
+                query_model_copy=trace in shared_traces,
+                process_pool=process_pool,
             )
         )
     return jobs
@@ -1,17 +1,26 @@
 from ..templates import queries
 from ..models.tokenized_trace import TokenizedTrace
+from functools import lru_cache
 from jinja2 import Template
 import os
 
 
+@lru_cache(maxsize=None)
+def _template(template_name: str) -> Template:
+    """
+    Reads and compiles a query template once per process.
+    """
+    template_path = os.path.join(queries.__path__[0], template_name)
+    with open(template_path, "r") as f:
+        return Template(f.read())
+
+
 class QueryStringFactory:
     def __init__(self, tokenized_trace: TokenizedTrace):
         self.tokenized_trace = tokenized_trace
-        template_path = os.path.join(queries.__path__[0], "default_trace.sql")
-        with open(template_path, "r") as f:
-            self.template_string = f.read()
+        self.template = _template("default_trace.sql")
 
     def build(self):
-        return Template(self.template_string).render(
+        return self.template.render(
             **self.tokenized_trace.model_dump(exclude_none=True)
         )
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from time import time
+from typing import List
+from visivo.models.targets.target import Target
+
+DEFAULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def _copy_file(source, destination):
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    shutil.copyfile(source, destination)
+
+
+class ResultCache:
+    """
+    Stores trace data files in the output directory keyed by a hash of the compiled query
+    and the target it runs against. For targets that read local files, like the sqlite
+    databases written for csv script and local merge models, the modification time and
+    size of those files are part of the key, so entries are not used once the files
+    change. Entries are fresh for ttl seconds after they are
+    stored and the least recently used entries are removed once the cache grows past
+    max_bytes.
+    """
+
+    def __init__(
+        self, output_dir: str, ttl: int, max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+    ):
+        self.cache_dir = f"{output_dir}/.cache/results"
+        self.index_file = f"{self.cache_dir}/index.json"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.key_locks = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, "r") as fp:
+                self.index = json.load(fp)
+
+    @staticmethod
+    def key(query_string: str, target: Target) -> str:
+        sha = hashlib.sha256()
+        sha.update(target.model_dump_json().encode("utf-8"))
+        sha.update(query_string.encode("utf-8"))
+        for file in target.local_files():
+            if os.path.exists(file):
+                stat = os.stat(file)
+                sha.update(f"{file}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8"))
+        return sha.hexdigest()
+
+    def key_lock(self, key: str) -> threading.Lock:
+        """
+        Jobs hold the lock for a key while they look it up and run the query, so that
+        traces with identical queries run them once and share the result.
+        """
+        with self.lock:
+            if key not in self.key_locks:
+                self.key_locks[key] = threading.Lock()
+            return self.key_locks[key]
+
+    def load(self, key: str, file_names: List[str], trace_dir: str) -> bool:
+        """
+        Copies the files of a fresh entry into trace_dir. The cache lock is only held to
+        read and update the index, so an entry evicted while it is copied is a miss.
+        """
+        with self.lock:
+            entry = self.index.get(key)
+            if not entry or time() - entry["created_at"] > self.ttl:
+                return False
+            if not set(file_names).issubset(entry["file_names"]):
+                return False
+        try:
+            for file_name in file_names:
+                _copy_file(
+                    f"{self.cache_dir}/{key}/{file_name}", f"{trace_dir}/{file_name}"
+                )
+        except FileNotFoundError:
+            return False
+        with self.lock:
+            if key in self.index:
+                self.index[key]["last_used_at"] = time()
+                self._write_index()
+        return True
+
+    def store(self, key: str, file_names: List[str], trace_dir: str):
+        entry_dir = f"{self.cache_dir}/{key}"
+        os.makedirs(entry_dir, exist_ok=True)
+        size = 0
+        for file_name in file_names:
+            _copy_file(f"{trace_dir}/{file_name}", f"{entry_dir}/{file_name}")
+            size += os.path.getsize(f"{entry_dir}/{file_name}")
+        with self.lock:
+            now = time()
+            self.index[key] = {
+                "created_at": now,
+                "last_used_at": now,
+                "size": size,
+                "file_names": file_names,
+            }
+            evicted_keys = self._evict()
+            self._write_index()
+        for evicted_key in evicted_keys:
+            shutil.rmtree(f"{self.cache_dir}/{evicted_key}", ignore_errors=True)
+
+    def _evict(self) -> List[str]:
+        """Removes least recently used entries from the index and returns their keys."""
+        total_size = sum(entry["size"] for entry in self.index.values())
+        by_last_used = sorted(
+            self.index.items(), key=lambda key_entry: key_entry[1]["last_used_at"]
+        )
+        evicted_keys = []
+        for key, entry in by_last_used:
+            if total_size <= self.max_bytes:
+                break
+            del self.index[key]
+            evicted_keys.append(key)
+            total_size -= entry["size"]
+        return evicted_keys
+
+    def _write_index(self):
+        tmp_file = f"{self.index_file}.tmp"
+        with open(tmp_file, "w") as fp:
+            json.dump(self.index, fp)
+        os.replace(tmp_file, self.index_file)
@@ -1,4 +1,5 @@
-from typing import List
+from functools import partial
+from typing import Dict, List
 import warnings
 from visivo.models.base.parent_model import ParentModel
 from visivo.models.models import local_merge_model
@@ -7,13 +8,21 @@ from visivo.models.project import Project
 from visivo.models.trace import Trace
 from visivo.logging.logger import Logger
 from time import time
-from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
 import queue
+from visivo.query.aggregator import JSON_DATA_FORMAT
+from visivo.query.executors import HYBRID_EXECUTOR, THREAD_EXECUTOR
 from visivo.query.jobs.job import CachedFuture, Job, JobResult
+from visivo.query.job_durations import JobDurations, critical_path_priorities
+from visivo.query.job_metrics import RunResults
+from visivo.query.result_cache import ResultCache
+from visivo.query.trace_manifest import TraceManifest
 
 from visivo.query.jobs.run_csv_script_job import jobs as csv_script_jobs
 from visivo.query.jobs.run_trace_job import jobs as run_trace_jobs
 from visivo.query.jobs.run_local_merge_job import jobs as run_local_merge_jobs
+from visivo.query.jobs.run_sql_model_job import jobs as run_sql_model_jobs
 from visivo.query.target_job_tracker import TargetJobTracker
 
 warnings.filterwarnings("ignore")
@@ -28,6 +37,13 @@ class Runner:
         soft_failure=False,
         run_only_changed=False,
         name_filter: str = None,
+        data_format: str = JSON_DATA_FORMAT,
+        cache_ttl: int = 0,
+        dedupe_models: bool = False,
+        fuse_traces: bool = False,
+        executor: str = THREAD_EXECUTOR,
+        max_concurrency: int = 0,
+        trace_manifest: TraceManifest = None,
     ):
         self.project = project
         self.output_dir = output_dir
@@ -35,35 +51,52 @@ class Runner:
         self.threads = threads
         self.soft_failure = soft_failure
         self.name_filter = name_filter
+        self.data_format = data_format
+        self.dedupe_models = dedupe_models
+        self.fuse_traces = fuse_traces
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.trace_manifest = trace_manifest
+        self.process_pool = None
+        self.result_cache = None
+        if cache_ttl:
+            self.result_cache = ResultCache(output_dir=output_dir, ttl=cache_ttl)
+        self.job_durations = JobDurations(output_dir=output_dir)
+        self.enqueued_at: Dict[str, float] = {}
+        self.start_times: Dict[str, float] = {}
+        self.run_results = RunResults(output_dir=output_dir)
         self.dag = project.dag()
         self.errors = []
         self.jobs: List[Job] = []
+        self.dependents: Dict[str, List[Job]] = {}
+        self.remaining_dependencies: Dict[str, int] = {}
+        self.completed_jobs = queue.Queue()
 
     def run(self):
-        complete = False
-        target_job_tracker = TargetJobTracker()
+        target_job_tracker = TargetJobTracker(max_concurrency=self.max_concurrency)
         start_time = time()
-        self.jobs = self._all_jobs()
-        with ThreadPoolExecutor(max_workers=self.threads) as executor:
-            while True:
-                complete = self.update_job_queue(target_job_tracker)
-                if complete:
-                    break
-
-                try:
-                    job = target_job_tracker.get_next_job()
-                except queue.Empty:
-                    continue
-
-                if job.done():
-                    pass
-                elif target_job_tracker.is_accepting_job(job):
-                    Logger.instance().info(job.start_message())
-                    job.set_future(executor.submit(job.action, **job.kwargs))
-                    job.future.add_done_callback(self.job_callback)
-                else:
-                    target_job_tracker.return_to_queue(job)
+        if self.executor == HYBRID_EXECUTOR:
+            # Workers are spawned rather than forked since the runner is threaded.
+            self.process_pool = ProcessPoolExecutor(
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        try:
+            self.jobs = self._all_jobs()
+            self._build_job_graph()
+            self._prioritize_jobs()
+            self._run_threads(target_job_tracker)
+        finally:
+            if self.process_pool:
+                self.process_pool.shutdown()
+                self.process_pool = None
+            self.job_durations.write()
+            self.run_results.write()
 
+        concurrency_report = target_job_tracker.concurrency_report()
+        if concurrency_report:
+            Logger.instance().info(
+                "\nTarget concurrency limits:\n" + "\n".join(concurrency_report)
+            )
         if len(self.errors) > 0 and self.soft_failure:
             Logger.instance().error(
                 f"\nRefresh failed in {round(time()-start_time, 2)}s with {len(self.errors)} query error(s)."
@@ -76,44 +109,121 @@ class Runner:
         else:
             Logger.instance().info(f"\nRun finished in {round(time()-start_time, 2)}s")
 
-    def update_job_queue(self, target_job_tracker: TargetJobTracker) -> bool:
-        all_dependencies_completed = True
+    def _run_threads(self, target_job_tracker: TargetJobTracker):
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            self._release_ready_jobs(target_job_tracker, executor)
+            for _ in range(len(self.jobs)):
+                job = self.completed_jobs.get()
+                self._complete_job(job, target_job_tracker, executor)
+
+    def _release_ready_jobs(self, target_job_tracker: TargetJobTracker, executor):
+        for job in self.jobs:
+            if self.remaining_dependencies[job.name] == 0:
+                self._release_job(job, target_job_tracker, executor)
+
+    def _complete_job(self, job: Job, target_job_tracker: TargetJobTracker, executor):
+        target_job_tracker.finish_job(job)
+        for dependent in self.dependents[job.name]:
+            self.remaining_dependencies[dependent.name] -= 1
+            if self.remaining_dependencies[dependent.name] == 0:
+                self._release_job(dependent, target_job_tracker, executor)
+        self._start_jobs(job.target, target_job_tracker, executor)
+
+    def _build_job_graph(self):
+        """
+        Walks the dag once per job to find the jobs it depends on. A job depends on every
+        other job whose item is one of its descendants.
+        """
+        jobs_by_item = {job.item: job for job in self.jobs}
+        self.dependents = {job.name: [] for job in self.jobs}
+        self.remaining_dependencies = {job.name: 0 for job in self.jobs}
         for job in self.jobs:
             job_item_children = ParentModel.all_descendants(
                 dag=self.dag, from_node=job.item
             )
-            dependencies = list(
-                filter(
-                    lambda j: job != j and job_item_children.has_node(j.item),
-                    self.jobs,
-                )
-            )
-            incomplete_dependencies = list(
-                filter(
-                    lambda d: not target_job_tracker.is_job_name_done(d.name),
-                    dependencies,
-                )
+            for child in job_item_children:
+                dependency = jobs_by_item.get(child)
+                if dependency is None or dependency is job:
+                    continue
+                self.dependents[dependency.name].append(job)
+                self.remaining_dependencies[job.name] += 1
+
+    def _prioritize_jobs(self):
+        """
+        Orders the jobs by their critical path so that when jobs compete for a target or
+        a thread, the ones at the head of the longest chains run first.
+        """
+        priorities = critical_path_priorities(
+            jobs=self.jobs,
+            dependents=self.dependents,
+            job_durations=self.job_durations,
+        )
+        for job in self.jobs:
+            job.priority = priorities[job.name]
+        self.jobs.sort(key=lambda job: job.priority, reverse=True)
+
+    def _release_job(
+        self, job: Job, target_job_tracker: TargetJobTracker, executor
+    ):
+        if not job.output_changed and self.run_only_changed:
+            job.future = CachedFuture()
+            target_job_tracker.track_job(job)
+            self.run_results.record(job, status="skipped")
+            self.completed_jobs.put_nowait(job)
+            return
+
+        self.enqueued_at[job.name] = time()
+        target_job_tracker.track_job(job)
+        self._start_jobs(job.target, target_job_tracker, executor)
+
+    def _start_jobs(self, target, target_job_tracker: TargetJobTracker, executor):
+        for job in target_job_tracker.startable_jobs(target):
+            Logger.instance().info(job.start_message())
+            self.start_times[job.name] = time()
+            job.set_future(executor.submit(job.action, **job.kwargs))
+            target_job_tracker.start_job(job)
+            job.future.add_done_callback(partial(self.job_callback, job))
+
+    def job_callback(self, job: Job, future: Future):
+        finished_at = time()
+        start_time = self.start_times.pop(job.name, None)
+        if start_time is not None:
+            self.job_durations.record(job.name, finished_at - start_time)
+        status = "error"
+        metrics = None
+        try:
+            job_result: JobResult = future.result()
+            metrics = job_result.metrics
+            if job_result.success:
+                status = "success"
+                self._update_trace_manifest(job)
+                Logger.instance().success(str(job_result.message))
+            else:
+                Logger.instance().error(str(job_result.message))
+                self.errors.append(str(job_result.message))
+        except Exception as e:
+            Logger.instance().error(str(e))
+            self.errors.append(str(e))
+        finally:
+            self.run_results.record(
+                job,
+                status=status,
+                enqueued_at=self.enqueued_at.pop(job.name, None),
+                started_at=start_time,
+                finished_at=finished_at,
+                metrics=metrics,
             )
-            dependencies_completed = len(incomplete_dependencies) == 0
-            if not dependencies_completed:
-                all_dependencies_completed = False
-
-            if dependencies_completed and not target_job_tracker.is_job_name_enqueued(
-                job.name
-            ):
-                if not job.output_changed and self.run_only_changed:
-                    job.future = CachedFuture()
-                target_job_tracker.track_job(job)
-
-        return all_dependencies_completed and target_job_tracker.empty()
-
-    def job_callback(self, future: Future):
-        job_result: JobResult = future.result(timeout=1)
-        if job_result.success:
-            Logger.instance().success(str(job_result.message))
+            self.completed_jobs.put_nowait(job)
+
+    def _update_trace_manifest(self, job: Job):
+        if self.trace_manifest is None or not isinstance(job.item, Trace):
+            return
+        if "fused_query" in job.kwargs:
+            trace_names = list(job.kwargs["fused_query"].traces)
         else:
-            Logger.instance().error(str(job_result.message))
-            self.errors.append(str(job_result.message))
+            trace_names = [job.name]
+        for trace_name in trace_names:
+            self.trace_manifest.update(trace_name, project_id=self.project.name)
 
     def _all_jobs(self) -> List[Job]:
         jobs = []
@@ -122,6 +232,11 @@ class Runner:
             output_dir=self.output_dir,
             project=self.project,
             name_filter=self.name_filter,
+            data_format=self.data_format,
+            result_cache=self.result_cache,
+            dedupe_models=self.dedupe_models,
+            fuse_traces=self.fuse_traces,
+            process_pool=self.process_pool,
         )
         jobs = jobs + csv_script_jobs(
             dag=self.dag,
@@ -135,4 +250,12 @@ class Runner:
             project=self.project,
             name_filter=self.name_filter,
         )
+        if self.dedupe_models:
+            jobs = jobs + run_sql_model_jobs(
+                dag=self.dag,
+                output_dir=self.output_dir,
+                project=self.project,
+                name_filter=self.name_filter,
+                fuse_traces=self.fuse_traces,
+            )
         return jobs
@@ -0,0 +1,75 @@
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+import numpy
+
+SHARED_DTYPE_KINDS = "biufcmM"
+
+
+class SharedFrame:
+    """
+    Holds a data frame's columns for a worker process. Columns backed by a plain NumPy
+    array of a fixed width dtype are copied into one shared memory block and the others
+    are pickled with the handle, so only the handle is sent to the worker.
+    """
+
+    def __init__(self, data_frame):
+        self.shared_memory = None
+        self.columns: List[Tuple[str, str, int, int]] = []
+        self.objects: Dict[str, numpy.ndarray] = {}
+        self.order = list(data_frame.columns)
+
+        arrays = {}
+        for column in self.order:
+            values = data_frame[column].to_numpy()
+            if values.dtype.kind in SHARED_DTYPE_KINDS:
+                arrays[column] = numpy.ascontiguousarray(values)
+            else:
+                self.objects[column] = values
+
+        size = sum(values.nbytes for values in arrays.values())
+        if size > 0:
+            self.shared_memory = shared_memory.SharedMemory(create=True, size=size)
+        offset = 0
+        for column, values in arrays.items():
+            if values.nbytes > 0:
+                self.shared_memory.buf[offset : offset + values.nbytes] = values.view(
+                    numpy.uint8
+                ).reshape(-1)
+            self.columns.append((column, values.dtype.str, offset, len(values)))
+            offset += values.nbytes
+
+    @property
+    def handle(self):
+        name = self.shared_memory.name if self.shared_memory else None
+        return (name, self.columns, self.objects, self.order)
+
+    def close(self):
+        if self.shared_memory:
+            self.shared_memory.close()
+            self.shared_memory.unlink()
+            self.shared_memory = None
+
+
+def read_shared_frame(handle):
+    """
+    Rebuilds the data frame behind a SharedFrame's handle in a worker process.
+    """
+    from pandas import DataFrame
+
+    name, columns, objects, order = handle
+    data = dict(objects)
+    if name:
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            for column, dtype, offset, length in columns:
+                values = numpy.frombuffer(
+                    block.buf, dtype=numpy.dtype(dtype), count=length, offset=offset
+                )
+                data[column] = values.copy()
+                del values
+        finally:
+            block.close()
+    else:
+        for column, dtype, _, _ in columns:
+            data[column] = numpy.empty(0, dtype=numpy.dtype(dtype))
+    return DataFrame({column: data[column] for column in order})
@@ -1,7 +1,23 @@
 import re
+from functools import lru_cache
 from .dialect import Dialect
 from enum import Enum
 
+CLASSIFICATION_CACHE_SIZE = 100_000
+
+TOKEN_REGEX = re.compile(
+    r"""
+    (?P<string>'(?:[^']|'')*')
+    |(?P<quoted>"(?:[^"]|"")*"|`[^`]*`)
+    |(?P<word>[a-z_][a-z0-9_$]*)
+    |(?P<open>\()
+    |(?P<close>\))
+    |(?P<space>\s+)
+    |(?P<other>.)
+    """,
+    re.IGNORECASE | re.VERBOSE | re.DOTALL,
+)
+
 
 class StatementEnum(Enum):
     aggregate = "aggregate"
@@ -10,20 +26,44 @@ class StatementEnum(Enum):
 
 
 class StatementClassifier:
+    """
+    Classifies sql statements by the function calls they make. A statement with an
+    `over (...)` clause is a window, otherwise one that calls an aggregate function of
+    the dialect is an aggregate. Calls only count once their parentheses are closed,
+    and words inside quotes are ignored.
+
+    Classifications are memoized, so use statement_classifier() to share one classifier
+    per dialect.
+    """
+
     def __init__(self, dialect: Dialect):
         self.dialect = dialect
+        self.aggregates = frozenset(dialect.aggregates)
+        self.classify = lru_cache(maxsize=CLASSIFICATION_CACHE_SIZE)(self._classify)
+
+    def _classify(self, statement: str) -> StatementEnum:
+        has_aggregates = False
+        previous_word = None
+        open_calls = []
+        for token in TOKEN_REGEX.finditer(statement):
+            kind = token.lastgroup
+            if kind == "space":
+                continue
+            if kind == "open":
+                open_calls.append(previous_word)
+            elif kind == "close" and open_calls:
+                function = open_calls.pop()
+                if function == "over":
+                    return StatementEnum.window
+                if function in self.aggregates:
+                    has_aggregates = True
+            previous_word = token.group().lower() if kind == "word" else None
+
+        if has_aggregates:
+            return StatementEnum.aggregate
+        return StatementEnum.vanilla
+
 
-    def classify(self, statement):
-        has_aggregates = bool(
-            re.search(self.dialect.aggregates_regex_pattern, statement, re.IGNORECASE)
-        )
-        window_pattern = r"over\s*\(.*\)"
-        has_windows = bool(re.search(window_pattern, statement, re.IGNORECASE))
-        if has_windows:
-            type = StatementEnum.window
-        elif has_aggregates:
-            type = StatementEnum.aggregate
-        else:
-            type = StatementEnum.vanilla
-
-        return type
+@lru_cache(maxsize=None)
+def statement_classifier(dialect_type: str) -> StatementClassifier:
+    return StatementClassifier(dialect=Dialect(type=dialect_type))
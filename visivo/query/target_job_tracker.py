@@ -1,128 +1,221 @@
-from queue import Queue
-from typing import List
+from enum import Enum
+import heapq
+from time import time
+from typing import Dict, List, Tuple
 from visivo.models.targets.target import Target
 from visivo.query.jobs.job import Job
 
 
-class TargetLimit:
-    def __init__(self, target: Target):
-        self.target_name = target.name
-        self.limit = 1
-        if hasattr(target, "connection_pool_size"):
-            self.limit = target.connection_pool_size
-        self.enqueued: List[Job] = []
-        self.running: List[Job] = []
-        self.done: List[Job] = []
+class JobState(Enum):
+    enqueued = "enqueued"
+    running = "running"
+    done = "done"
+
+
+class AdaptiveConcurrency:
+    """
+    Adjusts a concurrency limit between minimum and maximum with additive increase and
+    multiplicative decrease. Each query that succeeds without taking longer than
+    tolerance times the recent average latency raises the limit by 1 / limit, about one
+    more query per round of queries. A failed or slow query halves it.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        tolerance: float = 2.0,
+        smoothing: float = 0.1,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.value = float(min(max(initial, minimum), maximum))
+        self.peak = int(self.value)
+        self.average_latency = None
 
     @property
-    def all_tracked_job_names(self):
-        return (
-            set(map(lambda job: job.name, self.enqueued))
-            .union(set(map(lambda job: job.name, self.running)))
-            .union(set(map(lambda job: job.name, self.done)))
+    def limit(self) -> int:
+        return int(self.value)
+
+    def observe(self, latency: float, success: bool):
+        slow = (
+            self.average_latency is not None
+            and latency > self.tolerance * self.average_latency
         )
+        if success and not slow:
+            self.value = min(self.value + 1 / self.value, float(self.maximum))
+        else:
+            self.value = max(self.value / 2, float(self.minimum))
+        self.peak = max(self.peak, self.limit)
+
+        if self.average_latency is None:
+            self.average_latency = latency
+        else:
+            self.average_latency += self.smoothing * (latency - self.average_latency)
+
+
+def _succeeded(job: Job) -> bool:
+    if job.future.exception() is not None:
+        return False
+    return getattr(job.future.result(), "success", True)
+
+
+class TargetLimit:
+    def __init__(self, target: Target, max_concurrency: int = 0):
+        self.target_name = target.name
+        self.base_limit = 1
+        if hasattr(target, "connection_pool_size"):
+            self.base_limit = target.connection_pool_size
+        self.adaptive = None
+        if max_concurrency:
+            self.adaptive = AdaptiveConcurrency(
+                initial=self.base_limit, minimum=1, maximum=max_concurrency
+            )
+            # Otherwise queries admitted above the pool size wait for a connection,
+            # which reads as latency and halves the limit.
+            target.set_max_concurrency(max_concurrency)
+        self.enqueued: Dict[str, Job] = {}
+        self.enqueued_heap: List[Tuple[float, int, str]] = []
+        self.enqueued_count = 0
+        self.running: Dict[str, Job] = {}
+        self.start_times: Dict[str, float] = {}
+        self.done_count = 0
 
     @property
-    def all_done_job_names(self):
-        return set(map(lambda job: job.name, self.done))
+    def limit(self) -> int:
+        if self.adaptive:
+            return self.adaptive.limit
+        return self.base_limit
 
     def is_processing(self):
-        self.update()
         return (len(self.running) + len(self.enqueued)) > 0
 
     def is_accepting_job(self):
-        self.update()
         return self.limit - len(self.running) > 0
 
-    def update(self):
-        self.done = (
-            self.done
-            + list(filter(lambda job: job.done(), self.running))
-            + list(filter(lambda job: job.done(), self.enqueued))
-        )
-        self.running = list(filter(lambda job: job.running(), self.running)) + list(
-            filter(lambda job: job.running(), self.enqueued)
-        )
-
-        self.enqueued = list(filter(lambda job: not job.future, self.enqueued))
+    def startable_jobs(self) -> List[Job]:
+        """
+        Returns the highest priority enqueued jobs that fit under the limit, in the order
+        they were enqueued when priorities are equal. Entries for jobs that have left
+        the queue are dropped from the heap as they reach the top.
+        """
+        available = self.limit - len(self.running)
+        entries = []
+        while self.enqueued_heap and len(entries) < available:
+            entry = heapq.heappop(self.enqueued_heap)
+            if entry[2] in self.enqueued:
+                entries.append(entry)
+        for entry in entries:
+            heapq.heappush(self.enqueued_heap, entry)
+        return [self.enqueued[entry[2]] for entry in entries]
+
+    def transition(self, job: Job, from_state: JobState, to_state: JobState):
+        if from_state == JobState.enqueued:
+            self.enqueued.pop(job.name, None)
+        elif from_state == JobState.running:
+            self.running.pop(job.name, None)
+            start_time = self.start_times.pop(job.name, None)
+            if self.adaptive and start_time is not None and to_state == JobState.done:
+                self.adaptive.observe(
+                    latency=time() - start_time, success=_succeeded(job)
+                )
+
+        if to_state == JobState.enqueued:
+            self.enqueued[job.name] = job
+            heapq.heappush(
+                self.enqueued_heap, (-job.priority, self.enqueued_count, job.name)
+            )
+            self.enqueued_count += 1
+        elif to_state == JobState.running:
+            self.running[job.name] = job
+            self.start_times[job.name] = time()
+        elif to_state == JobState.done:
+            self.done_count += 1
 
 
 class TargetJobTracker:
-    def __init__(self):
-        self.target_limits: List[TargetLimit] = []
-        self.job_queue = Queue()
+    """
+    Tracks the state of each job and how many jobs are running against each target. State
+    changes through track_job, start_job and finish_job so that status queries never scan
+    the tracked jobs.
+    """
+
+    def __init__(self, max_concurrency: int = 0):
+        self.max_concurrency = max_concurrency
+        self.target_limits: Dict[str, TargetLimit] = {}
+        self.job_states: Dict[str, JobState] = {}
 
     @property
     def target_names(self):
-        return list(
-            map(lambda target_limit: target_limit.target_name, self.target_limits)
-        )
+        return list(self.target_limits.keys())
 
     @property
     def all_tracked_job_names(self):
-        all_tracked_job_names = set()
-        for target_limit in self.target_limits:
-            all_tracked_job_names = all_tracked_job_names.union(
-                target_limit.all_tracked_job_names
-            )
-        return all_tracked_job_names
+        return set(self.job_states.keys())
 
     @property
     def all_done_job_names(self):
-        all_done_job_names = set()
-        for target_limit in self.target_limits:
-            all_done_job_names = all_done_job_names.union(
-                target_limit.all_done_job_names
-            )
-        return all_done_job_names
+        return {
+            name for name, state in self.job_states.items() if state == JobState.done
+        }
 
     def is_accepting_job(self, job: Job):
-        self.__add_target(job.target)
-        self.__update()
-        target_limit = next(
-            target_limit
-            for target_limit in self.target_limits
-            if target_limit.target_name == job.target.name
-        )
-        return target_limit.is_accepting_job()
+        return self.__target_limit(job.target).is_accepting_job()
 
     def track_job(self, job: Job):
-        self.__add_target(job.target)
-        self.__update()
-        for target_limit in self.target_limits:
-            if target_limit.target_name == job.target.name:
-                target_limit.enqueued.append(job)
-                self.job_queue.put(job)
+        if job.done():
+            state = JobState.done
+        elif job.running():
+            state = JobState.running
+        else:
+            state = JobState.enqueued
+        self.__transition(job, to_state=state)
+
+    def start_job(self, job: Job):
+        self.__transition(job, to_state=JobState.running)
+
+    def finish_job(self, job: Job):
+        self.__transition(job, to_state=JobState.done)
 
     def is_job_name_enqueued(self, job_name: str) -> bool:
-        self.__update()
-        return job_name in self.all_tracked_job_names
+        return job_name in self.job_states
 
     def is_job_name_done(self, job_name: str) -> bool:
-        self.__update()
-        return job_name in self.all_done_job_names
+        return self.job_states.get(job_name) == JobState.done
 
     def is_done(self) -> bool:
-        self.__update()
-        for target_limit in self.target_limits:
+        for target_limit in self.target_limits.values():
             if target_limit.is_processing():
                 return False
         return True
 
-    def return_to_queue(self, job: Job):
-        self.job_queue.put(job)
-
-    def get_next_job(self) -> Job:
-        self.__update()
-        return self.job_queue.get(timeout=1)
-
-    def empty(self) -> bool:
-        return self.job_queue.empty()
-
-    def __update(self):
-        for target_job_limit in self.target_limits:
-            target_job_limit.update()
+    def startable_jobs(self, target: Target) -> List[Job]:
+        return self.__target_limit(target).startable_jobs()
+
+    def concurrency_report(self) -> List[str]:
+        report = []
+        for target_limit in self.target_limits.values():
+            if target_limit.adaptive:
+                report.append(
+                    f"{target_limit.target_name}: {target_limit.limit} concurrent queries (peak {target_limit.adaptive.peak})"
+                )
+        return report
+
+    def __transition(self, job: Job, to_state: JobState):
+        from_state = self.job_states.get(job.name)
+        if from_state == to_state:
+            return
+        self.__target_limit(job.target).transition(
+            job, from_state=from_state, to_state=to_state
+        )
+        self.job_states[job.name] = to_state
 
-    def __add_target(self, target):
-        if target.name not in self.target_names:
-            self.target_limits.append(TargetLimit(target=target))
+    def __target_limit(self, target: Target) -> TargetLimit:
+        if target.name not in self.target_limits:
+            self.target_limits[target.name] = TargetLimit(
+                target=target, max_concurrency=self.max_concurrency
+            )
+        return self.target_limits[target.name]
@@ -0,0 +1,162 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+import hashlib
+import json
+import multiprocessing
+import os
+from visivo.models.base.parent_model import ParentModel
+from visivo.models.models.csv_script_model import CsvScriptModel
+from visivo.models.models.model import Model
+from visivo.models.targets.target import Target
+from visivo.models.tokenized_trace import TokenizedTrace
+from visivo.models.trace import Trace
+from visivo.query.query_string_factory import QueryStringFactory
+from visivo.query.query_writer import QueryWriter
+from visivo.query.trace_tokenizer import TraceTokenizer
+
+# Below this many traces, starting worker processes costs more than it saves.
+DEFAULT_PARALLEL_THRESHOLD = 500
+
+
+@lru_cache(maxsize=None)
+def visivo_version() -> str:
+    """
+    The installed version of visivo, or a hash of its source when it runs from a
+    checkout that is not installed, so compiled traces are not reused across code
+    changes either way.
+    """
+    try:
+        return version("visivo")
+    except PackageNotFoundError:
+        sha = hashlib.sha256()
+        package_dir = Path(__file__).resolve().parents[1]
+        for path in sorted(package_dir.rglob("*.py")):
+            sha.update(str(path.relative_to(package_dir)).encode("utf-8"))
+            sha.update(path.read_bytes())
+        return sha.hexdigest()
+
+
+def compile_trace(item: Tuple[Trace, Model, Target]) -> Tuple[TokenizedTrace, str]:
+    trace, model, target = item
+    tokenized_trace = TraceTokenizer(trace=trace, model=model, target=target).tokenize()
+    return tokenized_trace, QueryStringFactory(tokenized_trace=tokenized_trace).build()
+
+
+class TraceCompiler:
+    """
+    Tokenizes traces and writes their query.sql files. The model and target of each
+    trace are resolved from the dag once per model, and once there are at least
+    parallel_threshold traces they are tokenized in worker processes.
+
+    Each compiled trace is stored in the output directory with a hash of the trace,
+    model and target definitions it was compiled from. A trace whose hash has not
+    changed since the last compile keeps its query.sql and is not tokenized again.
+    This only skips tokenizing: the project is still parsed and validated as a whole
+    before compile, so a recompile after editing one file is not instant on large
+    projects.
+    """
+
+    def __init__(
+        self,
+        dag,
+        output_dir: str,
+        parallel_threshold: int = DEFAULT_PARALLEL_THRESHOLD,
+    ):
+        self.dag = dag
+        self.output_dir = output_dir
+        self.parallel_threshold = parallel_threshold
+        self.cache_file = f"{output_dir}/.cache/compiled_traces.json"
+        self.targets: Dict[Model, Target] = {}
+
+    def model(self, trace: Trace) -> Model:
+        for successor in self.dag.successors(trace):
+            if isinstance(successor, Model):
+                return successor
+        return ParentModel.all_descendants_of_type(
+            type=Model, dag=self.dag, from_node=trace
+        )[0]
+
+    def target(self, model: Model) -> Target:
+        if model not in self.targets:
+            if isinstance(model, CsvScriptModel):
+                target = model.get_sqlite_target(output_dir=self.output_dir)
+            else:
+                target = ParentModel.all_descendants_of_type(
+                    type=Target, dag=self.dag, from_node=model
+                )[0]
+            self.targets[model] = target
+        return self.targets[model]
+
+    @staticmethod
+    def key(trace: Trace, model: Model, target: Target) -> str:
+        sha = hashlib.sha256()
+        sha.update(visivo_version().encode("utf-8"))
+        sha.update(trace.model_dump_json(exclude={"changed"}).encode("utf-8"))
+        sha.update(model.model_dump_json().encode("utf-8"))
+        sha.update(target.model_dump_json().encode("utf-8"))
+        return sha.hexdigest()
+
+    def compile(self, traces: Iterable[Trace]) -> Dict[str, TokenizedTrace]:
+        cache = self._read_cache()
+        tokenized_traces = {}
+        items = []
+        keys = {}
+        for trace in traces:
+            model = self.model(trace)
+            target = self.target(model)
+            keys[trace.name] = self.key(trace, model, target)
+            entry = cache.get(trace.name)
+            if (
+                entry
+                and entry["key"] == keys[trace.name]
+                and os.path.exists(f"{self.output_dir}/{trace.name}/query.sql")
+            ):
+                tokenized_traces[trace.name] = TokenizedTrace(
+                    **entry["tokenized_trace"]
+                )
+                trace.changed = False
+                continue
+            items.append((trace, model, target))
+
+        if len(items) >= self.parallel_threshold:
+            workers = os.cpu_count() or 1
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            ) as process_pool:
+                results = list(
+                    process_pool.map(
+                        compile_trace,
+                        items,
+                        chunksize=max(len(items) // (workers * 4), 1),
+                    )
+                )
+        else:
+            results = [compile_trace(item) for item in items]
+
+        for (trace, _, _), (tokenized_trace, query_string) in zip(items, results):
+            tokenized_traces[trace.name] = tokenized_trace
+            QueryWriter(
+                trace=trace, query_string=query_string, output_dir=self.output_dir
+            ).write()
+
+        for name, tokenized_trace in tokenized_traces.items():
+            cache[name] = {
+                "key": keys[name],
+                "tokenized_trace": tokenized_trace.model_dump(),
+            }
+        self._write_cache(cache)
+        return tokenized_traces
+
+    def _read_cache(self) -> Dict:
+        if not os.path.exists(self.cache_file):
+            return {}
+        with open(self.cache_file, "r") as fp:
+            return json.load(fp)
+
+    def _write_cache(self, cache: Dict):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        with open(self.cache_file, "w") as fp:
+            json.dump(cache, fp)
@@ -0,0 +1,137 @@
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from visivo.models.tokenized_trace import TokenizedTrace
+from visivo.query.trace_tokenizer import DEFAULT_COHORT_ON
+import json
+import os
+import re
+import shutil
+
+# Trace data lives in {output_dir}/{trace name}, so this must not be a trace name.
+FUSED_DIRECTORY = ".cache/fused"
+LITERAL_COHORT_ON = "literal"
+
+
+def _literal_value(statement: str) -> Optional[str]:
+    match = re.match(r"^\s*'((?:[^']|'')*)'\s*$", statement)
+    if not match:
+        return None
+    return match.group(1).replace("''", "'")
+
+
+class FusedTrace(BaseModel):
+    columns: Dict[str, str]
+    cohort: Optional[str] = None
+
+    def split(self, data_frame):
+        """
+        Returns the trace's columns from a batch of the fused query's rows, named and
+        ordered as the trace's own query would return them.
+        """
+        from pandas import DataFrame
+
+        columns = {key: data_frame[alias] for key, alias in self.columns.items()}
+        cohort_on = data_frame["cohort_on"] if self.cohort is None else self.cohort
+        return DataFrame({**columns, "cohort_on": cohort_on})
+
+
+class FusedQuery(BaseModel):
+    name: str
+    traces: Dict[str, FusedTrace]
+
+    @staticmethod
+    def directory(output_dir: str) -> str:
+        return f"{output_dir}/{FUSED_DIRECTORY}"
+
+    def query_file(self, output_dir: str) -> str:
+        return f"{FusedQuery.directory(output_dir)}/{self.name}/query.sql"
+
+    def write(self, output_dir: str, query_string: str):
+        fused_query_directory = f"{FusedQuery.directory(output_dir)}/{self.name}"
+        os.makedirs(fused_query_directory, exist_ok=True)
+        with open(self.query_file(output_dir), "w") as fp:
+            fp.write(query_string)
+        with open(f"{fused_query_directory}/fused_query.json", "w") as fp:
+            fp.write(self.model_dump_json())
+
+    @staticmethod
+    def clear(output_dir: str):
+        shutil.rmtree(FusedQuery.directory(output_dir), ignore_errors=True)
+
+    @staticmethod
+    def read_all(output_dir: str) -> List["FusedQuery"]:
+        directory = FusedQuery.directory(output_dir)
+        if not os.path.exists(directory):
+            return []
+        fused_queries = []
+        for name in sorted(os.listdir(directory)):
+            with open(f"{directory}/{name}/fused_query.json", "r") as fp:
+                fused_queries.append(FusedQuery(**json.load(fp)))
+        return fused_queries
+
+
+class TraceFuser:
+    """
+    Merges tokenized traces that only differ in their select items into one query.
+
+    Traces can be fused when they share their model's sql, target, group by statements,
+    filters and ordering, and either share cohort_on or both use a string literal for it.
+    The fused query selects the union of the traces' select items, each distinct
+    statement once, and a literal cohort_on is restored per trace when the rows are split.
+    """
+
+    def __init__(self, tokenized_traces: Dict[str, TokenizedTrace]):
+        self.tokenized_traces = tokenized_traces
+
+    def fuse(self) -> List[Tuple[FusedQuery, TokenizedTrace]]:
+        groups: Dict[str, List[str]] = {}
+        for name in sorted(self.tokenized_traces.keys()):
+            if not self.tokenized_traces[name].select_items:
+                continue
+            key = self._fusion_key(self.tokenized_traces[name])
+            groups.setdefault(key, []).append(name)
+        return [self._fuse(names) for names in groups.values() if len(names) > 1]
+
+    def _fusion_key(self, tokenized_trace: TokenizedTrace) -> str:
+        cohort_on = tokenized_trace.cohort_on
+        if cohort_on != DEFAULT_COHORT_ON and _literal_value(cohort_on) is not None:
+            cohort_on = LITERAL_COHORT_ON
+        groupby_statements = tokenized_trace.groupby_statements
+        if groupby_statements is not None:
+            groupby_statements = sorted(groupby_statements)
+        return json.dumps(
+            [
+                tokenized_trace.sql,
+                tokenized_trace.target,
+                cohort_on,
+                groupby_statements,
+                tokenized_trace.filter_by,
+                tokenized_trace.order_by,
+            ]
+        )
+
+    def _fuse(self, names: List[str]) -> Tuple[FusedQuery, TokenizedTrace]:
+        primary = self.tokenized_traces[names[0]]
+        literal_cohort_on = _literal_value(primary.cohort_on) is not None
+        aliases: Dict[str, str] = {}
+        traces = {}
+        for name in names:
+            tokenized_trace = self.tokenized_traces[name]
+            columns = {}
+            for key, statement in tokenized_trace.select_items.items():
+                if statement not in aliases:
+                    aliases[statement] = f"fused.{len(aliases)}"
+                columns[key] = aliases[statement]
+            cohort = None
+            if literal_cohort_on:
+                cohort = _literal_value(tokenized_trace.cohort_on)
+            traces[name] = FusedTrace(columns=columns, cohort=cohort)
+
+        fused_trace = primary.model_copy(
+            update={
+                "select_items": {
+                    alias: statement for statement, alias in aliases.items()
+                }
+            }
+        )
+        return FusedQuery(name=names[0], traces=traces), fused_trace
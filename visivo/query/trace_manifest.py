@@ -0,0 +1,119 @@
+import hashlib
+import os
+import threading
+from typing import Dict, List
+from visivo.query.data_formats import (
+    COLUMNAR_DATA_FORMAT,
+    COLUMNAR_FILE_NAME,
+    JSON_DATA_FORMAT,
+    JSON_FILE_NAME,
+)
+
+DATA_FILES = {
+    JSON_DATA_FORMAT: JSON_FILE_NAME,
+    COLUMNAR_DATA_FORMAT: COLUMNAR_FILE_NAME,
+}
+
+
+class TraceManifest:
+    """
+    Keeps the data files of each trace in the output directory in memory, along with
+    their size and a hash of their content, so traces are listed without touching the
+    output directory. The runner updates a trace's entry when its job finishes, on the
+    job's thread, and traces whose files are gone are dropped then.
+
+    The manifest holds a single project, identified by its name.
+    """
+
+    def __init__(self, output_dir: str, project_id: str = None):
+        self.output_dir = output_dir
+        self.project_id = project_id
+        self.lock = threading.Lock()
+        self.traces: Dict[str, Dict[str, Dict]] = {}
+
+    def set_project_id(self, project_id: str):
+        with self.lock:
+            self.project_id = project_id
+
+    def scan(self):
+        """Replaces the traces with every trace with data in the output directory."""
+        traces = {}
+        if os.path.isdir(self.output_dir):
+            for entry in os.scandir(self.output_dir):
+                if entry.is_dir():
+                    files = self._data_files(entry.name)
+                    if files:
+                        traces[entry.name] = files
+        with self.lock:
+            self.traces = traces
+
+    def update(self, trace_name: str, project_id: str = None):
+        files = self._data_files(trace_name)
+        with self.lock:
+            if project_id:
+                self.project_id = project_id
+            if files:
+                self.traces[trace_name] = files
+            else:
+                self.traces.pop(trace_name, None)
+
+    def entries(
+        self,
+        project_id: str = None,
+        trace_names: List[str] = None,
+        data_format: str = JSON_DATA_FORMAT,
+        offset: int = 0,
+        limit: int = None,
+    ) -> List[Dict]:
+        """
+        Lists the data file of each trace in trace_names, or of every trace when no names
+        are given. A trace is listed with its file in data_format when it has one and its
+        json file otherwise. Nothing is listed for a project_id of another project.
+        """
+        with self.lock:
+            if project_id and self.project_id and project_id != self.project_id:
+                return []
+            traces = dict(self.traces)
+        names = trace_names if trace_names else sorted(traces)
+
+        entries = []
+        for name in dict.fromkeys(names):
+            files = traces.get(name)
+            if not files:
+                continue
+            entry_format = data_format if data_format in files else JSON_DATA_FORMAT
+            if entry_format not in files:
+                continue
+            file = files[entry_format]
+            entries.append(
+                {
+                    "name": name,
+                    "id": name,
+                    "format": entry_format,
+                    "signed_data_file_url": f"/data/{name}/{file['file_name']}",
+                    "size": file["size"],
+                    "hash": file["hash"],
+                }
+            )
+        end = None if limit is None else offset + limit
+        return entries[offset:end]
+
+    def _data_files(self, trace_name: str) -> Dict[str, Dict]:
+        files = {}
+        for data_format, file_name in DATA_FILES.items():
+            path = f"{self.output_dir}/{trace_name}/{file_name}"
+            if os.path.exists(path):
+                files[data_format] = {
+                    "file_name": file_name,
+                    "size": os.path.getsize(path),
+                    "hash": _file_hash(path),
+                }
+        return files
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
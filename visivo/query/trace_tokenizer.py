@@ -1,14 +1,15 @@
+from visivo.models.expression import parse_expression
 from visivo.models.trace import Trace
 from visivo.models.targets.target import Target
 from visivo.models.models.model import Model
 from visivo.models.tokenized_trace import TokenizedTrace
 from .dialect import Dialect
-from .statement_classifier import StatementClassifier, StatementEnum
-from ..utils import extract_value_from_function
+from .statement_classifier import StatementEnum, statement_classifier
 import warnings
 import re
 
 DEFAULT_COHORT_ON = "'values'"
+STRING_LITERAL_REGEX = re.compile(r"^\s*'.*'\s*$")
 
 
 class TraceTokenizer:
@@ -17,7 +18,7 @@ class TraceTokenizer:
         self.target = target
         self.model = model
         self.dialect = Dialect(type=target.type)
-        self.statement_classifier = StatementClassifier(dialect=self.dialect)
+        self.statement_classifier = statement_classifier(self.dialect.type)
         self.select_items = {}
         self._set_select_items()
         self._set_order_by()
@@ -46,30 +47,11 @@ class TraceTokenizer:
         if self.trace.name:
             cohort_on = cohort_on or f"'{self.trace.name}'"
         cohort_on = cohort_on or DEFAULT_COHORT_ON
-        de_query = extract_value_from_function(cohort_on, "query")
+        de_query = parse_expression(cohort_on).query_statement()
         return de_query if de_query else cohort_on
 
-    def _set_select_items(self, obj=None, path=[]):
-        if obj == None:
-            obj = self.trace.model_dump()
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                if value != None:
-                    self._set_select_items(value, path + [key])
-        # TODO: Add support for lists of query statements.
-        elif isinstance(obj, list):
-            for i, value in enumerate(obj):
-                self._set_select_items(value, path + [i])
-        else:
-            query_id = ".".join([str(i) for i in path])
-            query_statement = False
-            if path[0] == "props":
-                query_statement = extract_value_from_function(str(obj), "query")
-            if path[0] == "columns":
-                query_statement = str(obj)
-
-            if query_statement and query_id not in ("cohort_on", "filter", "order_by"):
-                self.select_items.update({query_id: query_statement})
+    def _set_select_items(self):
+        self.select_items.update(self.trace.query_statements())
 
     def _set_groupby(self):
         if hasattr(self, "order_by"):
@@ -87,7 +69,7 @@ class TraceTokenizer:
         )
         groupby = []
         for statement in query_statements:
-            if re.findall(r"^\s*'.*'\s*$", statement):
+            if STRING_LITERAL_REGEX.match(statement):
                 continue
             classification = self.statement_classifier.classify(statement)
             match classification:
@@ -97,15 +79,16 @@ class TraceTokenizer:
                     groupby.append(statement)
 
         if groupby:
-            self.groupby_statements = list(set(groupby))
+            # Removes duplicates while keeping the order stable across processes, so
+            # compiled queries do not change between runs.
+            self.groupby_statements = list(dict.fromkeys(groupby))
 
     def _set_filter(self):
-        trace_dict = self.trace.model_dump()
-        filters = trace_dict.get("filters")
+        filters = self.trace.filters
         if filters:
             filter_by = {"aggregate": [], "window": [], "vanilla": []}
             for filter in filters:
-                argument = extract_value_from_function(filter, "query")
+                argument = parse_expression(filter).query_statement()
                 classification = self.statement_classifier.classify(argument)
                 match classification:
                     case StatementEnum.window:
@@ -124,12 +107,11 @@ class TraceTokenizer:
             self.filter_by = filter_by
 
     def _set_order_by(self):
-        trace_dict = self.trace.model_dump()
-        order_by = trace_dict.get("order_by")
+        order_by = self.trace.order_by
         if order_by:
             parsed_order_by = []
             for statement in order_by:
-                argument = extract_value_from_function(statement, "query")
+                argument = parse_expression(statement).query_statement()
                 if argument:
                     parsed_order_by.append(argument)
             if parsed_order_by:
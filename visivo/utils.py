@@ -2,7 +2,6 @@ import yaml
 import json
 import os
 from pathlib import Path
-import re
 import click
 from visivo.templates.render_yaml import render_yaml
 from visivo.parsers.yaml_ordered_dict import YamlOrderedDict
@@ -65,17 +64,6 @@ def error_if_true(bool: bool, message: str):
         raise Exception(message)
 
 
-def extract_value_from_function(function_text, function_name):
-    if function_text is None:
-        return None
-    pattern = r"{}\((.+)\)".format(re.escape(function_name))
-    match = re.search(pattern, function_text)
-    if not match:
-        return None
-    value = match.group(1)
-    return value.strip()
-
-
 def set_location_recursive_items(dictionary, file):
     if isinstance(dictionary, YamlOrderedDict):
         for key, value in dictionary._key_locs.items():
@@ -94,15 +82,22 @@ def set_location_recursive_items(dictionary, file):
 
 def load_yaml_file(file):
     with open(file, "r") as stream:
-        template_string = stream.read()
-        try:
-            loaded = yaml.safe_load(render_yaml(template_string))
-            set_location_recursive_items(loaded, str(file))
-            return loaded
-        except yaml.YAMLError as exc:
-            if hasattr(exc, "problem_mark"):
-                mark = exc.problem_mark
-                error_location = f"Invalid yaml in project\n  Location: {str(file)}:{mark.line + 1}[{mark.column + 1}]\n  Issue: {exc.problem}"
-                raise click.ClickException(error_location)
-            else:
-                raise click.ClickException(exc)
+        return load_yaml_string(stream.read(), file)
+
+
+def load_yaml_string(template_string: str, file):
+    """
+    Renders and loads the contents of a yaml file, annotating the loaded maps with
+    locations in file.
+    """
+    try:
+        loaded = yaml.safe_load(render_yaml(template_string))
+        set_location_recursive_items(loaded, str(file))
+        return loaded
+    except yaml.YAMLError as exc:
+        if hasattr(exc, "problem_mark"):
+            mark = exc.problem_mark
+            error_location = f"Invalid yaml in project\n  Location: {str(file)}:{mark.line + 1}[{mark.column + 1}]\n  Issue: {exc.problem}"
+            raise click.ClickException(error_location)
+        else:
+            raise click.ClickException(exc)